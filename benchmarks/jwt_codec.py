@@ -0,0 +1,71 @@
+"""Token encode and verify time of the JWT codec against the generic PyJWT path it replaced.
+
+Usage: python benchmarks/jwt_codec.py [--number N]
+The PyJWT path encodes with jwt.encode, and decodes with an unverified header read for the type check,
+another one for the kid and jwt.decode. Asymmetric algorithms are measured when `cryptography` is installed.
+"""
+import argparse
+import sys
+import time
+import timeit
+from pathlib import Path
+from uuid import uuid4
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tokens import get_keys  # noqa: E402
+
+from common.settings import settings  # noqa: E402
+from utils.enums import TokenType  # noqa: E402
+from utils.jwt_codec import jwt_codec  # noqa: E402
+from utils.keyring import keyring  # noqa: E402
+
+
+def pyjwt_encode(claims: dict, signing_key) -> str:
+    return jwt.encode(
+        claims,
+        signing_key.signing_key,
+        algorithm=signing_key.algorithm,
+        headers={"typ": TokenType.access, "kid": signing_key.kid},
+    )
+
+
+def pyjwt_decode(token: str) -> dict:
+    if jwt.get_unverified_header(token).get("typ") != TokenType.access:
+        raise jwt.InvalidTokenError("Invalid token data")
+    verifying_key = keyring.get_verifying_key(jwt.get_unverified_header(token).get("kid"))
+    return jwt.decode(token, verifying_key.verifying_key, algorithms=[verifying_key.algorithm])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JWT codec benchmark")
+    parser.add_argument("--number", type=int, default=20000)
+    number = parser.parse_args().number
+
+    now = int(time.time())
+    claims = {"sub": str(uuid4()), "role": "user", "iat": now, "nbf": now, "exp": now + 900, "jti": str(uuid4())}
+    print(f"{'algorithm':<10}{'path':<8}{'encode, us':>12}{'decode, us':>12}")
+    for algorithm, (secret_key, public_key) in get_keys().items():
+        settings.ALGORITHM, settings.SECRET_KEY, settings.PUBLIC_KEY = algorithm, secret_key, public_key
+        settings.SIGNING_KEYS_FILE = ""
+        keyring.load()
+        signing_key = keyring.get_signing_key()
+        token = jwt_codec.encode(claims, TokenType.access, signing_key)
+
+        paths = {
+            "pyjwt": (lambda: pyjwt_encode(claims, signing_key), lambda: pyjwt_decode(token)),
+            "codec": (
+                lambda: jwt_codec.encode(claims, TokenType.access, signing_key),
+                lambda: jwt_codec.decode(token, keyring.get_verifying_key, TokenType.access),
+            ),
+        }
+        for path, (encode, decode) in paths.items():
+            encode_time = timeit.timeit(encode, number=number) / number
+            decode_time = timeit.timeit(decode, number=number) / number
+            print(f"{algorithm:<10}{path:<8}{encode_time * 1e6:>12.1f}{decode_time * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
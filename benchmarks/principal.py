@@ -0,0 +1,57 @@
+"""Memory and construction time of the authenticated user representation, ORM User against Principal.
+
+Usage: python benchmarks/principal.py [--number N]
+"""
+import argparse
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from db.tables import User  # noqa: E402
+from utils.enums import UserRole  # noqa: E402
+from utils.principal import Principal  # noqa: E402
+
+HASHED_PWD = "$2b$12$" + "x" * 53
+
+
+def make_user() -> User:
+    now = datetime.now()
+    return User(
+        id=uuid4(), name="John", surname="Doe", login="Sunny_Johnny", email="john_doe@mail.net",
+        hashed_pwd=HASHED_PWD, role=UserRole.user, created_at=now, updated_at=now, last_login_at=now,
+    )
+
+
+def make_principal() -> Principal:
+    return Principal(uuid4(), UserRole.user, datetime.now())
+
+
+def measure(factory, number: int) -> tuple[float, float]:
+    """Bytes held per object and microseconds to build one."""
+    tracemalloc.start()
+    objects = [factory() for _ in range(number)]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return held / number, timeit.timeit(factory, number=number) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Principal benchmark")
+    parser.add_argument("--number", type=int, default=20000)
+    number = parser.parse_args().number
+
+    make_user()
+    print(f"{'object':<11}{'bytes':>8}{'build, us':>11}")
+    for name, factory in (("User", make_user), ("Principal", make_principal)):
+        held, build_time = measure(factory, number)
+        print(f"{name:<11}{held:>8.0f}{build_time:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
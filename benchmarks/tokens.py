@@ -0,0 +1,65 @@
+"""Token size and encode/decode time for the full and compact token profiles.
+
+Usage: python benchmarks/tokens.py [--number N]
+Asymmetric algorithms (EdDSA, ES256) are measured when the `cryptography` package is installed.
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from common.settings import settings  # noqa: E402
+from utils.auth import create_tokens, decode_token  # noqa: E402
+from utils.enums import TokenProfile, UserRole  # noqa: E402
+from utils.keyring import keyring  # noqa: E402
+
+USER_AGENT = "Mobile Safari 17.2 / iOS 17.2.1 / Apple iPhone"
+
+
+def get_keys() -> dict[str, tuple[str, str]]:
+    keys = {"HS256": ("benchmark_secret_key_0123456789abcdef", "")}
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    except ImportError:
+        return keys
+
+    private_keys = {"EdDSA": ed25519.Ed25519PrivateKey.generate(), "ES256": ec.generate_private_key(ec.SECP256R1())}
+    for algorithm, private_key in private_keys.items():
+        keys[algorithm] = (
+            private_key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            ).decode(),
+            private_key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode(),
+        )
+    return keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Token profiles benchmark")
+    parser.add_argument("--number", type=int, default=5000)
+    number = parser.parse_args().number
+
+    data = {"sub": str(uuid4()), "role": UserRole.executor, "user_agent": USER_AGENT}
+    print(f"{'algorithm':<10}{'profile':<9}{'access, B':>10}{'refresh, B':>11}{'encode, us':>12}{'decode, us':>12}")
+    for algorithm, (secret_key, public_key) in get_keys().items():
+        settings.ALGORITHM, settings.SECRET_KEY, settings.PUBLIC_KEY = algorithm, secret_key, public_key
+        keyring.load()
+        for profile in TokenProfile:
+            settings.TOKEN_PROFILE = profile
+            access_token, refresh_token, _ = create_tokens(data, 15, 60)
+            encode_time = timeit.timeit(lambda: create_tokens(data, 15, 60), number=number) / number / 2
+            decode_time = timeit.timeit(lambda: decode_token(access_token), number=number) / number
+            print(
+                f"{algorithm:<10}{profile:<9}{len(access_token):>10}{len(refresh_token):>11}"
+                f"{encode_time * 1e6:>12.1f}{decode_time * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""User search latency on a seeded users table.
+
+Usage: python benchmarks/user_search.py [--users N] [--queries N] [--explain] [--keep]
+Runs against the configured database and only on a test schema (DB_SCHEMA containing TEST_DB_SCHEMA_PREFIX).
+Seeded users have the @bench.example email domain and are deleted afterwards unless --keep is given.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import UUID
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from common.settings import ROOT_DIR, settings  # noqa: E402
+from db.connector import AsyncSession  # noqa: E402
+from repositories.user import UserRepository  # noqa: E402
+from utils.enums import UserRole  # noqa: E402
+
+EMAIL_DOMAIN = "bench.example"
+SYLLABLES = (
+    "al", "an", "ar", "bel", "bor", "ca", "chen", "da", "del", "dor", "el", "en", "fa", "fer", "ga", "gor",
+    "ha", "hel", "i", "is", "ka", "kov", "la", "lin", "ma", "mir", "na", "nor", "o", "ov", "pa", "pet",
+    "ra", "ros", "sa", "sen", "ta", "tor", "u", "va", "ven", "wa", "ya", "zan", "zo",
+)
+SEED_BATCH_SIZE = 50_000
+
+
+def make_user(index: int, rng: random.Random) -> tuple:
+    name = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))).capitalize()
+    surname = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+    login = f"{name.lower()}_{surname.lower()[:8]}{index}"
+    role = rng.choice((UserRole.user, UserRole.user, UserRole.user, UserRole.executor, UserRole.admin))
+    return UUID(int=rng.getrandbits(128)), name, surname, login, f"{login}@{EMAIL_DOMAIN}", "-", role.value
+
+
+def make_text_queries(users: list[tuple], number: int, rng: random.Random) -> list[str]:
+    """Prefixes and inner substrings of seeded names, surnames and logins."""
+    text_queries = []
+    for _ in range(number):
+        value = rng.choice(users)[rng.randint(1, 3)].lower()
+        length = rng.randint(settings.USER_SEARCH_MIN_LENGTH, min(8, len(value)))
+        start = 0 if rng.random() < 0.5 else rng.randint(0, len(value) - length)
+        text_queries.append(value[start:start + length])
+    return text_queries
+
+
+async def seed(users_count: int, rng: random.Random) -> list[tuple]:
+    users = []
+    async with AsyncSession() as session:
+        for start in range(0, users_count, SEED_BATCH_SIZE):
+            batch = [make_user(index, rng) for index in range(start, min(start + SEED_BATCH_SIZE, users_count))]
+            await UserRepository.copy_users(session, batch)
+            await session.commit()
+            users.extend(batch[:1000])
+        await session.execute(text(f"ANALYZE {settings.DB_SCHEMA}.users"))
+    return users
+
+
+async def run(text_queries: list[str], explain: bool) -> list[float]:
+    latencies = []
+    async with AsyncSession() as session:
+        for text_query in text_queries:
+            started_at = time.perf_counter()
+            await UserRepository.search_users(session, text_query, settings.USER_SEARCH_PAGE_SIZE + 1)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+
+        if explain:
+            escaped = text_queries[0].replace("%", "\\%").replace("_", "\\_")
+            plan = await session.execute(
+                text(
+                    f"EXPLAIN ANALYZE SELECT id FROM {settings.DB_SCHEMA}.users WHERE name ILIKE :pattern "
+                    "OR surname ILIKE :pattern OR login ILIKE :pattern OR email ILIKE :pattern"
+                ),
+                {"pattern": f"%{escaped}%"},
+            )
+            print("\n".join(plan.scalars().all()))
+    return latencies
+
+
+async def cleanup() -> None:
+    async with AsyncSession() as session:
+        await session.execute(text(f"DELETE FROM {settings.DB_SCHEMA}.users WHERE email LIKE '%@{EMAIL_DOMAIN}'"))
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="User search benchmark")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--explain", action="store_true", help="Print the plan of the first query")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded users")
+    args = parser.parse_args()
+    assert settings.TEST_DB_SCHEMA_PREFIX in settings.DB_SCHEMA, "An attempt to use a non-test scheme."
+
+    alembic_cfg = Config(str(ROOT_DIR / "src/alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(ROOT_DIR / "src/migrations"))
+    await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+    rng = random.Random(42)
+    started_at = time.perf_counter()
+    users = await seed(args.users, rng)
+    print(f"seeded {args.users} users in {time.perf_counter() - started_at:.1f} s")
+
+    try:
+        latencies = await run(make_text_queries(users, args.queries, rng), args.explain)
+    finally:
+        if not args.keep:
+            await cleanup()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{args.queries} queries, ms: p50 {quantiles[49]:.2f}  p95 {quantiles[94]:.2f}  p99 {quantiles[98]:.2f}  "
+        f"max {max(latencies):.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
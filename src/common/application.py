@@ -1,13 +1,32 @@
+import asyncio
+import contextlib
 import logging.config
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from starlette.middleware import Middleware
 
-from common import logger, settings
+from common import background, logger, settings
 from common.errors import ApplicationError
 from common.exception_handlers import error_handler, request_validation_error_handler
+from common.loop_monitor import loop_monitor
+from db.connector import DatabaseConnector
+from middleware.concurrency import get_concurrency_middleware
 from middleware.cors import get_cors_middleware
+from middleware.tenant import get_tenant_middleware
+from middleware.tracing import get_tracing_middleware
 from routers.base import router
+from services.audit import AuditService, login_events
+from services.health import HealthService
+from services.login_limiter import LoginRateLimiter
+from services.outbox import OutboxService
+from services.user import UserService
+from services.user_delete import UserDeleteService
+from utils.auth import configure_pwd_context
+from utils.keyring import keyring
+from utils.revocation import revocation_list
+from utils.tenant import for_each_schema, get_tenants
+from utils.tracing import export_spans, finished_spans
 
 
 def setup_exception_handlers(app: FastAPI) -> None:
@@ -16,8 +35,73 @@ def setup_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(ApplicationError, error_handler)
 
 
+def setup_background_tasks() -> None:
+    background.register_task(
+        "revocation_list_refresh", revocation_list.refresh, settings.settings.REVOCATION_REFRESH_INTERVAL
+    )
+    background.register_task("keyring_reload", keyring.reload, settings.settings.SIGNING_KEYS_RELOAD_INTERVAL)
+    login_events.on_batch = background.register_task(
+        "login_audit_flush", AuditService.flush, settings.settings.AUDIT_FLUSH_INTERVAL
+    ).wake
+    background.register_task(
+        "user_purge", for_each_schema(UserDeleteService.purge_deleted), settings.settings.USER_PURGE_INTERVAL
+    )
+    background.register_task(
+        "refresh_rotations_purge",
+        for_each_schema(UserService.purge_refresh_rotations),
+        settings.settings.REFRESH_GRACE_PURGE_INTERVAL,
+    )
+    if settings.settings.LOGIN_RATE_LIMIT_SHARED:
+        background.register_task(
+            "login_rate_limit_purge",
+            for_each_schema(LoginRateLimiter.purge_idle_buckets),
+            settings.settings.LOGIN_RATE_LIMIT_PURGE_INTERVAL,
+        )
+    background.register_task(
+        "outbox_dispatch", for_each_schema(OutboxService.dispatch), settings.settings.OUTBOX_DISPATCH_INTERVAL
+    )
+    if settings.settings.TRACING_ENABLED:
+        finished_spans.on_batch = background.register_task(
+            "tracing_export", export_spans, settings.settings.TRACING_EXPORT_INTERVAL
+        ).wake
+    background.register_task(
+        "login_audit_partitions",
+        for_each_schema(AuditService.maintain_partitions),
+        settings.settings.AUDIT_PARTITION_MAINTENANCE_INTERVAL,
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI):
+    await asyncio.to_thread(configure_pwd_context)
+    await background.start_tasks()
+    if settings.settings.LOOP_MONITOR_INTERVAL:
+        loop_monitor.start()
+    HealthService.warmed_up = True
+    yield
+    HealthService.warmed_up = False
+    loop_monitor.stop()
+    await background.stop_tasks(settings.settings.BACKGROUND_STOP_TIMEOUT)
+    await AuditService.flush()
+    await OutboxService.close()
+    if settings.settings.TRACING_ENABLED:
+        await export_spans()
+    await DatabaseConnector.dispose()
+
+
 def app_setup(app: FastAPI) -> None:
     setup_exception_handlers(app)
+    setup_background_tasks()
+
+
+def get_middleware() -> list[Middleware]:
+    middleware = [get_cors_middleware(settings.settings.CORS_ORIGINS)]
+    if settings.settings.TRACING_ENABLED:
+        middleware.append(get_tracing_middleware())
+    if get_tenants():
+        middleware.append(get_tenant_middleware())
+    middleware.append(get_concurrency_middleware())
+    return middleware
 
 
 def init_app() -> FastAPI:
@@ -27,7 +111,8 @@ def init_app() -> FastAPI:
     app = FastAPI(
         debug=settings.settings.DEBUG,
         title=settings.settings.SERVICE_NAME,
-        middleware=[get_cors_middleware(settings.settings.CORS_ORIGINS)],
+        middleware=get_middleware(),
+        lifespan=lifespan,
     )
     app.include_router(router)
     app_setup(app)
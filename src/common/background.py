@@ -0,0 +1,74 @@
+"""Periodic background tasks running for the lifetime of the application."""
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[None]], interval: float) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.task: asyncio.Task | None = None
+        self.last_run_at: float | None = None
+        self.last_error: str | None = None
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+
+    def wake(self) -> None:
+        """Run the task now instead of waiting for the rest of the interval."""
+        self.wakeup.set()
+
+    def stop(self) -> None:
+        """Exit the loop after the current run, without waiting for the rest of the interval."""
+        self.stopping = True
+        self.wakeup.set()
+
+    async def run(self) -> None:
+        while not self.stopping:
+            try:
+                await self.func()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+                logger.exception("Background task %s failed", self.name)
+            self.last_run_at = time.time()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            self.wakeup.clear()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+tasks: dict[str, PeriodicTask] = {}
+
+
+def register_task(name: str, func: Callable[[], Awaitable[None]], interval: float) -> PeriodicTask:
+    tasks[name] = PeriodicTask(name, func, interval)
+    return tasks[name]
+
+
+async def start_tasks() -> None:
+    for task in tasks.values():
+        task.stopping = False
+        task.wakeup.clear()
+        task.task = asyncio.create_task(task.run(), name=task.name)
+
+
+async def stop_tasks(timeout: float = 0) -> None:
+    """Let the tasks finish their current run for up to `timeout` seconds, then cancel the rest."""
+    running = [task.task for task in tasks.values() if task.task]
+    for task in tasks.values():
+        task.stop()
+    if running and timeout:
+        await asyncio.wait(running, timeout=timeout)
+    for running_task in running:
+        running_task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
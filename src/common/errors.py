@@ -72,6 +72,10 @@ class StatusError409(ApplicationError):
     status = status.HTTP_409_CONFLICT
 
 
+class StatusError422(ApplicationError):
+    status = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class StatusError500(ApplicationError):
     status = status.HTTP_500_INTERNAL_SERVER_ERROR
 
@@ -88,3 +92,13 @@ class ObjectNotFoundError(StatusError404):
 
 class DBConflictError(StatusError409):
     message = "Conflict when working with the database"
+
+
+class UserAlreadyExistsError(StatusError409):
+    message = "The user already exists"
+    context_message = "A user with such {field} already exists"
+
+
+class FileEncodingError(StatusError422):
+    message = "The file is not a valid UTF-8 text"
+    context_message = "Rows up to {field} were imported"
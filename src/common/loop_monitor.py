@@ -0,0 +1,81 @@
+"""Event loop lag monitor with stack capture of the code blocking the loop."""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from common.metrics import Counter, Gauge
+from common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+loop_lag = Gauge("event_loop_lag_seconds", "Scheduling delay of the last event loop heartbeat")
+loop_stalls = Counter("event_loop_stalls_total", "Event loop stalls longer than the lag threshold")
+
+
+class LoopMonitor:
+    """Measure event loop scheduling delay and report what blocks the loop.
+
+    A heartbeat callback scheduled every `interval` records how late it ran. A watchdog thread checks
+    the heartbeat and, when it is older than `interval + threshold`, logs the stack of the loop thread
+    once per stall, while the blocking call is still running. The watchdog checks twice per threshold,
+    so the cost is a few wakeups per second. A zero threshold disables the watchdog.
+    """
+
+    def __init__(self, interval: float, threshold: float) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.check_interval = min(interval, threshold) / 2
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread_id: int | None = None
+        self.handle: asyncio.TimerHandle | None = None
+        self.watchdog: threading.Thread | None = None
+        self.stopped = threading.Event()
+        self.last_beat = time.monotonic()
+        self.reported_beat: float | None = None
+
+    def start(self) -> None:
+        """Start monitoring the running loop, must be called from the loop thread."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.stopped.clear()
+        self.last_beat = time.monotonic()
+        self.handle = self.loop.call_later(self.interval, self._beat, self.last_beat + self.interval)
+        if self.threshold:
+            self.watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+            self.watchdog.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.handle:
+            self.handle.cancel()
+        if self.watchdog:
+            self.watchdog.join()
+        self.handle = self.watchdog = None
+
+    def _beat(self, expected_at: float) -> None:
+        now = time.monotonic()
+        lag = max(0.0, now - expected_at)
+        loop_lag.set(round(lag, 6))
+        if self.threshold and lag > self.threshold:
+            loop_stalls.inc()
+        self.last_beat = now
+        self.handle = self.loop.call_later(self.interval, self._beat, now + self.interval)
+
+    def _watch(self) -> None:
+        while not self.stopped.wait(self.check_interval):
+            beat = self.last_beat
+            stalled_for = time.monotonic() - beat - self.interval
+            if stalled_for > self.threshold and self.reported_beat != beat:
+                self.reported_beat = beat
+                if frame := sys._current_frames().get(self.loop_thread_id):
+                    logger.warning(
+                        "Event loop blocked for %.3fs, blocking call:\n%s",
+                        stalled_for,
+                        "".join(traceback.format_stack(frame)),
+                    )
+
+
+loop_monitor = LoopMonitor(settings.LOOP_MONITOR_INTERVAL, settings.LOOP_LAG_THRESHOLD)
@@ -0,0 +1,49 @@
+"""In-process metrics exposed in the Prometheus text format."""
+from collections import defaultdict
+
+
+class Metric:
+    type: str = ""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.values: dict[tuple, float] = defaultdict(float)
+        registry.append(self)
+
+    def get(self, **labels) -> float:
+        return self.values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.values.items():
+            label_format = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{self.name}{{{label_format}}} {value}" if labels else f"{self.name} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.values[tuple(sorted(labels.items()))] += amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.values[tuple(sorted(labels.items()))] += amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.values[tuple(sorted(labels.items()))] -= amount
+
+
+registry: list[Metric] = []
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in registry) + "\n"
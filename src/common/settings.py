@@ -16,6 +16,13 @@ class Settings(BaseSettings):
     DB_PORT: int = 5432
     DB_NAME: str = "POSTGRES"
     DB_SCHEMA: str = "authorization_service"
+    DB_POOL_SIZE: int = 0
+    DB_POOL_MAX_OVERFLOW: int = 10
+
+    TENANTS: str = ""
+    TENANT_HEADER: str = "X-Tenant"
+    TENANT_HOST_SUFFIX: str = ""
+    TENANT_MIGRATION_CONCURRENCY: int = 4
 
     TEST_DB_SCHEMA_PREFIX: str = "test_"
 
@@ -27,11 +34,116 @@ class Settings(BaseSettings):
 
     ECHO: bool = False
 
+    HEALTH_DB_PROBE_TTL: float = 5
+    HEALTH_DB_PROBE_TIMEOUT: float = 2
+
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORT_FILE: str = "traces.jsonl"
+    TRACING_EXPORT_INTERVAL: float = 5
+    TRACING_BUFFER_SIZE: int = 10_000
+    TRACING_EXPORT_BATCH_SIZE: int = 512
+
+    LOOP_MONITOR_INTERVAL: float = 0.25
+    LOOP_LAG_THRESHOLD: float = 0.1
+
+    CONCURRENCY_CRYPTO_PATHS: str = "/api/v1/users/login,/api/v1/users/registration,/api/v1/users/refresh"
+    CONCURRENCY_EXCLUDED_PATHS: str = "/metrics,/health/live,/health/ready,/api/v1/users/import,/api/v1/users/export"
+    CONCURRENCY_CRYPTO_LIMIT: int = 8
+    CONCURRENCY_CRYPTO_MAX_LIMIT: int = 64
+    CONCURRENCY_CRYPTO_LATENCY_TARGET: float = 0.5
+    CONCURRENCY_DEFAULT_LIMIT: int = 50
+    CONCURRENCY_DEFAULT_MAX_LIMIT: int = 500
+    CONCURRENCY_DEFAULT_LATENCY_TARGET: float = 0.1
+    CONCURRENCY_QUEUE_TIMEOUT: float = 0.5
+
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 1440
+    REFRESH_GRACE_PERIOD: float = 10
+    REFRESH_GRACE_CACHE_SIZE: int = 100_000
+    REFRESH_GRACE_PURGE_INTERVAL: float = 60
 
     SECRET_KEY: str = ""
+    PUBLIC_KEY: str = ""
     ALGORITHM: str = ""
+    TOKEN_PROFILE: str = "full"
+    SIGNING_KEYS_FILE: str = ""
+    SIGNING_KEYS_RELOAD_INTERVAL: float = 60
+
+    REVOCATION_FILTER_CAPACITY: int = 100_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_REFRESH_INTERVAL: float = 5
+
+    PRINCIPAL_CACHE_TTL: float = 0
+    PRINCIPAL_CACHE_SIZE: int = 100_000
+
+    SESSIONS_PAGE_SIZE: int = 50
+    SESSIONS_MAX_PAGE_SIZE: int = 500
+
+    USER_SEARCH_MIN_LENGTH: int = 3
+    USER_SEARCH_PAGE_SIZE: int = 20
+    USER_SEARCH_MAX_PAGE_SIZE: int = 100
+
+    USER_STATS_DAYS: int = 30
+    USER_STATS_MAX_DAYS: int = 366
+
+    USER_ME_CACHE_CONTROL: str = "private, no-cache"
+    USER_EMAIL_CACHE_CONTROL: str = "public, max-age=60"
+    USER_EMAIL_ETAG_CACHE_TTL: float = 30
+    USER_EMAIL_ETAG_CACHE_SIZE: int = 100_000
+
+    INTROSPECTION_MAX_TOKENS: int = 100
+    SERVICE_TOKEN: str = ""
+    INTROSPECTION_CACHE_TTL: float = 5
+    INTROSPECTION_CACHE_SIZE: int = 100_000
+
+    PWD_SCHEMES: str = "bcrypt"
+    PWD_HASH_TARGET_MS: float = 250
+    PWD_BCRYPT_ROUNDS: int | None = None
+    PWD_BCRYPT_MIN_ROUNDS: int = 10
+    PWD_ARGON2_TIME_COST: int = 3
+    PWD_ARGON2_MEMORY_COST: int = 65536
+    PWD_ARGON2_PARALLELISM: int = 4
+    PWD_HASH_WORKERS: int | None = None
+
+    LOGIN_RATE_LIMIT_IP_BURST: int = 30
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 30
+    LOGIN_RATE_LIMIT_LOGIN_BURST: int = 10
+    LOGIN_RATE_LIMIT_LOGIN_PER_MINUTE: float = 5
+    LOGIN_RATE_LIMIT_GLOBAL_BURST: int = 500
+    LOGIN_RATE_LIMIT_GLOBAL_PER_MINUTE: float = 6000
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_RATE_LIMIT_SHARED: bool = False
+    LOGIN_RATE_LIMIT_PURGE_INTERVAL: float = 60
+
+    CLIENT_IP_HEADER: str = ""
+    TRUSTED_PROXIES: str = ""
+
+    AUDIT_BUFFER_SIZE: int = 10_000
+    AUDIT_FLUSH_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 0.5
+    AUDIT_PARTITIONS_AHEAD: int = 2
+    AUDIT_RETENTION_MONTHS: int = 0
+    AUDIT_PARTITION_MAINTENANCE_INTERVAL: float = 3600
+
+    BACKGROUND_STOP_TIMEOUT: float = 5
+
+    USER_DELETE_MAX_IDS: int = 10_000
+    USER_DELETE_BATCH_SIZE: int = 500
+    USER_PURGE_INTERVAL: float = 10
+    USER_PURGE_BATCH_PAUSE: float = 0.05
+
+    OUTBOX_DISPATCH_INTERVAL: float = 1
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_RETRY_DELAY: float = 1
+    OUTBOX_RETRY_MAX_DELAY: float = 300
+    OUTBOX_CLAIM_TIMEOUT: float = 30
+    OUTBOX_WEBHOOK_URLS: str = ""
+    OUTBOX_WEBHOOK_SECRET: str = ""
+    OUTBOX_WEBHOOK_TIMEOUT: float = 5
+
+    IMPORT_BATCH_SIZE: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
 
     LOGGING_LEVEL: str = "DEBUG"
     LOGGING_JSON: bool = True
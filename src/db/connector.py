@@ -1,14 +1,15 @@
 import contextlib
 import logging
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncSessionType
 from sqlalchemy.orm import Session as SessionType
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 from common.settings import settings
+from utils.tenant import get_schema
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format=settings.LOGGING_FORMAT)
@@ -16,22 +17,44 @@ logger.setLevel(logging.INFO)
 
 
 class DatabaseConnector:
-    @staticmethod
-    async def get_async_engine() -> AsyncEngine:
-        return create_async_engine(
-            url=settings.get_db_url(),
-            echo=settings.ECHO,
-            poolclass=NullPool,
+    async_engine: AsyncEngine | None = None
+    schema_session_makers: dict[str, async_sessionmaker] = {}
+    engines: dict[str, Engine] = {}
+    connections_in_use: int = 0
+    peak_connections_in_use: int = 0
+
+    @classmethod
+    def get_async_engine(cls, schema: str | None = None) -> AsyncEngine:
+        """Engine of the schema, a view of the one engine of the process.
+
+        All schemas share its connection pool and compiled statement cache:
+        the schema is put into statements at execution time by `schema_translate_map`.
+        """
+        if cls.async_engine is None:
+            pool_options = (
+                dict(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_POOL_MAX_OVERFLOW)
+                if settings.DB_POOL_SIZE
+                else dict(poolclass=NullPool)
+            )
+            cls.async_engine = create_async_engine(url=settings.get_db_url(), echo=settings.ECHO, **pool_options)
+            event.listen(cls.async_engine.sync_engine.pool, "checkout", cls._on_checkout)
+            event.listen(cls.async_engine.sync_engine.pool, "checkin", cls._on_checkin)
+
+        database_schema = schema or get_schema()
+        return cls.async_engine.execution_options(
+            schema_translate_map={None: database_schema, settings.DB_SCHEMA: database_schema}
         )
 
-    @staticmethod
-    def get_engine(database_schema: str | None = None) -> Engine:
+    @classmethod
+    def get_engine(cls, database_schema: str | None = None) -> Engine:
         db_schema = database_schema or settings.DB_SCHEMA
-        return create_engine(
-            url=settings.get_db_url(async_mode=False),
-            poolclass=NullPool,
-            connect_args={"options": f"-csearch_path={db_schema}"},
-        )
+        if (engine := cls.engines.get(db_schema)) is None:
+            engine = cls.engines[db_schema] = create_engine(
+                url=settings.get_db_url(async_mode=False),
+                poolclass=NullPool,
+                connect_args={"options": f"-csearch_path={db_schema}"},
+            )
+        return engine
 
     @staticmethod
     def get_sessionmaker(
@@ -48,6 +71,47 @@ class DatabaseConnector:
             class_=session_class,
         )
 
+    @classmethod
+    def get_async_sessionmaker(cls, schema: str) -> async_sessionmaker:
+        if (session_maker := cls.schema_session_makers.get(schema)) is None:
+            session_maker = cls.schema_session_makers[schema] = cls.get_sessionmaker(cls.get_async_engine(schema))
+        return session_maker
+
+    @classmethod
+    def _on_checkout(cls, *_) -> None:
+        cls.connections_in_use += 1
+        cls.peak_connections_in_use = max(cls.peak_connections_in_use, cls.connections_in_use)
+
+    @classmethod
+    def _on_checkin(cls, *_) -> None:
+        cls.connections_in_use -= 1
+
+    @classmethod
+    def get_pool_stats(cls) -> dict:
+        """Connections of the async engine in use now and at peak, the peak is the pool_size this worker needs."""
+        pool = cls.async_engine.pool if cls.async_engine is not None else None
+        stats = dict(
+            pool_class=type(pool).__name__ if pool else None,
+            in_use=cls.connections_in_use,
+            peak_in_use=cls.peak_connections_in_use,
+        )
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+                utilization=round(cls.connections_in_use / (pool.size() + settings.DB_POOL_MAX_OVERFLOW), 3),
+            )
+        return stats
+
+    @classmethod
+    async def dispose(cls) -> None:
+        if cls.async_engine is not None:
+            await cls.async_engine.dispose()
+        cls.async_engine = None
+        cls.schema_session_makers.clear()
+
     @classmethod
     @contextlib.contextmanager
     def get_sync_session(cls, schema: str | None = None) -> SessionType:
@@ -62,14 +126,14 @@ class DatabaseConnector:
     @classmethod
     @contextlib.asynccontextmanager
     async def get_async_session(cls, schema: str | None = None) -> AsyncSessionType:
-        """Асинхронный контекстный менеджер подключения к базе данных."""
-        database_schema = schema or settings.DB_SCHEMA
-        session_maker = cls.get_sessionmaker(session_engine=await cls.get_async_engine())
+        """Асинхронный контекстный менеджер подключения к базе данных.
+
+        Без явной схемы используется схема текущего тенанта.
+        """
+        session_maker = cls.get_async_sessionmaker(schema or get_schema())
 
         async with session_maker() as async_session:
             try:
-                conn = await async_session.connection()
-                await conn.execution_options(schema_translate_map={None: database_schema})
                 yield async_session
             except BaseException:
                 await async_session.rollback()
@@ -11,4 +11,5 @@ CONVENTION = {
     "pk": "PK_%(table_name)s",
 }
 EXCLUDE_TABLES = []
+PARTITIONED_TABLES = ["login_events"]
 Base = declarative_base(metadata=MetaData(schema=settings.DB_SCHEMA, naming_convention=CONVENTION))
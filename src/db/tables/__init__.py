@@ -1,5 +1,9 @@
+from db.tables.audit import LoginEvent
 from db.tables.base import BaseModel, CreatedAtMixin, IdMixin, UpdatedAtMixin
-from db.tables.user import Token, User
+from db.tables.outbox import OutboxEvent
+from db.tables.rate_limit import RateLimitBucket
+from db.tables.stats import UserRegistrationDay, UserRoleCount
+from db.tables.user import RefreshRotation, RevokedToken, Token, User
 
 __all__ = [
     "BaseModel",
@@ -8,4 +12,11 @@ __all__ = [
     "UpdatedAtMixin",
     "User",
     "Token",
+    "RateLimitBucket",
+    "RevokedToken",
+    "RefreshRotation",
+    "LoginEvent",
+    "UserRoleCount",
+    "UserRegistrationDay",
+    "OutboxEvent",
 ]
@@ -0,0 +1,20 @@
+"""Audit tables."""
+
+from sqlalchemy import UUID, Boolean, Column, DateTime, String
+
+from db.tables.base import BaseModel
+
+
+class LoginEvent(BaseModel):
+    """Append-only login log, range partitioned by month on created_at."""
+
+    __tablename__ = "login_events"
+    __table_args__ = ({"postgresql_partition_by": "RANGE (created_at)"},)
+
+    id = Column(UUID, primary_key=True, comment="UUID identifier")
+    created_at = Column(DateTime, primary_key=True, comment="Event datetime")
+    user_id = Column(UUID, nullable=True, index=True, comment="User, empty for unknown logins")
+    login_or_email = Column(String(50), nullable=False, comment="Login or email used")
+    success = Column(Boolean, nullable=False, comment="Login result")
+    user_agent = Column(String(100), nullable=False, comment="User device description")
+    ip = Column(String(45), nullable=False, comment="Client IP address")
@@ -0,0 +1,20 @@
+"""Transactional outbox, filled by triggers on users in the transaction of the change."""
+
+from sqlalchemy import UUID, BigInteger, Column, DateTime, Identity, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from db.tables.base import BaseModel
+
+
+class OutboxEvent(BaseModel):
+    """User lifecycle event waiting for delivery, deleted once delivered."""
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, Identity(), primary_key=True, comment="Event sequence number, the delivery order")
+    user_id = Column(UUID, nullable=False, comment="User")
+    event_type = Column(String(30), nullable=False, comment="Event type")
+    payload = Column(JSONB, nullable=False, comment="User data after the change")
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), comment="Event datetime")
+    attempts = Column(Integer, nullable=False, server_default="0", comment="Failed delivery attempts")
+    next_attempt_at = Column(DateTime, nullable=True, comment="Retry datetime after a failed delivery")
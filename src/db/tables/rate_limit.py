@@ -0,0 +1,13 @@
+"""Rate limit tables."""
+
+from sqlalchemy import Column, DateTime, Float, String, func
+
+from db.tables.base import BaseModel
+
+
+class RateLimitBucket(BaseModel):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(150), primary_key=True, comment="Bucket key")
+    tokens = Column(Float, nullable=False, comment="Tokens left")
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), index=True, comment="Last refill datetime")
@@ -0,0 +1,20 @@
+"""Statistics tables, maintained by triggers on users."""
+
+from sqlalchemy import BigInteger, Column, Date, Enum
+
+from db.tables.base import BaseModel
+from utils.enums import UserRole
+
+
+class UserRoleCount(BaseModel):
+    __tablename__ = "user_role_counts"
+
+    role = Column(Enum(UserRole), primary_key=True, comment="User role")
+    count = Column(BigInteger, nullable=False, comment="Users with the role")
+
+
+class UserRegistrationDay(BaseModel):
+    __tablename__ = "user_registrations_daily"
+
+    day = Column(Date, primary_key=True, comment="Registration date")
+    count = Column(BigInteger, nullable=False, comment="Users registered on the day")
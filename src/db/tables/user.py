@@ -1,14 +1,23 @@
 """User tables."""
 
-from sqlalchemy import UUID, Column, Enum, ForeignKey, String, Text
+from sqlalchemy import UUID, Column, DateTime, Enum, ForeignKey, Index, String, Text, text
 
 from common.settings import settings
 from db.tables.base import BaseModel, CreatedAtMixin, IdMixin, UpdatedAtMixin
 from utils.enums import UserRole
 
+SEARCH_COLUMNS = ("name", "surname", "login", "email")
+
 
 class User(BaseModel, IdMixin, CreatedAtMixin, UpdatedAtMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        *(
+            Index(f"IX_users_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in SEARCH_COLUMNS
+        ),
+        Index("IX_users_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     name = Column(String(30), nullable=False, comment="Username")
     surname = Column(String(30), nullable=False, comment="User surname")
@@ -16,13 +25,41 @@ class User(BaseModel, IdMixin, CreatedAtMixin, UpdatedAtMixin):
     email = Column(String(50),  unique=True, nullable=False, comment="User email")
     hashed_pwd = Column(Text, nullable=False, comment="User hashed password")
     role = Column(Enum(UserRole), nullable=False, comment="User role")
+    last_login_at = Column(DateTime, nullable=True, comment="Last successful login datetime")
+    deleted_at = Column(DateTime, nullable=True, comment="Soft deletion datetime, the row is purged later")
 
 
 class Token(BaseModel, CreatedAtMixin):
     __tablename__ = "tokens"
+    __table_args__ = (Index("IX_tokens_subject_created_at", "subject", "created_at", "jti"),)
 
     jti = Column(UUID, primary_key=True, comment="JWT identifier")
     subject = Column(
         UUID, ForeignKey(f"{settings.DB_SCHEMA}.users.id", ondelete="CASCADE"), nullable=False, comment="User"
     )
     user_agent = Column(String(100), nullable=False, comment="User device description")
+
+
+class RevokedToken(BaseModel, CreatedAtMixin):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (Index("IX_revoked_tokens_created_at", "created_at"),)
+
+    jti = Column(UUID, primary_key=True, comment="JWT identifier")
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True, comment="Token expiration datetime")
+
+
+class RefreshRotation(BaseModel):
+    __tablename__ = "refresh_rotations"
+
+    jti = Column(UUID, primary_key=True, comment="Rotated refresh token identifier")
+    subject = Column(
+        UUID,
+        ForeignKey(f"{settings.DB_SCHEMA}.users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="User",
+    )
+    user_agent = Column(String(100), nullable=False, comment="User device description")
+    access_token = Column(Text, nullable=False, comment="Access token issued by the rotation")
+    refresh_token = Column(Text, nullable=False, comment="Refresh token issued by the rotation")
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True, comment="Grace period end datetime")
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class Liveness(BaseModel):
+    status: Literal["ok"] = "ok"
+
+
+class DatabaseHealth(BaseModel):
+    ok: bool
+    latency: float
+    error: str | None = None
+    checked_at: datetime
+
+
+class PoolStats(BaseModel):
+    pool_class: str | None
+    in_use: int
+    peak_in_use: int
+    size: int | None = None
+    max_overflow: int | None = None
+    idle: int | None = None
+    overflow: int | None = None
+    utilization: float | None = None
+
+
+class TaskHealth(BaseModel):
+    alive: bool
+    last_run_at: datetime | None = None
+    last_error: str | None = None
+
+
+class Readiness(BaseModel):
+    status: Literal["ok", "degraded", "unavailable"]
+    warmed_up: bool
+    database: DatabaseHealth
+    pool: PoolStats
+    tasks: dict[str, TaskHealth]
+    loop_lag: float
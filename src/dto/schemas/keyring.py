@@ -0,0 +1,17 @@
+"""Signing keys schemas."""
+
+from datetime import datetime
+
+from pydantic import AwareDatetime, BaseModel, Field
+
+
+class SigningKeyConfig(BaseModel):
+    kid: str = Field(min_length=1, max_length=64, examples=["2025-03"])
+    algorithm: str = Field(examples=["HS256", "EdDSA"])
+    key: str = Field(min_length=1, description="HMAC secret or PEM private key")
+    public_key: str | None = Field(default=None, description="PEM public key, derived from the private key if omitted")
+    active_from: AwareDatetime | None = Field(default=None, description="Signing starts at this moment")
+    expires_at: AwareDatetime | None = Field(default=None, description="Tokens signed by the key are rejected after it")
+
+    def is_expired(self, now: datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
@@ -1,7 +1,10 @@
 """User schemas."""
 
-from pydantic import UUID4, BaseModel, EmailStr, Field, field_validator
+from datetime import date, datetime
 
+from pydantic import UUID4, BaseModel, EmailStr, Field, field_validator, model_validator
+
+from common.settings import settings
 from utils.enums import UserRole
 
 
@@ -39,3 +42,74 @@ class UserAuth(BaseModel):
 
 class UserListResponse(UserBase):
     id: UUID4
+    last_login_at: datetime | None = None
+
+
+class UserSearchPage(BaseModel):
+    items: list[UserListResponse]
+    next_cursor: str | None = None
+
+
+class UserRegistrations(BaseModel):
+    day: date
+    count: int
+
+
+class UserStats(BaseModel):
+    total: int
+    roles: dict[UserRole, int]
+    registrations: list[UserRegistrations]
+
+
+class UserBulkDelete(BaseModel):
+    user_ids: list[UUID4] | None = Field(default=None, min_length=1, max_length=settings.USER_DELETE_MAX_IDS)
+    role: UserRole | None = None
+    created_to: datetime | None = None
+    soft: bool = False
+
+    @model_validator(mode="after")
+    def check_filter(self) -> "UserBulkDelete":
+        if not (self.user_ids or self.role or self.created_to):
+            raise ValueError("One of user_ids, role or created_to must be filled in")
+        return self
+
+
+class UserBulkDeleteResult(BaseModel):
+    deleted: int
+
+
+class UserImport(UserCreate):
+    user_agent: str | None = None
+
+
+class UserImportError(BaseModel):
+    row: int
+    detail: str | list
+
+
+class UserImportResult(BaseModel):
+    imported: int
+    last_row: int
+    errors: list[UserImportError]
+
+
+class TokenIntrospectionRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    sub: UUID4 | None = None
+    role: UserRole | None = None
+    exp: int | None = None
+
+
+class Session(BaseModel):
+    jti: UUID4
+    user_agent: str
+    created_at: datetime
+
+
+class SessionPage(BaseModel):
+    items: list[Session]
+    next_cursor: str | None = None
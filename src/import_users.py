@@ -0,0 +1,39 @@
+"""Bulk users import from a CSV or NDJSON file.
+
+Usage: python src/import_users.py users.csv [--format ndjson] [--skip-rows N] [--batch-size N]
+"""
+import argparse
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from common import settings
+from services.user_import import UserImportService, decode_lines
+from utils.enums import DataFormat
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk users import")
+    parser.add_argument("path", help="CSV (with header) or NDJSON file with users")
+    parser.add_argument("--format", type=DataFormat, choices=list(DataFormat), default=DataFormat.csv)
+    parser.add_argument("--skip-rows", type=int, default=0, help="Resume after this row (last_row of a previous run)")
+    parser.add_argument("--batch-size", type=int, default=settings.settings.IMPORT_BATCH_SIZE)
+    return parser.parse_args()
+
+
+async def read_chunks(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def main() -> None:
+    args = parse_args()
+    result = await UserImportService.import_users(
+        decode_lines(read_chunks(args.path)), args.format, args.skip_rows, args.batch_size
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""Adaptive concurrency limit and load shedding middleware."""
+import asyncio
+import contextlib
+import time
+from collections import deque
+
+from fastapi import status
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.metrics import Counter, Gauge
+from common.settings import settings
+from dto.schemas.exception import HandledExceptionSchema
+
+concurrency_limit = Gauge("concurrency_limit", "Current adaptive concurrency limit")
+concurrency_in_flight = Gauge("concurrency_in_flight", "Requests being processed")
+concurrency_shed = Counter("concurrency_shed_total", "Requests rejected after waiting longer than the queue timeout")
+
+
+class AIMDLimiter:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease.
+
+    The limit grows by about one per window of successful requests faster than `latency_target`
+    and shrinks by `backoff` on every slow or failed request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_limit: int,
+        latency_target: float,
+        queue_timeout: float,
+        min_limit: int = 1,
+        backoff: float = 0.9,
+    ) -> None:
+        self.name = name
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        concurrency_limit.set(limit, route_class=name)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting at most `queue_timeout` for it. Returns False if the request should be shed."""
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self._take()
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                with contextlib.suppress(ValueError):
+                    self.waiters.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+        return True
+
+    def release(self, latency: float | None = None, success: bool = True) -> None:
+        if latency is not None:
+            if not success or latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            concurrency_limit.set(round(self.limit, 2), route_class=self.name)
+
+        self.in_flight -= 1
+        while self.waiters and self.in_flight < int(self.limit):
+            if not (waiter := self.waiters.popleft()).done():
+                self._take()
+                waiter.set_result(None)
+        concurrency_in_flight.set(self.in_flight, route_class=self.name)
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        concurrency_in_flight.set(self.in_flight, route_class=self.name)
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(
+        self, app: ASGIApp, limiters: dict[str, AIMDLimiter], routes: dict[str, str], excluded: set[str]
+    ) -> None:
+        self.app = app
+        self.limiters = limiters
+        self.routes = routes
+        self.excluded = excluded
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[self.routes.get(scope["path"], "default")]
+        if not await limiter.acquire():
+            concurrency_shed.inc(route_class=limiter.name)
+            schema = HandledExceptionSchema(
+                message="Service is overloaded", status=status.HTTP_503_SERVICE_UNAVAILABLE, context=""
+            )
+            response = JSONResponse(
+                content=schema.model_dump(), status_code=schema.status, headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(time.perf_counter() - started_at, status_code < status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def get_concurrency_middleware() -> Middleware:
+    limiters = {
+        "crypto": AIMDLimiter(
+            "crypto",
+            settings.CONCURRENCY_CRYPTO_LIMIT,
+            settings.CONCURRENCY_CRYPTO_MAX_LIMIT,
+            settings.CONCURRENCY_CRYPTO_LATENCY_TARGET,
+            settings.CONCURRENCY_QUEUE_TIMEOUT,
+        ),
+        "default": AIMDLimiter(
+            "default",
+            settings.CONCURRENCY_DEFAULT_LIMIT,
+            settings.CONCURRENCY_DEFAULT_MAX_LIMIT,
+            settings.CONCURRENCY_DEFAULT_LATENCY_TARGET,
+            settings.CONCURRENCY_QUEUE_TIMEOUT,
+        ),
+    }
+    return Middleware(
+        ConcurrencyLimitMiddleware,
+        limiters=limiters,
+        routes={path: "crypto" for path in settings.CONCURRENCY_CRYPTO_PATHS.split(",")},
+        excluded=set(settings.CONCURRENCY_EXCLUDED_PATHS.split(",")),
+    )
@@ -0,0 +1,54 @@
+"""Tenant resolution middleware."""
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from common.settings import settings
+from dto.schemas.exception import HandledExceptionSchema
+from utils.tenant import get_tenant_schema, get_tenants, use_schema
+
+
+class TenantMiddleware:
+    """Serve the request from the schema of the tenant named by the tenant header or the host.
+
+    The header wins over the host. Requests naming no tenant use the default schema.
+    """
+
+    def __init__(self, app: ASGIApp, tenants: frozenset[str], header: str, host_suffix: str) -> None:
+        self.app = app
+        self.header = header
+        self.host_suffix = host_suffix
+        self.schemas = {tenant: get_tenant_schema(tenant) for tenant in tenants}
+
+    def get_tenant(self, scope: Scope) -> str | None:
+        headers = Headers(scope=scope)
+        if tenant := headers.get(self.header):
+            return tenant.lower()
+        host = headers.get("host", "").split(":")[0].lower()
+        if self.host_suffix and host.endswith(self.host_suffix):
+            return host[:-len(self.host_suffix)] or None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (tenant := self.get_tenant(scope)) is None:
+            await self.app(scope, receive, send)
+            return
+
+        if (schema := self.schemas.get(tenant)) is None:
+            error = HandledExceptionSchema(message="Unknown tenant", status=status.HTTP_404_NOT_FOUND, context=tenant)
+            await JSONResponse(content=error.model_dump(), status_code=error.status)(scope, receive, send)
+            return
+
+        with use_schema(schema):
+            await self.app(scope, receive, send)
+
+
+def get_tenant_middleware() -> Middleware:
+    return Middleware(
+        TenantMiddleware,
+        tenants=get_tenants(),
+        header=settings.TENANT_HEADER,
+        host_suffix=settings.TENANT_HOST_SUFFIX.lower(),
+    )
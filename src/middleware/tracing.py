@@ -0,0 +1,44 @@
+"""Request tracing middleware."""
+from starlette.datastructures import Headers
+from starlette.middleware import Middleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.tracing import start_trace
+
+
+class TracingMiddleware:
+    """Record a server span per sampled request, named after the matched route.
+
+    The trace of the caller's `traceparent` header is continued, the response carries
+    the span in a `traceresponse` header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = Headers(scope=scope).get("traceparent")
+        with start_trace(scope["path"], traceparent, **{"http.method": scope["method"]}) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [*message.get("headers", []), (b"traceresponse", span.traceparent.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                span.name = f"{scope['method']} {route.path if route else scope['path']}"
+
+
+def get_tracing_middleware() -> Middleware:
+    return Middleware(TracingMiddleware)
@@ -3,19 +3,28 @@ from alembic import context
 
 from common.settings import settings
 from db.connector import DatabaseConnector
-from db.declarative import EXCLUDE_TABLES
+from db.declarative import EXCLUDE_TABLES, PARTITIONED_TABLES
 from db.tables.base import BaseModel
+from utils.tenant import get_tenant_schemas
 
 config = context.config
 
 target_metadata = BaseModel.metadata
 config.set_main_option("sqlalchemy.url", settings.get_db_url(async_mode=False))
 
+# Схема мигрируемого тенанта: alembic -x schema=<schema> upgrade head
+schema = context.get_x_argument(as_dictionary=True).get("schema", settings.DB_SCHEMA)
+if schema not in get_tenant_schemas():
+    raise ValueError(f"Unknown schema {schema}")
+settings.DB_SCHEMA = schema
+
 
 def include_object(object, name, type_, reflected, compare_to):
     """Включать в миграцию те или иные сущности БД, или нет."""
     if type_ == "table" and name in EXCLUDE_TABLES:
         return False
+    if type_ == "table" and compare_to is None and any(name.startswith(f"{table}_") for table in PARTITIONED_TABLES):
+        return False
     return True
 
 
@@ -52,23 +61,23 @@ def run_migrations_online() -> None:
 
     def include_name(name, type_, parent_names):
         if type_ == "schema":
-            return name in [target_metadata.schema]
+            return name in [schema]
         else:
             return True
 
-    migration_engine = DatabaseConnector.get_engine()
+    migration_engine = DatabaseConnector.get_engine(schema)
 
     with migration_engine.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
             include_schemas=True,
-            version_table_schema=target_metadata.schema,
+            version_table_schema=schema,
             include_name=include_name,
             include_object=include_object,
         )
-        connection.execute(sa.text(f"CREATE SCHEMA IF NOT EXISTS {settings.DB_SCHEMA};"))
-        connection.execute(sa.text('set search_path to "{}", public'.format(settings.DB_SCHEMA)))
+        connection.execute(sa.text(f"CREATE SCHEMA IF NOT EXISTS {schema};"))
+        connection.execute(sa.text('set search_path to "{}", public'.format(schema)))
 
         with context.begin_transaction():
             context.run_migrations()
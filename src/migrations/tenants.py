@@ -0,0 +1,60 @@
+"""Upgrade the default schema and the schemas of all tenants, several schemas at a time.
+
+Every schema is migrated by its own alembic process, so a failed schema does not stop the others.
+
+Usage: python src/migrations/tenants.py [--revision REV] [--concurrency N]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.settings import ROOT_DIR, settings  # noqa: E402
+from utils.tenant import get_tenant_schemas  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+async def upgrade_schema(schema: str, revision: str, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "alembic", "-c", str(ROOT_DIR / "src/alembic.ini"),
+            "-x", f"schema={schema}", "upgrade", revision,
+            cwd=ROOT_DIR,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        output, _ = await process.communicate()
+
+    if process.returncode:
+        logger.error("Schema %s failed to upgrade to %s:\n%s", schema, revision, output.decode())
+        return False
+    logger.info("Schema %s upgraded to %s", schema, revision)
+    return True
+
+
+async def upgrade_schemas(schemas: list[str], revision: str, concurrency: int) -> list[str]:
+    """Returns the schemas that failed to upgrade."""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(upgrade_schema(schema, revision, semaphore) for schema in schemas))
+    return [schema for schema, upgraded in zip(schemas, results) if not upgraded]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revision", default="head")
+    parser.add_argument("--concurrency", type=int, default=settings.TENANT_MIGRATION_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(format=settings.LOGGING_FORMAT, level=logging.INFO)
+
+    schemas = get_tenant_schemas()
+    if failed := asyncio.run(upgrade_schemas(schemas, args.revision, args.concurrency)):
+        logger.error("%s of %s schemas failed: %s", len(failed), len(schemas), ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
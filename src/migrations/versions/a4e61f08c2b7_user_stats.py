@@ -0,0 +1,109 @@
+"""user stats
+
+Revision ID: a4e61f08c2b7
+Revises: f1c7a2e94d36
+Create Date: 2025-03-14 16:03:27.415892
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e61f08c2b7'
+down_revision: Union[str, None] = 'f1c7a2e94d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DB_SCHEMA
+
+# Statement level triggers aggregate their transition tables, so a bulk insert updates every counter once.
+# Counter rows are locked in role order to avoid deadlocks between concurrent statements.
+TRIGGERS_SQL = f"""
+CREATE FUNCTION {SCHEMA}.add_user_update_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.user_role_counts AS counts (role, count)
+    SELECT role, sum(delta) FROM (
+        SELECT role, 1 AS delta FROM new_users
+        UNION ALL
+        SELECT role, -1 AS delta FROM old_users
+    ) AS changes
+    GROUP BY role HAVING sum(delta) <> 0 ORDER BY role
+    ON CONFLICT (role) DO UPDATE SET count = counts.count + EXCLUDED.count;
+    RETURN NULL;
+END $$;
+
+CREATE FUNCTION {SCHEMA}.add_user_insert_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.user_role_counts AS counts (role, count)
+    SELECT role, count(*) FROM new_users GROUP BY role ORDER BY role
+    ON CONFLICT (role) DO UPDATE SET count = counts.count + EXCLUDED.count;
+    INSERT INTO {SCHEMA}.user_registrations_daily AS days (day, count)
+    SELECT created_at::date, count(*) FROM new_users GROUP BY 1 ORDER BY 1
+    ON CONFLICT (day) DO UPDATE SET count = days.count + EXCLUDED.count;
+    RETURN NULL;
+END $$;
+
+CREATE FUNCTION {SCHEMA}.add_user_delete_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.user_role_counts AS counts (role, count)
+    SELECT role, -count(*) FROM old_users GROUP BY role ORDER BY role
+    ON CONFLICT (role) DO UPDATE SET count = counts.count + EXCLUDED.count;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER users_insert_stats AFTER INSERT ON {SCHEMA}.users
+REFERENCING NEW TABLE AS new_users FOR EACH STATEMENT EXECUTE FUNCTION {SCHEMA}.add_user_insert_stats();
+
+CREATE TRIGGER users_update_stats AFTER UPDATE ON {SCHEMA}.users
+REFERENCING OLD TABLE AS old_users NEW TABLE AS new_users FOR EACH STATEMENT
+EXECUTE FUNCTION {SCHEMA}.add_user_update_stats();
+
+CREATE TRIGGER users_delete_stats AFTER DELETE ON {SCHEMA}.users
+REFERENCING OLD TABLE AS old_users FOR EACH STATEMENT EXECUTE FUNCTION {SCHEMA}.add_user_delete_stats();
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('user_role_counts',
+    sa.Column(
+        'role',
+        postgresql.ENUM('admin', 'user', 'executor', name='userrole', create_type=False),
+        nullable=False,
+        comment='User role',
+    ),
+    sa.Column('count', sa.BigInteger(), nullable=False, comment='Users with the role'),
+    sa.PrimaryKeyConstraint('role', name=op.f('PK_user_role_counts')),
+    schema=settings.DB_SCHEMA
+    )
+    op.create_table('user_registrations_daily',
+    sa.Column('day', sa.Date(), nullable=False, comment='Registration date'),
+    sa.Column('count', sa.BigInteger(), nullable=False, comment='Users registered on the day'),
+    sa.PrimaryKeyConstraint('day', name=op.f('PK_user_registrations_daily')),
+    schema=settings.DB_SCHEMA
+    )
+    # ### end Alembic commands ###
+    op.execute(TRIGGERS_SQL)
+    op.execute(
+        f"INSERT INTO {SCHEMA}.user_role_counts (role, count) SELECT role, count(*) FROM {SCHEMA}.users GROUP BY role"
+    )
+    op.execute(
+        f"INSERT INTO {SCHEMA}.user_registrations_daily (day, count) "
+        f"SELECT created_at::date, count(*) FROM {SCHEMA}.users GROUP BY 1"
+    )
+
+
+def downgrade() -> None:
+    for trigger in ('users_insert_stats', 'users_update_stats', 'users_delete_stats'):
+        op.execute(f'DROP TRIGGER {trigger} ON {SCHEMA}.users')
+    for function in ('add_user_insert_stats', 'add_user_update_stats', 'add_user_delete_stats'):
+        op.execute(f'DROP FUNCTION {SCHEMA}.{function}()')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('user_registrations_daily', schema=settings.DB_SCHEMA)
+    op.drop_table('user_role_counts', schema=settings.DB_SCHEMA)
+    # ### end Alembic commands ###
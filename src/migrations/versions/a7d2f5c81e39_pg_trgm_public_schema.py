@@ -0,0 +1,39 @@
+"""pg_trgm in public schema
+
+Revision ID: a7d2f5c81e39
+Revises: e2a6c9d3f814
+Create Date: 2025-04-02 10:47:13.285064
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2f5c81e39'
+down_revision: Union[str, None] = 'e2a6c9d3f814'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Earlier versions of f1c7a2e94d36 installed pg_trgm into the schema being migrated, where the unqualified
+# similarity() calls of the service connections do not find it. The extension is relocatable, indexes
+# using its operator classes are kept.
+MOVE_EXTENSION_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_extension JOIN pg_namespace ON pg_namespace.oid = pg_extension.extnamespace
+        WHERE pg_extension.extname = 'pg_trgm' AND pg_namespace.nspname <> 'public'
+    ) THEN
+        ALTER EXTENSION pg_trgm SET SCHEMA public;
+    END IF;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(MOVE_EXTENSION_SQL)
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,104 @@
+"""outbox events
+
+Revision ID: b3e9d1f27a64
+Revises: c8f2d5a7e391
+Create Date: 2025-03-20 10:21:53.184406
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from common.settings import settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9d1f27a64'
+down_revision: Union[str, None] = 'c8f2d5a7e391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DB_SCHEMA
+
+# Events are written by statement level triggers, so every change of users, including COPY imports and
+# plain SQL, is announced in its own transaction. Soft deleted users are announced when they are marked.
+TRIGGERS_SQL = f"""
+CREATE FUNCTION {SCHEMA}.add_user_insert_events() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.outbox_events (user_id, event_type, payload)
+    SELECT id, 'user.created', jsonb_build_object('id', id, 'email', email, 'role', role)
+    FROM new_users ORDER BY id;
+    RETURN NULL;
+END $$;
+
+CREATE FUNCTION {SCHEMA}.add_user_update_events() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.outbox_events (user_id, event_type, payload)
+    SELECT new_users.id,
+        CASE WHEN new_users.deleted_at IS NULL THEN 'user.updated' ELSE 'user.deleted' END,
+        CASE WHEN new_users.deleted_at IS NULL
+            THEN jsonb_build_object('id', new_users.id, 'email', new_users.email, 'role', new_users.role)
+            ELSE jsonb_build_object('id', new_users.id)
+        END
+    FROM new_users JOIN old_users ON old_users.id = new_users.id
+    WHERE old_users.deleted_at IS NULL AND (
+        new_users.deleted_at IS NOT NULL
+        OR new_users.email <> old_users.email
+        OR new_users.role <> old_users.role
+    )
+    ORDER BY new_users.id;
+    RETURN NULL;
+END $$;
+
+CREATE FUNCTION {SCHEMA}.add_user_delete_events() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {SCHEMA}.outbox_events (user_id, event_type, payload)
+    SELECT id, 'user.deleted', jsonb_build_object('id', id)
+    FROM old_users WHERE deleted_at IS NULL ORDER BY id;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER users_insert_events AFTER INSERT ON {SCHEMA}.users
+REFERENCING NEW TABLE AS new_users FOR EACH STATEMENT EXECUTE FUNCTION {SCHEMA}.add_user_insert_events();
+
+CREATE TRIGGER users_update_events AFTER UPDATE ON {SCHEMA}.users
+REFERENCING OLD TABLE AS old_users NEW TABLE AS new_users FOR EACH STATEMENT
+EXECUTE FUNCTION {SCHEMA}.add_user_update_events();
+
+CREATE TRIGGER users_delete_events AFTER DELETE ON {SCHEMA}.users
+REFERENCING OLD TABLE AS old_users FOR EACH STATEMENT EXECUTE FUNCTION {SCHEMA}.add_user_delete_events();
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('outbox_events',
+    sa.Column(
+        'id',
+        sa.BigInteger(),
+        sa.Identity(always=False),
+        nullable=False,
+        comment='Event sequence number, the delivery order',
+    ),
+    sa.Column('user_id', sa.UUID(), nullable=False, comment='User'),
+    sa.Column('event_type', sa.String(length=30), nullable=False, comment='Event type'),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False, comment='User data after the change'),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False, comment='Event datetime'),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False, comment='Failed delivery attempts'),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True, comment='Retry datetime after a failed delivery'),
+    sa.PrimaryKeyConstraint('id', name=op.f('PK_outbox_events')),
+    schema=settings.DB_SCHEMA
+    )
+    # ### end Alembic commands ###
+    op.execute(TRIGGERS_SQL)
+
+
+def downgrade() -> None:
+    for trigger in ('users_insert_events', 'users_update_events', 'users_delete_events'):
+        op.execute(f'DROP TRIGGER {trigger} ON {SCHEMA}.users')
+    for function in ('add_user_insert_events', 'add_user_update_events', 'add_user_delete_events'):
+        op.execute(f'DROP FUNCTION {SCHEMA}.{function}()')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('outbox_events', schema=settings.DB_SCHEMA)
+    # ### end Alembic commands ###
@@ -0,0 +1,82 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import insert, text
+
+from db.connector import AsyncSession
+from db.tables import LoginEvent
+from utils.tenant import get_schema
+
+
+class AuditRepository:
+
+    @staticmethod
+    async def insert_login_events(session: AsyncSession, events: list[dict]) -> None:
+        await session.execute(insert(LoginEvent), events)
+
+    @staticmethod
+    async def update_last_login_at(session: AsyncSession, last_logins: dict[UUID, datetime]) -> None:
+        """Set last_login_at of many users in one statement, never moving it backwards.
+
+        updated_at is left as is, a login does not change the user data.
+        """
+        await session.execute(
+            text(
+                f"UPDATE {get_schema()}.users AS users SET last_login_at = logins.logged_in_at "
+                "FROM unnest(CAST(:user_ids AS UUID[]), CAST(:logged_in_at AS TIMESTAMP[])) "
+                "AS logins (user_id, logged_in_at) "
+                "WHERE users.id = logins.user_id "
+                "AND (users.last_login_at IS NULL OR users.last_login_at < logins.logged_in_at)"
+            ),
+            {"user_ids": list(last_logins), "logged_in_at": list(last_logins.values())},
+        )
+
+    @staticmethod
+    async def create_login_events_partition(session: AsyncSession, name: str, start: date, end: date) -> None:
+        """Create the partition, moving its rows out of the default partition if there are any.
+
+        A range can not be attached while the default partition holds rows of it, so the default partition
+        is detached for the move and attached again. Locks login_events until the transaction ends.
+        """
+        schema = get_schema()
+        period = {"start": start, "end": end}
+        in_period = "created_at >= :start AND created_at < :end"
+        has_default_rows = await session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {schema}.login_events_default WHERE {in_period})"), period
+        )
+        has_default_rows = has_default_rows.scalar()
+
+        if has_default_rows:
+            await session.execute(
+                text(f"ALTER TABLE {schema}.login_events DETACH PARTITION {schema}.login_events_default")
+            )
+        await session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {schema}.{name} PARTITION OF {schema}.login_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        if has_default_rows:
+            await session.execute(text(
+                f"WITH moved AS (DELETE FROM {schema}.login_events_default WHERE {in_period} RETURNING *) "
+                f"INSERT INTO {schema}.login_events SELECT * FROM moved"
+            ), period)
+            await session.execute(
+                text(f"ALTER TABLE {schema}.login_events ATTACH PARTITION {schema}.login_events_default DEFAULT")
+            )
+
+    @staticmethod
+    async def select_login_events_partitions(session: AsyncSession) -> list[str]:
+        result = await session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class AS parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class AS child ON pg_inherits.inhrelid = child.oid "
+                "JOIN pg_namespace ON parent.relnamespace = pg_namespace.oid "
+                "WHERE parent.relname = 'login_events' AND pg_namespace.nspname = :schema"
+            ),
+            {"schema": get_schema()},
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def drop_login_events_partition(session: AsyncSession, name: str) -> None:
+        await session.execute(text(f"DROP TABLE IF EXISTS {get_schema()}.{name}"))
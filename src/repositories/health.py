@@ -0,0 +1,10 @@
+from sqlalchemy import select
+
+from db.connector import AsyncSession
+
+
+class HealthRepository:
+
+    @staticmethod
+    async def ping(session: AsyncSession) -> None:
+        await session.execute(select(1))
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine.row import Row
+
+from db.connector import AsyncSession
+from db.tables import OutboxEvent
+from utils.tenant import get_schema
+
+
+class OutboxRepository:
+
+    @staticmethod
+    async def try_lock_dispatch(session: AsyncSession) -> bool:
+        """Take the dispatch lock of the current schema until the end of the transaction, False if it is taken."""
+        query = select(func.pg_try_advisory_xact_lock(func.hashtext(f"{get_schema()}.outbox_events")))
+        result = await session.execute(query)
+        return result.scalar()
+
+    @staticmethod
+    async def select_oldest_events(session: AsyncSession, limit: int) -> list[Row]:
+        query = (
+            select(
+                OutboxEvent.id,
+                OutboxEvent.user_id,
+                OutboxEvent.event_type,
+                OutboxEvent.payload,
+                OutboxEvent.created_at,
+                OutboxEvent.attempts,
+                OutboxEvent.next_attempt_at,
+            )
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def delete_events(session: AsyncSession, event_ids: list[int]) -> None:
+        await session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids)))
+
+    @staticmethod
+    async def postpone_events(session: AsyncSession, event_ids: list[int], next_attempt_at: datetime) -> None:
+        query = (
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(event_ids))
+            .values(attempts=OutboxEvent.attempts + 1, next_attempt_at=next_attempt_at)
+        )
+        await session.execute(query)
+
+    @staticmethod
+    async def claim_events(session: AsyncSession, event_ids: list[int], claimed_until: datetime) -> None:
+        """Hold the events back from other dispatchers while they are delivered, without counting an attempt."""
+        query = update(OutboxEvent).where(OutboxEvent.id.in_(event_ids)).values(next_attempt_at=claimed_until)
+        await session.execute(query)
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from db.connector import AsyncSession
+from db.tables import RateLimitBucket
+
+
+class RateLimitRepository:
+
+    @staticmethod
+    async def take_token(session: AsyncSession, key: str, capacity: int, rate: float) -> bool:
+        """Refill the shared bucket and take one token from it in a single statement.
+
+        `rate` is the number of tokens added per second. Returns False if the bucket is empty.
+        """
+        refilled = func.least(
+            capacity, RateLimitBucket.tokens + func.extract("epoch", func.now() - RateLimitBucket.updated_at) * rate
+        )
+        query = (
+            insert(RateLimitBucket)
+            .values(key=key, tokens=capacity - 1)
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": refilled - 1, "updated_at": func.now()},
+                where=refilled >= 1,
+            )
+            .returning(RateLimitBucket.tokens)
+        )
+        result = await session.execute(query)
+        return result.scalar() is not None
+
+    @staticmethod
+    async def delete_idle(session: AsyncSession, prefix: str, idle_seconds: float) -> None:
+        """Delete the buckets under `prefix` that have not been touched for `idle_seconds`.
+
+        A bucket idle for its whole refill time is full, which is the same as a missing bucket.
+        """
+        query = delete(RateLimitBucket).where(
+            RateLimitBucket.updated_at < func.now() - timedelta(seconds=idle_seconds),
+            RateLimitBucket.key.startswith(prefix, autoescape=True),
+        )
+        await session.execute(query)
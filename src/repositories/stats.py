@@ -0,0 +1,26 @@
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.engine.row import Row
+
+from db.connector import AsyncSession
+from db.tables import UserRegistrationDay, UserRoleCount
+from utils.enums import UserRole
+
+
+class StatsRepository:
+
+    @staticmethod
+    async def select_role_counts(session: AsyncSession) -> dict[UserRole, int]:
+        result = await session.execute(select(UserRoleCount.role, UserRoleCount.count))
+        return {row.role: row.count for row in result.all()}
+
+    @staticmethod
+    async def select_registrations(session: AsyncSession, day_from: date) -> list[Row]:
+        query = (
+            select(UserRegistrationDay.day, UserRegistrationDay.count)
+            .where(UserRegistrationDay.day >= day_from)
+            .order_by(UserRegistrationDay.day)
+        )
+        result = await session.execute(query)
+        return result.all()
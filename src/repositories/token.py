@@ -0,0 +1,94 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine.row import Row
+
+from db.connector import AsyncSession
+from db.tables import RefreshRotation, RevokedToken, Token
+
+
+class RevokedTokenRepository:
+
+    @staticmethod
+    async def insert_revoked_token(session: AsyncSession, jti: str, expires_at: datetime) -> None:
+        query = insert(RevokedToken).values(jti=jti, expires_at=expires_at).on_conflict_do_nothing()
+        await session.execute(query)
+
+    @staticmethod
+    async def is_revoked(session: AsyncSession, jti: str) -> bool:
+        query = select(RevokedToken.jti).where(RevokedToken.jti == jti)
+        result = await session.execute(query)
+        return result.scalar() is not None
+
+    @staticmethod
+    async def select_revoked_jtis(session: AsyncSession, jtis: set[str]) -> set[str]:
+        query = select(RevokedToken.jti).where(RevokedToken.jti.in_(list(jtis)))
+        result = await session.execute(query)
+        return {str(jti) for jti in result.scalars().all()}
+
+    @staticmethod
+    async def select_active(session: AsyncSession, created_after: datetime | None = None) -> list[Row]:
+        """Select not yet expired revoked tokens, optionally only those created after `created_after`."""
+        query = select(RevokedToken.jti, RevokedToken.created_at).where(RevokedToken.expires_at > func.now())
+        if created_after:
+            query = query.where(RevokedToken.created_at > created_after)
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def delete_expired(session: AsyncSession) -> None:
+        query = delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+        await session.execute(query)
+
+
+class RefreshRotationRepository:
+
+    @staticmethod
+    async def insert_rotation(session: AsyncSession, rotation_data: dict) -> None:
+        await session.execute(insert(RefreshRotation).values(**rotation_data).on_conflict_do_nothing())
+
+    @staticmethod
+    async def get_rotation(session: AsyncSession, jti: str) -> Row | None:
+        """Tokens issued by the rotation of `jti` while its grace period lasts."""
+        query = (
+            select(RefreshRotation.user_agent, RefreshRotation.access_token, RefreshRotation.refresh_token)
+            .where(and_(RefreshRotation.jti == jti, RefreshRotation.expires_at > func.now()))
+        )
+        result = await session.execute(query)
+        return result.one_or_none()
+
+    @staticmethod
+    async def delete_expired(session: AsyncSession) -> None:
+        query = delete(RefreshRotation).where(RefreshRotation.expires_at <= func.now())
+        await session.execute(query)
+
+
+class SessionRepository:
+
+    @staticmethod
+    async def select_sessions(
+        session: AsyncSession,
+        user_id: str,
+        created_after: datetime,
+        limit: int,
+        before: tuple[datetime, UUID] | None = None,
+    ) -> list[Row]:
+        """Select refresh sessions newest first, one keyset page served by IX_tokens_subject_created_at."""
+        query = (
+            select(Token.jti, Token.user_agent, Token.created_at)
+            .where(and_(Token.subject == user_id, Token.created_at > created_after))
+            .order_by(Token.created_at.desc(), Token.jti.desc())
+            .limit(limit)
+        )
+        if before:
+            query = query.where(tuple_(Token.created_at, Token.jti) < tuple_(*before))
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def delete_session(session: AsyncSession, user_id: str, jti: str) -> bool:
+        query = delete(Token).where(and_(Token.subject == user_id, Token.jti == jti)).returning(Token.jti)
+        result = await session.execute(query)
+        return result.scalar() is not None
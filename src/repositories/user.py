@@ -1,52 +1,186 @@
-from uuid import uuid4
+from datetime import datetime
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, delete, select
+from sqlalchemy import Float, and_, case, cast, delete, func, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine.row import Row
+from sqlalchemy.ext.asyncio import AsyncResult
+from sqlalchemy.sql.elements import ColumnElement
 
 from db.connector import AsyncSession
-from db.tables import Token, User
+from db.tables import RefreshRotation, Token, User
+from db.tables.user import SEARCH_COLUMNS
 from utils.enums import UserRole
+from utils.principal import Principal
+from utils.tenant import get_schema
+from utils.tracing import traced
+
+USER_IMPORT_COLUMNS = ("id", "name", "surname", "login", "email", "hashed_pwd", "role")
 
 
 class UserRepository:
 
     @staticmethod
-    async def insert_user_data(session: AsyncSession, user_data: dict) -> uuid4:
-        user_id = uuid4()
-        user = User(id=user_id, **user_data)
-        session.add(user)
-        return user_id
+    async def insert_user_data(session: AsyncSession, user_data: dict) -> UUID | None:
+        """Insert a user unless the login or email is taken, returns the id of the inserted user."""
+        query = insert(User).values(id=uuid4(), **user_data).on_conflict_do_nothing().returning(User.id)
+        result = await session.execute(query)
+        return result.scalar()
 
     @staticmethod
+    async def select_taken_fields(session: AsyncSession, login: str, email: str) -> list[str]:
+        query = select(User.login, User.email).where(or_(User.login == login, User.email == email))
+        result = await session.execute(query)
+        rows = result.all()
+        return [
+            field for field, value in (("login", login), ("email", email))
+            if any(getattr(row, field) == value for row in rows)
+        ]
+
+    @staticmethod
+    @traced("db.insert_refresh_token")
     async def insert_refresh_token_data(session: AsyncSession, token_data: dict) -> None:
         token = Token(**token_data)
         session.add(token)
 
     @staticmethod
+    async def copy_users(session: AsyncSession, records: list[tuple]) -> set[UUID]:
+        """Load users through COPY into a staging table and move them to users skipping conflicting rows.
+
+        Returns ids of the inserted users.
+        """
+        await session.execute(text(
+            "CREATE TEMPORARY TABLE users_import (id UUID, name VARCHAR(30), surname VARCHAR(30), login VARCHAR(30), "
+            "email VARCHAR(50), hashed_pwd TEXT, role TEXT) ON COMMIT DROP"
+        ))
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "users_import", records=records, columns=USER_IMPORT_COLUMNS
+        )
+        columns = ", ".join(USER_IMPORT_COLUMNS)
+        result = await session.execute(text(
+            f"INSERT INTO {get_schema()}.users ({columns}) "
+            f"SELECT id, name, surname, login, email, hashed_pwd, role::{get_schema()}.userrole "
+            "FROM users_import ON CONFLICT DO NOTHING RETURNING id"
+        ))
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def select_taken_logins_and_emails(session: AsyncSession, logins: list[str], emails: list[str]) -> set[str]:
+        query = select(User.login, User.email).where(or_(User.login.in_(logins), User.email.in_(emails)))
+        result = await session.execute(query)
+        return {value for row in result.all() for value in row}
+
+    @staticmethod
+    @traced("db.get_user_data")
     async def get_user_data(session: AsyncSession, value: str, column_name: str) -> Row | None:
-        query = select(User.id, User.hashed_pwd, User.role).where(getattr(User, column_name) == value)
+        query = select(User.id, User.hashed_pwd, User.role).where(
+            and_(getattr(User, column_name) == value, User.deleted_at.is_(None))
+        )
         result = await session.execute(query)
         return result.one_or_none()
 
     @staticmethod
-    async def get_user(session: AsyncSession, user_id: str) -> User | None:
-        query = select(User).where(User.id == user_id)
+    async def update_hashed_pwd(session: AsyncSession, user_id: str, old_hashed_pwd: str, hashed_pwd: str) -> None:
+        """Replace the password hash unless it was changed since `old_hashed_pwd` was read."""
+        query = (
+            update(User)
+            .where(and_(User.id == user_id, User.hashed_pwd == old_hashed_pwd))
+            .values(hashed_pwd=hashed_pwd)
+        )
+        await session.execute(query)
+
+    @staticmethod
+    @traced("db.get_principal")
+    async def get_principal(session: AsyncSession, user_id: str) -> Principal | None:
+        query = select(User.id, User.role, User.updated_at).where(and_(User.id == user_id, User.deleted_at.is_(None)))
         result = await session.execute(query)
-        return result.scalar()
+        return Principal(*row) if (row := result.one_or_none()) else None
+
+    @staticmethod
+    @traced("db.get_user_profile")
+    async def get_user_profile(session: AsyncSession, user_id: str) -> Row | None:
+        """Profile columns together with the principal ones, so /me needs no separate principal lookup."""
+        query = select(
+            User.id, User.name, User.surname, User.login, User.email, User.role, User.updated_at
+        ).where(and_(User.id == user_id, User.deleted_at.is_(None)))
+        result = await session.execute(query)
+        return result.one_or_none()
+
+    @staticmethod
+    async def select_roles_by_ids(session: AsyncSession, user_ids: set[str]) -> dict[str, UserRole]:
+        query = select(User.id, User.role).where(and_(User.id.in_(list(user_ids)), User.deleted_at.is_(None)))
+        result = await session.execute(query)
+        return {str(row.id): row.role for row in result.all()}
 
     @staticmethod
     async def select_users_by_role(session: AsyncSession, role: UserRole | None = None) -> list[User]:
-        query = select(User)
+        query = select(User).where(User.deleted_at.is_(None))
         if role:
             query = query.where(User.role == role)
         result = await session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def search_users(
+        session: AsyncSession,
+        text_query: str,
+        limit: int,
+        role: UserRole | None = None,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[Row]:
+        """Select users with `text_query` in any of the search columns, best matches first.
+
+        Substring filters are served by the trigram GIN indexes. Rank is 1 for a prefix match plus
+        the best trigram similarity, rows with equal rank are ordered by id for keyset pagination.
+        """
+        escaped = text_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        columns = [getattr(User, column) for column in SEARCH_COLUMNS]
+        rank = cast(
+            case((or_(*(column.ilike(f"{escaped}%") for column in columns)), 1), else_=0)
+            + func.greatest(*(func.similarity(column, text_query) for column in columns)),
+            Float,
+        )
+        query = (
+            select(User.id, User.name, User.surname, User.login, User.email, User.role, User.last_login_at)
+            .add_columns(rank.label("rank"))
+            .where(and_(or_(*(column.ilike(f"%{escaped}%") for column in columns)), User.deleted_at.is_(None)))
+            .order_by(rank.desc(), User.id.desc())
+            .limit(limit)
+        )
+        if role:
+            query = query.where(User.role == role)
+        if after:
+            query = query.where(tuple_(rank, User.id) < tuple_(*after))
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def stream_users(
+        session: AsyncSession,
+        batch_size: int,
+        role: UserRole | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncResult:
+        """Select users without password hashes through a server-side cursor."""
+        query = select(
+            User.id, User.name, User.surname, User.login, User.email, User.role, User.created_at, User.updated_at
+        ).where(User.deleted_at.is_(None)).order_by(User.created_at)
+        if role:
+            query = query.where(User.role == role)
+        if created_from:
+            query = query.where(User.created_at >= created_from)
+        if created_to:
+            query = query.where(User.created_at < created_to)
+        return await session.stream(query.execution_options(yield_per=batch_size))
+
     @classmethod
-    async def select_user_email_by_id(cls, session: AsyncSession, user_id: str):
-        query = select(User.email).where(User.id == user_id)
+    async def select_user_email_by_id(cls, session: AsyncSession, user_id: str) -> Row | None:
+        query = select(User.id, User.email, User.updated_at).where(and_(User.id == user_id, User.deleted_at.is_(None)))
         result = await session.execute(query)
-        return result.scalar()
+        return result.one_or_none()
 
     @staticmethod
     async def delete_refresh_token_by_user_data(session: AsyncSession, user_id: str, user_agent: str) -> None:
@@ -54,22 +188,100 @@ class UserRepository:
         await session.execute(query)
 
     @staticmethod
-    async def delete_refresh_token_by_jti(session: AsyncSession, jti: str) -> None:
-        query = delete(Token).where(Token.jti == jti)
-        await session.execute(query)
+    @traced("db.delete_refresh_token")
+    async def delete_refresh_token_by_jti(session: AsyncSession, jti: str) -> bool:
+        query = delete(Token).where(Token.jti == jti).returning(Token.jti)
+        result = await session.execute(query)
+        return result.scalar() is not None
 
     @staticmethod
+    @traced("db.get_token_data")
     async def get_token_data_by_jti(session: AsyncSession, jti: str) -> Row:
-        query = select(Token.subject, Token.user_agent).where(Token.jti == jti)
+        query = (
+            select(Token.subject, Token.user_agent)
+            .join(User, User.id == Token.subject)
+            .where(and_(Token.jti == jti, User.deleted_at.is_(None)))
+        )
         result = await session.execute(query)
         return result.one_or_none()
 
     @staticmethod
     async def delete_tokens_by_user_id(session: AsyncSession, user_id: str) -> None:
-        query = delete(Token).where(Token.subject == user_id)
-        await session.execute(query)
+        await session.execute(delete(Token).where(Token.subject == user_id))
+        await session.execute(delete(RefreshRotation).where(RefreshRotation.subject == user_id))
 
     @classmethod
     async def delete_user_by_user_id(cls, session: AsyncSession, user_id: str) -> None:
         query = delete(User).where(User.id == user_id)
         await session.execute(query)
+
+    @staticmethod
+    def _bulk_delete_filter(
+        user_ids: list[UUID] | None,
+        role: UserRole | None,
+        created_to: datetime | None,
+        excluded_id: UUID | None,
+    ) -> list[ColumnElement]:
+        conditions = []
+        if user_ids:
+            conditions.append(User.id.in_(user_ids))
+        if role:
+            conditions.append(User.role == role)
+        if created_to:
+            conditions.append(User.created_at < created_to)
+        if excluded_id:
+            conditions.append(User.id != excluded_id)
+        return conditions
+
+    @classmethod
+    async def mark_users_deleted(
+        cls,
+        session: AsyncSession,
+        limit: int,
+        user_ids: list[UUID] | None = None,
+        role: UserRole | None = None,
+        created_to: datetime | None = None,
+        excluded_id: UUID | None = None,
+    ) -> list[UUID]:
+        """Soft delete a batch of matching users, skipping rows locked by others."""
+        batch = (
+            select(User.id)
+            .where(and_(User.deleted_at.is_(None), *cls._bulk_delete_filter(user_ids, role, created_to, excluded_id)))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(User)
+            .where(User.id.in_(batch.scalar_subquery()))
+            .values(deleted_at=func.now())
+            .returning(User.id)
+        )
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    @classmethod
+    async def select_user_ids_for_delete(
+        cls,
+        session: AsyncSession,
+        limit: int,
+        user_ids: list[UUID] | None = None,
+        role: UserRole | None = None,
+        created_to: datetime | None = None,
+        excluded_id: UUID | None = None,
+        deleted: bool = False,
+    ) -> list[UUID]:
+        """Lock and return a batch of matching users, or of soft deleted ones, skipping rows locked by others."""
+        conditions = (
+            [User.deleted_at.is_not(None)]
+            if deleted
+            else cls._bulk_delete_filter(user_ids, role, created_to, excluded_id)
+        )
+        query = select(User.id).where(and_(*conditions)).limit(limit).with_for_update(skip_locked=True)
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def delete_users_with_tokens(session: AsyncSession, user_ids: list[UUID]) -> None:
+        """Delete the users and their tokens, tokens first so the FK cascade finds nothing left to do."""
+        await session.execute(delete(Token).where(Token.subject.in_(user_ids)))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
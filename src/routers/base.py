@@ -1,6 +1,10 @@
 from fastapi import APIRouter
 
+from routers.health import router as health_router
+from routers.metrics import router as metrics_router
 from routers.v1.base_v1 import router as router_v1
 
 router = APIRouter()
 router.include_router(router_v1)
+router.include_router(metrics_router)
+router.include_router(health_router)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Response, status
+
+from dto.schemas.health import Liveness, Readiness
+from services.health import HealthService
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get(
+    "/live",
+    response_model=Liveness,
+    summary="Liveness probe",
+    response_description="The process serves requests",
+)
+async def live():
+    return Liveness()
+
+
+@router.get(
+    "/ready",
+    response_model=Readiness,
+    summary="Readiness probe with database, pool and background tasks diagnostics",
+    response_description="Readiness report, 503 while the service cannot serve requests",
+)
+async def ready(response: Response):
+    readiness = await HealthService.get_readiness()
+    if readiness["status"] == "unavailable":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return readiness
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from common.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Service metrics in the Prometheus text format",
+    include_in_schema=False,
+)
+async def get_metrics():
+    return render_metrics()
@@ -1,10 +1,39 @@
-from fastapi import APIRouter, Body, Depends, status
+from datetime import datetime
 
-from db.tables import User
-from dto.schemas.users import Tokens, UserAuth, UserBase, UserCreate, UserListResponse
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4
+from sqlalchemy.engine.row import Row
+
+from common.settings import settings
+from dto.schemas.users import (
+    SessionPage,
+    TokenIntrospection,
+    TokenIntrospectionRequest,
+    Tokens,
+    UserAuth,
+    UserBase,
+    UserBulkDelete,
+    UserBulkDeleteResult,
+    UserCreate,
+    UserImportResult,
+    UserListResponse,
+    UserSearchPage,
+    UserStats,
+)
+from services.session import SessionService
+from services.stats import StatsService
+from services.token import TokenService
 from services.user import UserService
-from utils.enums import UserRole
-from utils.role_checker import allowed_for_admin, allowed_for_all
+from services.user_delete import UserDeleteService
+from services.user_export import MEDIA_TYPES, UserExportService
+from services.user_import import UserImportService, decode_lines
+from utils.auth import get_current_profile, get_token
+from utils.client_ip import get_client_ip
+from utils.enums import DataFormat, UserRole
+from utils.etag import is_not_modified, make_etag, not_modified_response, set_cache_headers
+from utils.principal import Principal
+from utils.role_checker import allowed_for_admin, allowed_for_all, allowed_for_service_or_admin
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -26,8 +55,8 @@ async def register(user_data: UserCreate):
     summary="User login",
     response_description="Tokens",
 )
-async def login(user_data: UserAuth):
-    return await UserService.login(user_data)
+async def login(user_data: UserAuth, request: Request):
+    return await UserService.login(user_data, get_client_ip(request))
 
 
 @router.post(
@@ -35,8 +64,10 @@ async def login(user_data: UserAuth):
     summary="User logout",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-async def logout(user_agent: str = Body(), user: User = Depends(allowed_for_all)):
-    await UserService.logout(user, user_agent)
+async def logout(
+    user_agent: str = Body(), user: Principal = Depends(allowed_for_all), access_token: str = Depends(get_token)
+):
+    await UserService.logout(user, user_agent, access_token)
 
 
 @router.post(
@@ -49,14 +80,63 @@ async def refresh_tokens(refresh_token: str = Body(), user_agent: str = Body()):
     return await UserService.refresh(refresh_token, user_agent)
 
 
+@router.post(
+    "/introspect",
+    response_model=list[TokenIntrospection],
+    response_model_exclude_none=True,
+    summary="Batch access tokens introspection",
+    response_description="Token states in the order of the request",
+)
+async def introspect_tokens(
+    data: TokenIntrospectionRequest, caller: Principal | None = Depends(allowed_for_service_or_admin)
+):
+    return await TokenService.introspect(data.tokens)
+
+
 @router.get(
     "/me",
     response_model=UserBase,
     summary="Get current user data",
     response_description="User data",
 )
-async def get_user_data(user: User = Depends(allowed_for_all)):
-    return user
+async def get_user_data(request: Request, response: Response, profile: Row = Depends(get_current_profile)):
+    etag = make_etag(profile.id, profile.updated_at)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, settings.USER_ME_CACHE_CONTROL)
+    set_cache_headers(response, etag, settings.USER_ME_CACHE_CONTROL)
+    return profile
+
+
+@router.get(
+    "/me/sessions",
+    response_model=SessionPage,
+    summary="Get current user sessions",
+    response_description="Sessions page, newest first",
+)
+async def get_own_sessions(
+    limit: int = Query(default=settings.SESSIONS_PAGE_SIZE, ge=1, le=settings.SESSIONS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    user: Principal = Depends(allowed_for_all),
+):
+    return await SessionService.list_sessions(user.id, limit, cursor)
+
+
+@router.delete(
+    "/me/sessions",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke all current user sessions",
+)
+async def revoke_own_sessions(user: Principal = Depends(allowed_for_all)):
+    await SessionService.revoke_all_sessions(user.id)
+
+
+@router.delete(
+    "/me/sessions/{jti}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke current user session",
+)
+async def revoke_own_session(jti: UUID4, user: Principal = Depends(allowed_for_all)):
+    await SessionService.revoke_session(user.id, jti)
 
 
 @router.get(
@@ -65,16 +145,95 @@ async def get_user_data(user: User = Depends(allowed_for_all)):
     summary="Get users list",
     response_description="Users list",
 )
-async def get_users_list(role: UserRole | None = None, user: User = Depends(allowed_for_admin)):
+async def get_users_list(role: UserRole | None = None, user: Principal = Depends(allowed_for_admin)):
     return await UserService.get_users_list(role)
 
 
+@router.get(
+    "/search",
+    response_model=UserSearchPage,
+    summary="Search users by name, surname, login or email",
+    response_description="Users page, best matches first",
+)
+async def search_users(
+    q: str = Query(min_length=settings.USER_SEARCH_MIN_LENGTH, max_length=50),
+    role: UserRole | None = None,
+    limit: int = Query(default=settings.USER_SEARCH_PAGE_SIZE, ge=1, le=settings.USER_SEARCH_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    user: Principal = Depends(allowed_for_admin),
+):
+    return await UserService.search_users(q, limit, role, cursor)
+
+
+@router.get(
+    "/stats",
+    response_model=UserStats,
+    summary="Users count by role and registrations per day",
+    response_description="User statistics",
+)
+async def get_user_stats(
+    days: int = Query(default=settings.USER_STATS_DAYS, ge=1, le=settings.USER_STATS_MAX_DAYS),
+    user: Principal = Depends(allowed_for_admin),
+):
+    return await StatsService.get_user_stats(days)
+
+
+@router.post(
+    "/import",
+    response_model=UserImportResult,
+    summary="Bulk users import from CSV or NDJSON",
+    response_description="Import result",
+)
+async def import_users(
+    request: Request,
+    file_format: DataFormat = DataFormat.csv,
+    skip_rows: int = Query(default=0, ge=0),
+    user: Principal = Depends(allowed_for_admin),
+):
+    return await UserImportService.import_users(decode_lines(request.stream()), file_format, skip_rows)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Bulk users export to CSV or NDJSON",
+    response_description="Users stream",
+)
+async def export_users(
+    file_format: DataFormat = DataFormat.csv,
+    role: UserRole | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    compress: bool = False,
+    user: Principal = Depends(allowed_for_admin),
+):
+    headers = {"Content-Disposition": f'attachment; filename="users.{file_format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        UserExportService.export_users(file_format, role, created_from, created_to, compress),
+        media_type=MEDIA_TYPES[file_format],
+        headers=headers,
+    )
+
+
+@router.post(
+    "/delete",
+    response_model=UserBulkDeleteResult,
+    summary="Bulk delete users by ids or filter",
+    response_description="Deleted users count",
+)
+async def bulk_delete(data: UserBulkDelete, user: Principal = Depends(allowed_for_admin)):
+    deleted = await UserDeleteService.bulk_delete(data.user_ids, data.role, data.created_to, data.soft, user.id)
+    return dict(deleted=deleted)
+
+
 @router.delete(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete user",
 )
-async def delete(user_id: str, user: User = Depends(allowed_for_admin)):
+async def delete(user_id: str, user: Principal = Depends(allowed_for_admin)):
     return await UserService.delete(user_id)
 
 
@@ -84,5 +243,46 @@ async def delete(user_id: str, user: User = Depends(allowed_for_admin)):
     summary="Get user email by user id",
     response_description="User email",
 )
-async def get_user_email(user_id: str):
-    return await UserService.get_user_email(user_id)
+async def get_user_email(user_id: str, request: Request, response: Response):
+    if (etag := UserService.get_cached_email_etag(user_id)) and is_not_modified(request, etag):
+        return not_modified_response(etag, settings.USER_EMAIL_CACHE_CONTROL)
+
+    email, etag = await UserService.get_user_email(user_id)
+    if etag:
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, settings.USER_EMAIL_CACHE_CONTROL)
+        set_cache_headers(response, etag, settings.USER_EMAIL_CACHE_CONTROL)
+    return email
+
+
+@router.get(
+    "/{user_id}/sessions",
+    response_model=SessionPage,
+    summary="Get user sessions",
+    response_description="Sessions page, newest first",
+)
+async def get_user_sessions(
+    user_id: UUID4,
+    limit: int = Query(default=settings.SESSIONS_PAGE_SIZE, ge=1, le=settings.SESSIONS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    user: Principal = Depends(allowed_for_admin),
+):
+    return await SessionService.list_sessions(user_id, limit, cursor)
+
+
+@router.delete(
+    "/{user_id}/sessions",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke all user sessions",
+)
+async def revoke_user_sessions(user_id: UUID4, user: Principal = Depends(allowed_for_admin)):
+    await SessionService.revoke_all_sessions(user_id)
+
+
+@router.delete(
+    "/{user_id}/sessions/{jti}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke user session",
+)
+async def revoke_user_session(user_id: UUID4, jti: UUID4, user: Principal = Depends(allowed_for_admin)):
+    await SessionService.revoke_session(user_id, jti)
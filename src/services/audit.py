@@ -0,0 +1,112 @@
+"""Login audit service."""
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from uuid import uuid4
+
+from common.metrics import Counter
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.audit import AuditRepository
+from utils.buffer import EventBuffer
+from utils.tenant import get_schema, use_schema
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "login_events_"
+
+login_events = EventBuffer("login_events", settings.AUDIT_BUFFER_SIZE, settings.AUDIT_FLUSH_BATCH_SIZE)
+written_login_events = Counter("login_events_written_total", "Login events written to the audit log")
+
+
+def _add_months(month: date, months: int) -> date:
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+class AuditService:
+
+    @staticmethod
+    def record_login(user_id, login_or_email: str, success: bool, user_agent: str, ip: str) -> None:
+        """Queue a login event, it is written by `flush` in the background together with last_login_at."""
+        login_events.put({
+            "id": uuid4(),
+            "created_at": datetime.now(),
+            "user_id": user_id,
+            "login_or_email": login_or_email[:50],
+            "success": success,
+            "user_agent": user_agent[:100],
+            "ip": ip[:45],
+            "schema": get_schema(),
+        })
+
+    @classmethod
+    async def flush(cls) -> None:
+        """Write buffered events batch by batch, events failed or cancelled in a schema are dropped and counted.
+
+        Events of a batch are written to the schemas of the tenants they came from, a failed schema does not
+        keep the events of the other schemas from being written.
+        """
+        while events := login_events.take():
+            schema_events = defaultdict(list)
+            for event in events:
+                schema_events[event.pop("schema")].append(event)
+
+            errors, unwritten = [], len(events)
+            for schema, events_of_schema in schema_events.items():
+                try:
+                    with use_schema(schema):
+                        await cls._write(events_of_schema)
+                except Exception as e:
+                    login_events.drop(len(events_of_schema))
+                    errors.append(e)
+                except BaseException:
+                    login_events.drop(unwritten)
+                    raise
+                else:
+                    written_login_events.inc(len(events_of_schema))
+                unwritten -= len(events_of_schema)
+            if errors:
+                raise ExceptionGroup(f"Login events failed in {len(errors)} schemas", errors)
+
+    @staticmethod
+    async def _write(events: list[dict]) -> None:
+        last_logins = {}
+        for event in events:
+            if event["success"]:
+                last_logins[event["user_id"]] = event["created_at"]
+        async with AsyncSession() as session:
+            await AuditRepository.insert_login_events(session, events)
+            if last_logins:
+                await AuditRepository.update_last_login_at(session, last_logins)
+            await session.commit()
+
+    @staticmethod
+    async def maintain_partitions() -> None:
+        """Create monthly partitions ahead of time and drop the ones older than the retention period.
+
+        Every partition is created in its own transaction, so a failed one is logged and retried by the next
+        run without holding back the others or the retention drops.
+        """
+        this_month = date.today().replace(day=1)
+        async with AsyncSession() as session:
+            existing = set(await AuditRepository.select_login_events_partitions(session))
+
+        for months in range(settings.AUDIT_PARTITIONS_AHEAD + 1):
+            start = _add_months(this_month, months)
+            if (name := f"{PARTITION_PREFIX}{start:%Y_%m}") in existing:
+                continue
+            async with AsyncSession() as session:
+                try:
+                    await AuditRepository.create_login_events_partition(session, name, start, _add_months(start, 1))
+                    await session.commit()
+                except Exception:
+                    logger.exception("Login events partition %s.%s was not created", get_schema(), name)
+
+        if settings.AUDIT_RETENTION_MONTHS:
+            oldest = f"{PARTITION_PREFIX}{_add_months(this_month, -settings.AUDIT_RETENTION_MONTHS):%Y_%m}"
+            async with AsyncSession() as session:
+                for name in existing:
+                    if name[len(PARTITION_PREFIX):].replace("_", "").isdigit() and name < oldest:
+                        await AuditRepository.drop_login_events_partition(session, name)
+                await session.commit()
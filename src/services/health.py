@@ -0,0 +1,75 @@
+"""Liveness and readiness of the service."""
+import asyncio
+import time
+from datetime import datetime
+
+from common import background
+from common.loop_monitor import loop_lag
+from common.settings import settings
+from db.connector import AsyncSession, DatabaseConnector
+from repositories.health import HealthRepository
+from utils.singleflight import SingleFlight
+
+db_probes = SingleFlight("health_db_probe")
+
+
+class HealthService:
+    warmed_up: bool = False
+    db_status: dict | None = None
+    db_checked_at: float = 0
+
+    @classmethod
+    async def get_readiness(cls) -> dict:
+        """Ready once warmed up and the database answers, degraded while a background task is down."""
+        database = await cls.check_db()
+        tasks = cls.get_tasks_status()
+        if not cls.warmed_up or not database["ok"]:
+            status = "unavailable"
+        elif not all(task["alive"] for task in tasks.values()):
+            status = "degraded"
+        else:
+            status = "ok"
+        return dict(
+            status=status,
+            warmed_up=cls.warmed_up,
+            database=database,
+            pool=DatabaseConnector.get_pool_stats(),
+            tasks=tasks,
+            loop_lag=loop_lag.get(),
+        )
+
+    @classmethod
+    async def check_db(cls) -> dict:
+        """Result of the last database probe, probes run at most once per HEALTH_DB_PROBE_TTL."""
+        if cls.db_status is None or time.monotonic() - cls.db_checked_at >= settings.HEALTH_DB_PROBE_TTL:
+            await db_probes.do("db", cls._probe_db)
+        return cls.db_status
+
+    @classmethod
+    async def _probe_db(cls) -> None:
+        started_at = time.perf_counter()
+        error = None
+        try:
+            async with asyncio.timeout(settings.HEALTH_DB_PROBE_TIMEOUT):
+                async with AsyncSession() as session:
+                    await HealthRepository.ping(session)
+        except Exception as e:
+            error = repr(e)
+        cls.db_status = dict(
+            ok=error is None,
+            latency=round(time.perf_counter() - started_at, 6),
+            error=error,
+            checked_at=datetime.now(),
+        )
+        cls.db_checked_at = time.monotonic()
+
+    @staticmethod
+    def get_tasks_status() -> dict[str, dict]:
+        return {
+            name: dict(
+                alive=task.is_alive,
+                last_run_at=datetime.fromtimestamp(task.last_run_at) if task.last_run_at else None,
+                last_error=task.last_error,
+            )
+            for name, task in background.tasks.items()
+        }
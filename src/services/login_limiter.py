@@ -0,0 +1,74 @@
+"""Login attempts limiter."""
+import math
+
+from fastapi import HTTPException, status
+
+from common.metrics import Counter
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.rate_limit import RateLimitRepository
+from utils.rate_limiter import RateLimiter, acquire, release
+
+shed_logins = Counter("login_shed_total", "Login attempts rejected before the credentials check")
+
+
+class LoginRateLimiter:
+    limiters = {
+        "ip": RateLimiter(
+            settings.LOGIN_RATE_LIMIT_IP_BURST,
+            settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+            settings.LOGIN_RATE_LIMIT_MAX_KEYS,
+        ),
+        "login": RateLimiter(
+            settings.LOGIN_RATE_LIMIT_LOGIN_BURST,
+            settings.LOGIN_RATE_LIMIT_LOGIN_PER_MINUTE,
+            settings.LOGIN_RATE_LIMIT_MAX_KEYS,
+        ),
+        "global": RateLimiter(settings.LOGIN_RATE_LIMIT_GLOBAL_BURST, settings.LOGIN_RATE_LIMIT_GLOBAL_PER_MINUTE),
+    }
+
+    @classmethod
+    async def check(cls, ip: str, login: str) -> None:
+        """Reject the attempt with 429 if any of the ip, login or global buckets is empty.
+
+        In-process buckets are checked first, so shedding costs no DB round trip.
+        With LOGIN_RATE_LIMIT_SHARED the buckets shared by all replicas in Postgres are checked next.
+        A rejected attempt takes no token from any bucket.
+        """
+        keys = {"ip": ip, "login": login.lower(), "global": ""}
+        limits = [(cls.limiters[scope], key) for scope, key in keys.items()]
+        retry_after, index = acquire(limits)
+
+        if index is None and settings.LOGIN_RATE_LIMIT_SHARED:
+            retry_after, index = await cls._acquire_shared(keys)
+            if index is not None:
+                release(limits)
+
+        if index is not None:
+            shed_logins.inc(scope=list(keys)[index])
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    @classmethod
+    async def _acquire_shared(cls, keys: dict[str, str]) -> tuple[float, int | None]:
+        async with AsyncSession() as session:
+            for index, (scope, key) in enumerate(keys.items()):
+                limiter = cls.limiters[scope]
+                if not await RateLimitRepository.take_token(
+                    session, f"login:{scope}:{key}", limiter.capacity, limiter.rate
+                ):
+                    await session.rollback()
+                    return 1 / limiter.rate, index
+            await session.commit()
+        return 0.0, None
+
+    @classmethod
+    async def purge_idle_buckets(cls) -> None:
+        """Delete the shared buckets that have refilled to capacity since their last attempt."""
+        async with AsyncSession() as session:
+            for scope, limiter in cls.limiters.items():
+                await RateLimitRepository.delete_idle(session, f"login:{scope}:", limiter.capacity / limiter.rate)
+            await session.commit()
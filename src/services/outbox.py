@@ -0,0 +1,116 @@
+"""Delivery of user lifecycle events from the transactional outbox."""
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+
+from common.metrics import Counter
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.outbox import OutboxRepository
+from utils.sinks import SubscriberSink, WebhookSink
+
+logger = logging.getLogger(__name__)
+
+delivered_events = Counter("outbox_events_delivered_total", "Outbox events delivered")
+discarded_events = Counter("outbox_events_discarded_total", "Outbox events dropped without any consumer configured")
+failed_deliveries = Counter("outbox_delivery_failures_total", "Failed outbox batch deliveries")
+
+Sink = SubscriberSink | WebhookSink
+
+subscribers = SubscriberSink()
+
+
+class OutboxService:
+    webhooks: WebhookSink | None = None
+
+    @staticmethod
+    def subscribe(handler: Callable[[list[dict]], Awaitable[None]]) -> None:
+        """Deliver event batches to `handler` in this process when no webhooks are configured.
+
+        A failing handler fails the batch, which is retried for all subscribers.
+        """
+        subscribers.subscribe(handler)
+
+    @classmethod
+    def get_sink(cls) -> Sink | None:
+        """Webhooks from OUTBOX_WEBHOOK_URLS, the in-process subscribers when there are none.
+
+        None when there is no consumer at all.
+        """
+        if not settings.OUTBOX_WEBHOOK_URLS:
+            return subscribers if subscribers.subscribers else None
+        if cls.webhooks is None:
+            cls.webhooks = WebhookSink(
+                settings.OUTBOX_WEBHOOK_URLS.split(","), settings.OUTBOX_WEBHOOK_SECRET, settings.OUTBOX_WEBHOOK_TIMEOUT
+            )
+        return cls.webhooks
+
+    @classmethod
+    async def dispatch(cls, sink: Sink | None = None) -> None:
+        """Deliver pending events batch by batch in the order they were written.
+
+        A failed batch is retried with exponential backoff and holds back the events written after it,
+        so consumers get the events of every user in order. One dispatcher per schema runs at a time,
+        events are delivered at least once. Without any consumer the events are dropped, so the outbox
+        does not grow.
+        """
+        sink = sink or cls.get_sink()
+        while await cls._dispatch_batch(sink) == settings.OUTBOX_BATCH_SIZE:
+            pass
+
+    @classmethod
+    async def _dispatch_batch(cls, sink: Sink | None) -> int:
+        """Claim the oldest batch in a short transaction, deliver it with no transaction open, then delete it.
+
+        The claim keeps other dispatchers off the batch for OUTBOX_CLAIM_TIMEOUT, after that a batch left
+        behind by a crashed dispatcher is delivered again.
+        """
+        async with AsyncSession() as session:
+            if not await OutboxRepository.try_lock_dispatch(session):
+                return 0
+            events = await OutboxRepository.select_oldest_events(session, settings.OUTBOX_BATCH_SIZE)
+            if not events or (events[0].next_attempt_at and events[0].next_attempt_at > datetime.now()):
+                return 0
+
+            event_ids = [event.id for event in events]
+            if sink is None:
+                await OutboxRepository.delete_events(session, event_ids)
+                await session.commit()
+                discarded_events.inc(len(events))
+                return len(events)
+
+            claimed_until = datetime.now() + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+            await OutboxRepository.claim_events(session, event_ids, claimed_until)
+            await session.commit()
+
+        try:
+            await sink.deliver([cls._to_message(event) for event in events])
+        except Exception as e:
+            failed_deliveries.inc()
+            delay = min(settings.OUTBOX_RETRY_MAX_DELAY, settings.OUTBOX_RETRY_DELAY * 2 ** events[0].attempts)
+            logger.warning("Outbox delivery of %s events failed, retry in %ss: %r", len(events), delay, e)
+            async with AsyncSession() as session:
+                await OutboxRepository.postpone_events(session, event_ids, datetime.now() + timedelta(seconds=delay))
+                await session.commit()
+            return 0
+
+        async with AsyncSession() as session:
+            await OutboxRepository.delete_events(session, event_ids)
+            await session.commit()
+        delivered_events.inc(len(events))
+        return len(events)
+
+    @staticmethod
+    def _to_message(event) -> dict:
+        return {
+            "id": event.id,
+            "type": event.event_type,
+            "user_id": str(event.user_id),
+            "data": event.payload,
+            "created_at": event.created_at.isoformat(),
+        }
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls.webhooks is not None:
+            await cls.webhooks.close()
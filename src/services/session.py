@@ -0,0 +1,38 @@
+"""Refresh sessions service."""
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.token import SessionRepository
+from repositories.user import UserRepository
+from utils.pagination import decode_cursor, encode_cursor
+
+
+class SessionService:
+
+    @staticmethod
+    async def list_sessions(user_id: str, limit: int, cursor: str | None = None) -> dict:
+        """Page of not yet expired refresh sessions, newest first."""
+        before = decode_cursor(cursor) if cursor else None
+        created_after = datetime.now() - timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+
+        async with AsyncSession() as session:
+            rows = await SessionRepository.select_sessions(session, user_id, created_after, limit + 1, before)
+
+        next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].jti) if len(rows) > limit else None
+        return dict(items=rows[:limit], next_cursor=next_cursor)
+
+    @staticmethod
+    async def revoke_session(user_id: str, jti: str) -> None:
+        async with AsyncSession() as session:
+            if not await SessionRepository.delete_session(session, user_id, jti):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+            await session.commit()
+
+    @staticmethod
+    async def revoke_all_sessions(user_id: str) -> None:
+        async with AsyncSession() as session:
+            await UserRepository.delete_tokens_by_user_id(session, user_id)
+            await session.commit()
@@ -0,0 +1,22 @@
+"""User statistics service."""
+from datetime import date, timedelta
+
+from db.connector import AsyncSession
+from repositories.stats import StatsRepository
+from utils.enums import UserRole
+
+
+class StatsService:
+
+    @staticmethod
+    async def get_user_stats(days: int) -> dict:
+        """Users by role and registrations per day for the last `days` days.
+
+        Both are read from counters the database keeps up to date, so the cost does not depend on the user count.
+        """
+        async with AsyncSession() as session:
+            role_counts = await StatsRepository.select_role_counts(session)
+            registrations = await StatsRepository.select_registrations(session, date.today() - timedelta(days=days - 1))
+
+        roles = {role: role_counts.get(role, 0) for role in UserRole}
+        return dict(total=sum(roles.values()), roles=roles, registrations=registrations)
@@ -0,0 +1,66 @@
+"""Token service."""
+import time
+
+import jwt
+
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.token import RevokedTokenRepository
+from repositories.user import UserRepository
+from utils.auth import decode_token
+from utils.cache import TTLCache
+from utils.enums import TokenType
+from utils.revocation import revocation_list
+from utils.tenant import schema_key
+
+INACTIVE_TOKEN = {"active": False}
+
+introspection_cache = TTLCache(settings.INTROSPECTION_CACHE_TTL, settings.INTROSPECTION_CACHE_SIZE)
+
+
+class TokenService:
+
+    @staticmethod
+    async def introspect(tokens: list[str]) -> list[dict]:
+        """Check a batch of access tokens, results keep the order of `tokens`.
+
+        Signatures are always verified. Results of valid tokens are cached by jti for a few seconds,
+        tokens missing in the cache are checked against their users and, if the revocation filter
+        matches, against revoked tokens in the same session.
+        """
+        results: list[dict] = [INACTIVE_TOKEN] * len(tokens)
+        pending: dict[int, dict] = {}
+        for index, token in enumerate(tokens):
+            try:
+                payload = decode_token(token, token_type=TokenType.access)
+            except jwt.PyJWTError:
+                continue
+
+            if (cached := introspection_cache.get(schema_key(payload.get("jti")))) is not None:
+                results[index] = cached
+            elif payload.get("sub"):
+                pending[index] = payload
+
+        if not pending:
+            return results
+
+        maybe_revoked = {
+            payload.get("jti") for payload in pending.values() if revocation_list.might_be_revoked(payload.get("jti"))
+        }
+        async with AsyncSession() as session:
+            roles = await UserRepository.select_roles_by_ids(session, {payload["sub"] for payload in pending.values()})
+            revoked = set()
+            if maybe_revoked:
+                revoked = await RevokedTokenRepository.select_revoked_jtis(session, maybe_revoked)
+
+        now = time.time()
+        for index, payload in pending.items():
+            result = INACTIVE_TOKEN
+            if payload.get("jti") not in revoked and roles.get(payload["sub"]) == payload.get("role"):
+                result = {"active": True, "sub": payload["sub"], "role": payload["role"], "exp": payload["exp"]}
+            results[index] = result
+            introspection_cache.set(
+                schema_key(payload.get("jti")), result, min(introspection_cache.ttl, payload["exp"] - now)
+            )
+
+        return results
@@ -1,33 +1,86 @@
 """User service."""
+import asyncio
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from fastapi import HTTPException, status
 from pydantic import validate_email
 from pydantic_core import PydanticCustomError
+from sqlalchemy.engine.row import Row
 from sqlalchemy.exc import IntegrityError
 from user_agents import parse
 
+from common.errors import UserAlreadyExistsError
 from common.settings import settings
 from db.connector import AsyncSession
 from db.tables import User
 from dto.schemas.users import UserAuth, UserCreate
+from repositories.token import RefreshRotationRepository
 from repositories.user import UserRepository
-from utils.auth import check_token_type, create_tokens, get_hashed_pwd, get_refresh_token_payload, verify_pwd
-from utils.enums import TokenType, UserRole
+from services.audit import AuditService
+from services.login_limiter import LoginRateLimiter
+from services.token import introspection_cache
+from utils.auth import (
+    create_tokens,
+    decode_token,
+    get_hashed_pwd,
+    get_refresh_token_payload,
+    needs_rehash,
+    principal_cache,
+    verify_pwd,
+)
+from utils.cache import TTLCache
+from utils.enums import UserRole
+from utils.etag import make_etag
+from utils.pagination import decode_cursor, encode_cursor
+from utils.principal import Principal
+from utils.revocation import revocation_list
+from utils.singleflight import SingleFlight
+from utils.tenant import schema_key
+from utils.tracing import span
+
+email_lookups = SingleFlight("get_user_email")
+email_etags = TTLCache(settings.USER_EMAIL_ETAG_CACHE_TTL, settings.USER_EMAIL_ETAG_CACHE_SIZE)
+
+refreshes = SingleFlight("refresh")
+refresh_grace = TTLCache(settings.REFRESH_GRACE_PERIOD, settings.REFRESH_GRACE_CACHE_SIZE)
+
+rehash_tasks: set[asyncio.Task] = set()
 
 
 class UserService:
 
     @classmethod
     async def register(cls, user_data: UserCreate) -> dict:
+        """Create the user and its first refresh session in one transaction.
+
+        Taken logins and emails are rejected before the password is hashed, a concurrent registration
+        with the same data is caught by the ON CONFLICT insert. No connection is held while hashing.
+        """
+        user_agent = str(parse(user_data.user_agent))
+
+        async with AsyncSession() as session:
+            if fields := await UserRepository.select_taken_fields(session, user_data.login, user_data.email):
+                raise UserAlreadyExistsError(fields=fields)
+
+        user_data.pwd = await asyncio.to_thread(get_hashed_pwd, user_data.pwd)
+
+        async with AsyncSession() as session:
+            user_id = await UserRepository.insert_user_data(
+                session, user_data.model_dump(by_alias=True, exclude={"user_agent"})
+            )
+            if not user_id:
+                fields = await UserRepository.select_taken_fields(session, user_data.login, user_data.email)
+                raise UserAlreadyExistsError(fields=fields or ["login", "email"])
 
-        user_id = await cls._add_user(user_data)
-        access_token, refresh_token = await cls._get_tokens(user_id, user_data.role, str(parse(user_data.user_agent)))
+            access_token, refresh_token = await cls._issue_tokens(session, user_id, user_data.role, user_agent)
+            await session.commit()
 
         return dict(access_token=access_token, refresh_token=refresh_token)
 
     @classmethod
-    async def login(cls, user_data: UserAuth) -> dict:
+    async def login(cls, user_data: UserAuth, ip: str = "") -> dict:
+        await LoginRateLimiter.check(ip, user_data.login_or_email)
 
         is_email = True
         try:
@@ -41,16 +94,31 @@ class UserService:
                 session, user_data.login_or_email, "email" if is_email else "login"
             )
 
+        with span("user_agent.parse"):
+            user_agent = str(parse(user_data.user_agent))
         if not user_data_from_db or not verify_pwd(user_data.pwd, user_data_from_db.hashed_pwd):
+            AuditService.record_login(
+                user_data_from_db.id if user_data_from_db else None, user_data.login_or_email, False, user_agent, ip
+            )
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User unauthorized")
 
-        access_token, refresh_token = await cls._get_tokens(
-            user_data_from_db.id, user_data_from_db.role, str(parse(user_data.user_agent))
-        )
+        if needs_rehash(user_data_from_db.hashed_pwd):
+            task = asyncio.create_task(
+                cls._rehash_pwd(user_data_from_db.id, user_data.pwd, user_data_from_db.hashed_pwd)
+            )
+            rehash_tasks.add(task)
+            task.add_done_callback(rehash_tasks.discard)
+
+        access_token, refresh_token = await cls._get_tokens(user_data_from_db.id, user_data_from_db.role, user_agent)
+        AuditService.record_login(user_data_from_db.id, user_data.login_or_email, True, user_agent, ip)
         return dict(access_token=access_token, refresh_token=refresh_token)
 
     @staticmethod
-    async def logout(user: User, user_agent: str) -> None:
+    async def logout(user: Principal, user_agent: str, access_token: str) -> None:
+        payload = decode_token(access_token)
+        await revocation_list.revoke(payload.get("jti"), datetime.fromtimestamp(payload.get("exp"), timezone.utc))
+        introspection_cache.delete(schema_key(payload.get("jti")))
+
         async with AsyncSession() as session:
             await UserRepository.delete_refresh_token_by_user_data(session, user.id, str(parse(user_agent)))
             try:
@@ -60,27 +128,78 @@ class UserService:
 
     @classmethod
     async def refresh(cls, refresh_token: str, user_agent) -> dict:
-        user_agent = str(parse(user_agent))
-        check_token_type(refresh_token, TokenType.refresh)
+        """Rotate the refresh token.
 
+        A retry with an already rotated token and the same device within REFRESH_GRACE_PERIOD gets
+        the token pair issued to the first call instead of being treated as token reuse. The pair is
+        remembered in this process and in the refresh_rotations table, so retries sent to another replica
+        get it too.
+        """
+        with span("user_agent.parse"):
+            user_agent = str(parse(user_agent))
         payload = await get_refresh_token_payload(refresh_token)
 
+        if (issued := refresh_grace.get(schema_key(payload.get("jti")))) and issued[0] == user_agent:
+            return issued[1]
+        return await refreshes.do(
+            schema_key((payload.get("jti"), user_agent)), lambda: cls._rotate_refresh_token(payload, user_agent)
+        )
+
+    @classmethod
+    async def _rotate_refresh_token(cls, payload: dict, user_agent: str) -> dict:
+        jti = payload.get("jti")
         async with AsyncSession() as session:
-            if (
-                    not (token_data_from_db := await UserRepository.get_token_data_by_jti(session, payload.get("jti")))
-                    or user_agent != token_data_from_db.user_agent
-            ):
+            token_data_from_db = await UserRepository.get_token_data_by_jti(session, jti)
+            if not token_data_from_db and (tokens := await cls._get_grace_tokens(session, jti, user_agent)):
+                return tokens
+
+            if not token_data_from_db or user_agent != token_data_from_db.user_agent:
                 await UserRepository.delete_tokens_by_user_id(session, payload.get("sub"))
                 await session.commit()
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Invalid token")
 
-            await UserRepository.delete_refresh_token_by_jti(session, payload.get("jti"))
-            await session.commit()
+            if not await UserRepository.delete_refresh_token_by_jti(session, jti):
+                # Rotated by a concurrent retry on another replica, its transaction has committed by now.
+                if tokens := await cls._get_grace_tokens(session, jti, user_agent):
+                    return tokens
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Invalid token")
 
-        access_token, refresh_token = await cls._get_tokens(payload.get("sub"), payload.get("role"), user_agent)
+            access_token, refresh_token = await cls._issue_tokens(
+                session, payload.get("sub"), payload.get("role"), user_agent
+            )
+            tokens = dict(access_token=access_token, refresh_token=refresh_token)
+            if settings.REFRESH_GRACE_PERIOD:
+                await RefreshRotationRepository.insert_rotation(session, {
+                    "jti": jti,
+                    "subject": payload.get("sub"),
+                    "user_agent": user_agent,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=settings.REFRESH_GRACE_PERIOD),
+                    **tokens,
+                })
+            try:
+                with span("db.commit"):
+                    await session.commit()
+            except IntegrityError as e:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{e.args[0].split('DETAIL:')[1]}")
 
-        return dict(access_token=access_token, refresh_token=refresh_token)
+        if settings.REFRESH_GRACE_PERIOD:
+            refresh_grace.set(schema_key(jti), (user_agent, tokens), settings.REFRESH_GRACE_PERIOD)
+        return tokens
 
+    @staticmethod
+    async def _get_grace_tokens(session: AsyncSession, jti: str, user_agent: str) -> dict | None:
+        if not settings.REFRESH_GRACE_PERIOD:
+            return None
+        rotation = await RefreshRotationRepository.get_rotation(session, jti)
+        if not rotation or rotation.user_agent != user_agent:
+            return None
+        return dict(access_token=rotation.access_token, refresh_token=rotation.refresh_token)
+
+    @staticmethod
+    async def purge_refresh_rotations() -> None:
+        async with AsyncSession() as session:
+            await RefreshRotationRepository.delete_expired(session)
+            await session.commit()
 
     @staticmethod
     async def get_users_list(role: UserRole | None = None) -> list[User]:
@@ -88,7 +207,32 @@ class UserService:
             return await UserRepository.select_users_by_role(session, role)
 
     @staticmethod
-    async def get_user_email(user_id: str) -> str:
+    async def search_users(
+        text_query: str, limit: int, role: UserRole | None = None, cursor: str | None = None
+    ) -> dict:
+        after = decode_cursor(cursor, float) if cursor else None
+        async with AsyncSession() as session:
+            rows = await UserRepository.search_users(session, text_query, limit + 1, role, after)
+
+        next_cursor = encode_cursor(rows[limit - 1].rank, rows[limit - 1].id) if len(rows) > limit else None
+        return dict(items=rows[:limit], next_cursor=next_cursor)
+
+    @classmethod
+    async def get_user_email(cls, user_id: str) -> tuple[str | None, str | None]:
+        """User email and its ETag, the ETag is remembered to answer conditional requests without the DB."""
+        if not (user := await email_lookups.do(schema_key(user_id), lambda: cls._select_user_email(user_id))):
+            return None, None
+
+        etag = make_etag(user.id, user.updated_at)
+        email_etags.set(schema_key(user_id), etag)
+        return user.email, etag
+
+    @staticmethod
+    def get_cached_email_etag(user_id: str) -> str | None:
+        return email_etags.get(schema_key(user_id))
+
+    @staticmethod
+    async def _select_user_email(user_id: str) -> Row | None:
         async with AsyncSession() as session:
             return await UserRepository.select_user_email_by_id(session, user_id)
 
@@ -97,37 +241,39 @@ class UserService:
         async with AsyncSession() as session:
             await UserRepository.delete_user_by_user_id(session, user_id)
             await session.commit()
+        email_etags.delete(schema_key(user_id))
+        principal_cache.delete(schema_key(user_id))
 
     @staticmethod
-    async def _add_user(user_data: UserCreate) -> uuid4:
-        user_data.pwd = get_hashed_pwd(user_data.pwd)
+    async def _rehash_pwd(user_id: uuid4, pwd: str, old_hashed_pwd: str) -> None:
+        """Store a hash with the current scheme and cost factor, computed off the event loop."""
+        hashed_pwd = await asyncio.to_thread(get_hashed_pwd, pwd)
+        async with AsyncSession() as session:
+            await UserRepository.update_hashed_pwd(session, user_id, old_hashed_pwd, hashed_pwd)
+            await session.commit()
 
+    @classmethod
+    async def _get_tokens(cls, user_id: uuid4, role: UserRole | str, user_agent: str) -> tuple[str, str]:
         async with AsyncSession() as session:
-            user_id = await UserRepository.insert_user_data(
-                session, user_data.model_dump(by_alias=True, exclude={"user_agent"})
-            )
+            access_token, refresh_token = await cls._issue_tokens(session, user_id, role, user_agent)
             try:
-                await session.commit()
+                with span("db.commit"):
+                    await session.commit()
             except IntegrityError as e:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{e.args[0].split('DETAIL:')[1]}")
 
-        return user_id
+        return access_token, refresh_token
 
     @staticmethod
-    async def _get_tokens(user_id: uuid4, role: UserRole | str, user_agent: str) -> tuple[str, str]:
-
+    async def _issue_tokens(
+        session: AsyncSession, user_id: uuid4, role: UserRole | str, user_agent: str
+    ) -> tuple[str, str]:
+        """Create a token pair and add its refresh session to `session`, the caller commits."""
         token_data = {"sub": str(user_id), "role": role, "user_agent": user_agent}
         access_token, refresh_token, refresh_jti = create_tokens(
             token_data, settings.ACCESS_TOKEN_EXPIRE_MINUTES, settings.REFRESH_TOKEN_EXPIRE_MINUTES
         )
-
-        async with AsyncSession() as session:
-            await UserRepository.insert_refresh_token_data(
-                session, {"jti": refresh_jti, "subject": user_id, "user_agent": user_agent}
-            )
-            try:
-                await session.commit()
-            except IntegrityError as e:
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{e.args[0].split('DETAIL:')[1]}")
-
+        await UserRepository.insert_refresh_token_data(
+            session, {"jti": refresh_jti, "subject": user_id, "user_agent": user_agent}
+        )
         return access_token, refresh_token
@@ -0,0 +1,67 @@
+"""User bulk deletion service."""
+import asyncio
+from datetime import datetime
+from uuid import UUID
+
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.user import UserRepository
+from services.user import email_etags
+from utils.auth import principal_cache
+from utils.enums import UserRole
+from utils.tenant import schema_key
+
+
+class UserDeleteService:
+
+    @classmethod
+    async def bulk_delete(
+        cls,
+        user_ids: list[UUID] | None = None,
+        role: UserRole | None = None,
+        created_to: datetime | None = None,
+        soft: bool = False,
+        excluded_id: UUID | None = None,
+    ) -> int:
+        """Delete the users matching all given filters except `excluded_id`, returns their number.
+
+        Users are deleted one transaction per batch. Soft deleted users are hidden at once and purged later
+        by `purge_deleted` in the background, otherwise users and their tokens are deleted here.
+        """
+        filters = dict(user_ids=user_ids, role=role, created_to=created_to, excluded_id=excluded_id)
+        delete_batch = cls._mark_batch_deleted if soft else cls._delete_batch
+
+        deleted = 0
+        while batch := await delete_batch(**filters):
+            deleted += len(batch)
+        return deleted
+
+    @classmethod
+    async def purge_deleted(cls) -> None:
+        """Delete soft deleted users with their tokens in batches, pausing between them to let other writers in."""
+        while len(await cls._delete_batch(deleted=True)) == settings.USER_DELETE_BATCH_SIZE:
+            await asyncio.sleep(settings.USER_PURGE_BATCH_PAUSE)
+
+    @classmethod
+    async def _delete_batch(cls, **filters) -> list[UUID]:
+        async with AsyncSession() as session:
+            batch = await UserRepository.select_user_ids_for_delete(session, settings.USER_DELETE_BATCH_SIZE, **filters)
+            if batch:
+                await UserRepository.delete_users_with_tokens(session, batch)
+                await session.commit()
+        cls._forget(batch)
+        return batch
+
+    @classmethod
+    async def _mark_batch_deleted(cls, **filters) -> list[UUID]:
+        async with AsyncSession() as session:
+            batch = await UserRepository.mark_users_deleted(session, settings.USER_DELETE_BATCH_SIZE, **filters)
+            await session.commit()
+        cls._forget(batch)
+        return batch
+
+    @staticmethod
+    def _forget(user_ids: list[UUID]) -> None:
+        for user_id in map(str, user_ids):
+            principal_cache.delete(schema_key(user_id))
+            email_etags.delete(schema_key(user_id))
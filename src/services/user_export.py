@@ -0,0 +1,64 @@
+"""User bulk export service."""
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.user import UserRepository
+from utils.enums import DataFormat, UserRole
+
+EXPORT_COLUMNS = ("id", "name", "surname", "login", "email", "role", "created_at", "updated_at")
+MEDIA_TYPES = {DataFormat.csv: "text/csv", DataFormat.ndjson: "application/x-ndjson"}
+
+
+class UserExportService:
+
+    @classmethod
+    async def export_users(
+        cls,
+        file_format: DataFormat,
+        role: UserRole | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """Stream users chunk by chunk, one chunk per cursor partition.
+
+        The next partition is fetched only after the previous chunk was consumed by the response,
+        so memory usage does not depend on the table size.
+        """
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+        if file_format == DataFormat.csv:
+            yield cls._encode(cls._to_csv([EXPORT_COLUMNS]), compressor)
+
+        async with AsyncSession() as session:
+            result = await UserRepository.stream_users(
+                session, settings.EXPORT_BATCH_SIZE, role, created_from, created_to
+            )
+            async for rows in result.partitions():
+                chunk = cls._to_csv(rows) if file_format == DataFormat.csv else cls._to_ndjson(rows)
+                if data := cls._encode(chunk, compressor):
+                    yield data
+
+        if compressor:
+            yield compressor.flush()
+
+    @staticmethod
+    def _encode(chunk: str, compressor=None) -> bytes:
+        data = chunk.encode()
+        return compressor.compress(data) if compressor else data
+
+    @staticmethod
+    def _to_csv(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _to_ndjson(rows) -> str:
+        return "".join(json.dumps(dict(row._mapping), default=str, ensure_ascii=False) + "\n" for row in rows)
@@ -0,0 +1,158 @@
+"""User bulk import service."""
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from uuid import uuid4
+
+from pydantic import ValidationError
+
+from common.errors import FileEncodingError
+from common.settings import settings
+from db.connector import AsyncSession
+from dto.schemas.users import UserImport
+from repositories.user import UserRepository
+from utils.auth import get_hashed_pwds
+from utils.enums import DataFormat
+
+CONFLICT_DETAIL = "User with such login or email already exists"
+
+
+async def decode_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """UTF-8 lines of a byte stream, a line is held in memory only until its end arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+    tail = ""
+    async for chunk in chunks:
+        *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    if tail := tail + decoder.decode(b"", final=True):
+        yield tail
+
+
+class UserImportService:
+
+    @classmethod
+    async def import_users(
+        cls,
+        lines: AsyncIterable[str],
+        file_format: DataFormat,
+        skip_rows: int = 0,
+        batch_size: int | None = None,
+    ) -> dict:
+        """Import users batch by batch, each batch is committed in its own transaction.
+
+        Rows up to `skip_rows` are skipped, so an interrupted import can be resumed from `last_row`.
+        Raises FileEncodingError with the last imported row when the file is not valid UTF-8.
+        """
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        result = {"imported": 0, "last_row": skip_rows, "errors": []}
+
+        batch = []
+        try:
+            async for row_number, row in cls._iter_rows(lines, file_format):
+                if row_number <= skip_rows:
+                    continue
+                batch.append((row_number, row))
+                if len(batch) >= batch_size:
+                    await cls._import_batch(batch, result)
+                    batch = []
+        except UnicodeDecodeError:
+            raise FileEncodingError(fields=[str(result["last_row"])]) from None
+        if batch:
+            await cls._import_batch(batch, result)
+
+        result["errors"].sort(key=lambda error: error["row"])
+        return result
+
+    @staticmethod
+    async def _iter_rows(lines: AsyncIterable[str], file_format: DataFormat) -> AsyncIterator[tuple[int, dict | str]]:
+        if file_format == DataFormat.csv:
+            async for row_number, row in _iter_csv_rows(lines):
+                yield row_number, row
+            return
+
+        row_number = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"Invalid JSON: {e}"
+
+    @staticmethod
+    async def _import_batch(batch: list[tuple[int, dict | str]], result: dict) -> None:
+        errors = result["errors"]
+
+        users = []
+        for row_number, row in batch:
+            if isinstance(row, str):
+                errors.append({"row": row_number, "detail": row})
+                continue
+            try:
+                users.append((row_number, UserImport.model_validate(row)))
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "detail": e.errors(include_url=False, include_context=False, include_input=False),
+                })
+
+        if users:
+            async with AsyncSession() as session:
+                taken = await UserRepository.select_taken_logins_and_emails(
+                    session, [user.login for _, user in users], [user.email for _, user in users]
+                )
+            for row_number, user in users:
+                if user.login in taken or user.email in taken:
+                    errors.append({"row": row_number, "detail": CONFLICT_DETAIL})
+            users = [(row_number, user) for row_number, user in users if not {user.login, user.email} & taken]
+
+        if users:
+            hashed_pwds = await get_hashed_pwds([user.pwd for _, user in users])
+            records = [
+                (uuid4(), user.name, user.surname, user.login, user.email, hashed_pwd, user.role.value)
+                for (_, user), hashed_pwd in zip(users, hashed_pwds)
+            ]
+            async with AsyncSession() as session:
+                inserted = await UserRepository.copy_users(session, records)
+                await session.commit()
+
+            result["imported"] += len(inserted)
+            errors.extend(
+                {"row": row_number, "detail": CONFLICT_DETAIL}
+                for (row_number, _), record in zip(users, records)
+                if record[0] not in inserted
+            )
+
+        result["last_row"] = batch[-1][0]
+
+
+async def _iter_csv_rows(lines: AsyncIterable[str]) -> AsyncIterator[tuple[int, dict]]:
+    """Rows of a CSV with a header, like csv.DictReader but over an async stream of lines.
+
+    Lines are joined into one record while a quoted field is open, an even quote count closes it.
+    """
+    fieldnames = None
+    row_number = 0
+    async for values in _iter_csv_records(lines):
+        if fieldnames is None:
+            fieldnames = values
+            continue
+        row_number += 1
+        yield row_number, dict(zip(fieldnames, values))
+
+
+async def _iter_csv_records(lines: AsyncIterable[str]) -> AsyncIterator[list[str]]:
+    record, quotes = [], 0
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        if values := next(csv.reader(record), []):
+            yield values
+        record, quotes = [], 0
+    if record and (values := next(csv.reader(record), [])):
+        yield values
@@ -1,71 +1,200 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+import base64
+import hashlib
+import logging
+import math
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from uuid import uuid4
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from sqlalchemy.engine.row import Row
 
 from common.settings import settings
 from db.connector import AsyncSession
-from db.tables import User
 from repositories.user import UserRepository
-from utils.enums import TokenType
+from utils.cache import TTLCache
+from utils.enums import TokenProfile, TokenType, UserRole
+from utils.jwt_codec import InvalidTokenTypeError, jwt_codec
+from utils.keyring import keyring
+from utils.principal import Principal
+from utils.revocation import revocation_list
+from utils.singleflight import SingleFlight
+from utils.tenant import schema_key
+from utils.tracing import span
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+logger = logging.getLogger(__name__)
+
+MAX_BCRYPT_ROUNDS = 20
+
+ROLE_CODES = {UserRole.admin: 0, UserRole.user: 1, UserRole.executor: 2}
+ROLES_BY_CODE = {code: role for role, code in ROLE_CODES.items()}
+
+_hash_executor: ProcessPoolExecutor | None = None
+
+user_lookups = SingleFlight("get_user")
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_TTL, settings.PRINCIPAL_CACHE_SIZE)
+
+
+def get_pwd_context_config(bcrypt_rounds: int | None = None) -> dict:
+    """Password hashing config, the first of PWD_SCHEMES hashes new passwords and the rest are deprecated.
+
+    Argon2 needs the argon2-cffi package.
+    """
+    config = {
+        "schemes": settings.PWD_SCHEMES.split(","),
+        "deprecated": "auto",
+        "argon2__time_cost": settings.PWD_ARGON2_TIME_COST,
+        "argon2__memory_cost": settings.PWD_ARGON2_MEMORY_COST,
+        "argon2__parallelism": settings.PWD_ARGON2_PARALLELISM,
+    }
+    if bcrypt_rounds:
+        config.update({"bcrypt__default_rounds": bcrypt_rounds, "bcrypt__min_rounds": bcrypt_rounds})
+    return config
+
+
+pwd_context = CryptContext(**get_pwd_context_config(settings.PWD_BCRYPT_ROUNDS))
+
+
+def calibrate_bcrypt_rounds(target_ms: float, samples: int = 3) -> int:
+    """The largest bcrypt cost factor whose hash takes at most `target_ms` on this machine.
+
+    Each extra round doubles the hashing time, so it is extrapolated from the fastest of a few cheap hashes.
+    """
+    sample_rounds = 6
+    handler = bcrypt.using(rounds=sample_rounds)
+    elapsed_ms = min(timeit.timeit(lambda: handler.hash("calibration"), number=1) for _ in range(samples)) * 1000
+    rounds = sample_rounds + math.floor(math.log2(target_ms / elapsed_ms))
+    return min(max(rounds, settings.PWD_BCRYPT_MIN_ROUNDS), MAX_BCRYPT_ROUNDS)
+
+
+def configure_pwd_context() -> None:
+    """Apply PWD_BCRYPT_ROUNDS or the cost factor calibrated for PWD_HASH_TARGET_MS.
+
+    Stored hashes with fewer rounds or of a deprecated scheme are rehashed on the next login.
+    """
+    bcrypt_rounds = settings.PWD_BCRYPT_ROUNDS
+    if not bcrypt_rounds and settings.PWD_HASH_TARGET_MS:
+        bcrypt_rounds = calibrate_bcrypt_rounds(settings.PWD_HASH_TARGET_MS)
+    pwd_context.load(get_pwd_context_config(bcrypt_rounds))
+    logger.info("Password hashing: schemes %s, bcrypt rounds %s", settings.PWD_SCHEMES, bcrypt_rounds or "default")
+
+
+def _init_hash_worker(config: dict) -> None:
+    pwd_context.load(config)
 
 
 def get_hashed_pwd(pwd: str) -> str:
     return pwd_context.hash(pwd)
 
 
+def needs_rehash(hashed_pwd: str) -> bool:
+    return pwd_context.needs_update(hashed_pwd)
+
+
+async def get_hashed_pwds(pwds: list[str]) -> list[str]:
+    """Hash a batch of passwords in parallel across CPU cores."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PWD_HASH_WORKERS, initializer=_init_hash_worker, initargs=(pwd_context.to_dict(),)
+        )
+
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*(loop.run_in_executor(_hash_executor, get_hashed_pwd, pwd) for pwd in pwds)))
+
+
 def verify_pwd(plain_pwd: str, hashed_pwd: str) -> bool:
-    return pwd_context.verify(plain_pwd, hashed_pwd)
+    with span("pwd.verify"):
+        return pwd_context.verify(plain_pwd, hashed_pwd)
+
+
+def get_user_agent_fingerprint(user_agent: str) -> str:
+    """Short stable fingerprint of the user agent, used instead of the full string in compact tokens."""
+    return base64.urlsafe_b64encode(hashlib.sha256(user_agent.encode()).digest()[:6]).decode()
 
 
 def create_tokens(data: dict, access_time_delta: int, refresh_time_delta: int) -> tuple[str, str, str]:
-    to_encode = data.copy()
-    datetime_now = datetime.now(timezone.utc)
-    expire = datetime_now + timedelta(minutes=access_time_delta)
-    to_encode.update({
-        "exp": expire,
-        "iss": settings.SERVICE_NAME,
-        "nbf": datetime_now,
-        "iat": datetime_now,
-        "jti": str(uuid4()),
-    })
-    access_token = jwt.encode(
-        payload=to_encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM, headers={"typ": TokenType.access}
+    """Create access and refresh tokens for `data` with sub, role and user_agent.
+
+    The compact profile uses short claim names, a numeric role code and a user agent fingerprint,
+    and keeps only the claims the refresh flow needs in the refresh token.
+    """
+    with span("jwt.encode", **{"token.profile": settings.TOKEN_PROFILE}):
+        return _create_tokens(data, access_time_delta, refresh_time_delta)
+
+
+def _create_tokens(data: dict, access_time_delta: int, refresh_time_delta: int) -> tuple[str, str, str]:
+    issued_at = int(datetime.now(timezone.utc).timestamp())
+    if settings.TOKEN_PROFILE == TokenProfile.compact:
+        refresh_claims = {"sub": data["sub"], "r": ROLE_CODES[data["role"]], "iat": issued_at}
+        access_claims = refresh_claims | {"ua": get_user_agent_fingerprint(data["user_agent"])}
+    else:
+        access_claims = data | {"iss": settings.SERVICE_NAME, "nbf": issued_at, "iat": issued_at}
+        refresh_claims = access_claims
+
+    signing_key = keyring.get_signing_key()
+    access_token = jwt_codec.encode(
+        access_claims | {"exp": issued_at + access_time_delta * 60, "jti": str(uuid4())},
+        TokenType.access,
+        signing_key,
     )
 
     refresh_jti = str(uuid4())
-    expire = datetime_now + timedelta(minutes=refresh_time_delta)
-    to_encode.update({"exp": expire, "jti": refresh_jti})
-    refresh_token = jwt.encode(
-        payload=to_encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM, headers={"typ": TokenType.refresh}
+    refresh_token = jwt_codec.encode(
+        refresh_claims | {"exp": issued_at + refresh_time_delta * 60, "jti": refresh_jti},
+        TokenType.refresh,
+        signing_key,
     )
 
     return access_token, refresh_token, refresh_jti
 
 
+def decode_token(token: str, verify_exp: bool = True, token_type: TokenType | None = None) -> dict:
+    """Verify the token with the key selected by its `kid` and return the payload.
+
+    With `token_type` a token of another type raises InvalidTokenTypeError.
+    Claims of both token profiles are returned under the full names.
+    """
+    with span("jwt.decode"):
+        _, payload = jwt_codec.decode(token, keyring.get_verifying_key, token_type, verify_exp)
+    if "r" in payload:
+        payload["role"] = ROLES_BY_CODE.get(payload.pop("r"))
+    return payload
+
+
 def get_token(request: Request) -> str:
     if not (token := request.cookies.get("access_token")):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token not found")
     return token
 
 
-async def get_current_user(token: str = Depends(get_token)) -> User:
-    check_token_type(token, TokenType.access)
-
+async def get_access_token_payload(token: str = Depends(get_token)) -> dict:
+    """Payload of a valid and not revoked access token."""
     try:
-        payload = jwt.decode(token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token, token_type=TokenType.access)
+    except InvalidTokenTypeError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
     except jwt.PyJWTError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
-    if not (user_id := payload.get("sub")):
+    if not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    async with AsyncSession() as session:
-        user = await UserRepository.get_user(session, user_id)
+    if await revocation_list.is_revoked(payload.get("jti", "")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+
+    return payload
+
+
+async def get_current_user(payload: dict = Depends(get_access_token_payload)) -> Principal:
+    user_id = payload["sub"]
+    if (user := principal_cache.get(schema_key(user_id))) is None:
+        user = await user_lookups.do(schema_key(user_id), lambda: _get_principal(user_id))
 
     if not user or payload.get("role") != user.role:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
@@ -73,20 +202,36 @@ async def get_current_user(token: str = Depends(get_token)) -> User:
     return user
 
 
-def check_token_type(token: str, required_type: TokenType) -> None:
-    header = jwt.get_unverified_header(token)
-    if (token_type := header.get("typ")) and token_type != required_type:
+async def get_current_profile(payload: dict = Depends(get_access_token_payload)) -> Row:
+    """Profile of the token subject with the principal columns, loaded by one query."""
+    async with AsyncSession() as session:
+        profile = await UserRepository.get_user_profile(session, payload["sub"])
+
+    if not profile or payload.get("role") != profile.role:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
 
+    if settings.PRINCIPAL_CACHE_TTL:
+        principal_cache.set(schema_key(payload["sub"]), Principal(profile.id, profile.role, profile.updated_at))
+    return profile
+
+
+async def _get_principal(user_id: str) -> Principal | None:
+    async with AsyncSession() as session:
+        principal = await UserRepository.get_principal(session, user_id)
+    if principal and settings.PRINCIPAL_CACHE_TTL:
+        principal_cache.set(schema_key(user_id), principal)
+    return principal
+
 
 async def get_refresh_token_payload(token: str) -> dict:
     try:
-        payload = jwt.decode(token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token, token_type=TokenType.refresh)
+
+    except InvalidTokenTypeError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
 
     except jwt.ExpiredSignatureError as e:
-        payload = jwt.decode(
-            token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM], options={"verify_exp": False}
-        )
+        payload = decode_token(token, verify_exp=False)
         async with AsyncSession() as session:
             await UserRepository.delete_refresh_token_by_jti(session, payload.get("jti"))
             await session.commit()
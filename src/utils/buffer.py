@@ -0,0 +1,47 @@
+"""Bounded in-process buffer for events written in batches."""
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from common.metrics import Counter, Gauge
+
+buffered_events = Gauge("buffered_events", "Events waiting to be written")
+dropped_events = Counter("buffered_events_dropped_total", "Events dropped because the buffer was full or not written")
+
+
+class EventBuffer:
+    """FIFO of events with a fixed capacity, new events are dropped when it is full.
+
+    `on_batch` is called once the buffer holds `batch_size` events, so a writer can flush early.
+    """
+
+    def __init__(self, name: str, capacity: int, batch_size: int, on_batch: Callable[[], None] | None = None) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.events: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def put(self, event: Any) -> bool:
+        if len(self.events) >= self.capacity:
+            dropped_events.inc(buffer=self.name)
+            return False
+
+        self.events.append(event)
+        buffered_events.set(len(self.events), buffer=self.name)
+        if len(self.events) == self.batch_size and self.on_batch:
+            self.on_batch()
+        return True
+
+    def take(self) -> list:
+        """Remove and return up to `batch_size` oldest events."""
+        batch = [self.events.popleft() for _ in range(min(self.batch_size, len(self.events)))]
+        buffered_events.set(len(self.events), buffer=self.name)
+        return batch
+
+    def drop(self, count: int) -> None:
+        """Account for taken events that could not be written."""
+        dropped_events.inc(count, buffer=self.name)
@@ -0,0 +1,40 @@
+"""Client address behind trusted reverse proxies."""
+import ipaddress
+from functools import lru_cache
+
+from fastapi import Request
+
+from common.settings import settings
+
+
+@lru_cache
+def _parse_networks(value: str) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(network.strip(), strict=False) for network in value.split(",") if network.strip())
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def get_client_ip(request: Request) -> str:
+    """Peer address, or the client address reported by a trusted proxy in CLIENT_IP_HEADER.
+
+    The header is read only when the peer is one of TRUSTED_PROXIES (addresses or networks). Its addresses
+    are taken from the right, skipping trusted proxies, so a client can not pick its address by sending
+    the header itself.
+    """
+    peer = request.client.host if request.client else ""
+    if not settings.CLIENT_IP_HEADER or not (proxies := _parse_networks(settings.TRUSTED_PROXIES)):
+        return peer
+    if not _is_trusted(peer, proxies) or not (forwarded := request.headers.getlist(settings.CLIENT_IP_HEADER)):
+        return peer
+
+    addresses = [address.strip() for address in ",".join(forwarded).split(",") if address.strip()]
+    for address in reversed(addresses):
+        if not _is_trusted(address, proxies):
+            return address
+    return addresses[0] if addresses else peer
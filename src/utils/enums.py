@@ -10,3 +10,19 @@ class UserRole(StrEnum):
 class TokenType(StrEnum):
     access = "acc"
     refresh = "ref"
+
+
+class TokenProfile(StrEnum):
+    full = "full"
+    compact = "compact"
+
+
+class DataFormat(StrEnum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class UserEventType(StrEnum):
+    created = "user.created"
+    updated = "user.updated"
+    deleted = "user.deleted"
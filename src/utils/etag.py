@@ -0,0 +1,31 @@
+"""Conditional GET helpers."""
+from datetime import UTC, datetime
+from uuid import UUID
+
+from fastapi import Request, Response, status
+
+
+def make_etag(object_id: UUID | str, updated_at: datetime) -> str:
+    """Validator derived from the row identity and its update time, no body hashing needed."""
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=UTC)
+    return f'"{UUID(str(object_id)).hex}-{int(updated_at.timestamp() * 1_000_000):x}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` with the If-None-Match header."""
+    if not (if_none_match := request.headers.get("if-none-match")):
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control)
+    return response
@@ -0,0 +1,107 @@
+"""Signing keys keyring."""
+import hmac
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import jwt
+from jwt.algorithms import HMACAlgorithm
+
+from common.settings import settings
+from dto.schemas.keyring import SigningKeyConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KID = "default"
+
+
+class SigningKey:
+    """Key objects prepared once for signing and verification."""
+
+    __slots__ = ("config", "jwa", "hmac", "signing_key", "verifying_key")
+
+    def __init__(self, config: SigningKeyConfig) -> None:
+        algorithm = jwt.get_algorithm_by_name(config.algorithm)
+        self.config = config
+        self.jwa = algorithm
+        self.signing_key = algorithm.prepare_key(config.key)
+        # Keyed HMAC state copied for every token instead of hashing the key each time.
+        self.hmac = (
+            hmac.new(self.signing_key, digestmod=algorithm.hash_alg)
+            if isinstance(algorithm, HMACAlgorithm) else None
+        )
+        if config.public_key:
+            self.verifying_key = algorithm.prepare_key(config.public_key)
+        elif hasattr(self.signing_key, "public_key"):
+            self.verifying_key = self.signing_key.public_key()
+        else:
+            self.verifying_key = self.signing_key
+
+    @property
+    def kid(self) -> str:
+        return self.config.kid
+
+    @property
+    def algorithm(self) -> str:
+        return self.config.algorithm
+
+
+class Keyring:
+    """Active and retiring signing keys selected by the `kid` token header.
+
+    The signing key is the most recently activated key whose `active_from` has passed, so a rotation is
+    scheduled by adding the next key with a future `active_from` to SIGNING_KEYS_FILE: every replica can
+    verify its tokens before any replica signs with it. Old keys keep verifying until `expires_at`, so
+    sessions move to the new key as their tokens are refreshed instead of all at once.
+    Tokens without `kid` are verified with the SECRET_KEY / ALGORITHM key.
+    """
+
+    def __init__(self) -> None:
+        self.keys: dict[str, SigningKey] = {}
+        self.loaded_mtime: float | None = None
+
+    def load(self) -> None:
+        """Load all keys, the current keys are kept if the keys file is invalid."""
+        configs, mtime = [], None
+        if settings.SECRET_KEY and settings.ALGORITHM:
+            configs.append(SigningKeyConfig(
+                kid=DEFAULT_KID,
+                algorithm=settings.ALGORITHM,
+                key=settings.SECRET_KEY,
+                public_key=settings.PUBLIC_KEY or None,
+            ))
+        if settings.SIGNING_KEYS_FILE:
+            path = Path(settings.SIGNING_KEYS_FILE)
+            mtime = path.stat().st_mtime
+            configs.extend(SigningKeyConfig.model_validate(item) for item in json.loads(path.read_text()))
+
+        keys = {config.kid: SigningKey(config) for config in configs}
+        self.keys, self.loaded_mtime = keys, mtime
+
+    async def reload(self) -> None:
+        """Reload keys if SIGNING_KEYS_FILE has changed."""
+        if settings.SIGNING_KEYS_FILE and Path(settings.SIGNING_KEYS_FILE).stat().st_mtime != self.loaded_mtime:
+            self.load()
+            logger.info("Signing keys reloaded: %s", ", ".join(self.keys))
+
+    def get_signing_key(self) -> SigningKey:
+        now = datetime.now(timezone.utc)
+        active_from_min = datetime.min.replace(tzinfo=timezone.utc)
+        candidates = [
+            key for key in self.keys.values()
+            if (key.config.active_from is None or key.config.active_from <= now) and not key.config.is_expired(now)
+        ]
+        if not candidates:
+            raise jwt.InvalidKeyError("No active signing key")
+        return max(candidates, key=lambda key: key.config.active_from or active_from_min)
+
+    def get_verifying_key(self, kid: str | None) -> SigningKey:
+        key = self.keys.get(kid or DEFAULT_KID)
+        if key is None or key.config.is_expired(datetime.now(timezone.utc)):
+            raise jwt.InvalidKeyError("Unknown signing key")
+        return key
+
+
+keyring = Keyring()
+keyring.load()
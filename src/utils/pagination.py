@@ -0,0 +1,23 @@
+"""Opaque cursors for keyset pagination."""
+import base64
+from collections.abc import Callable
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(position: datetime | float, row_id: UUID | str) -> str:
+    value = position.isoformat() if isinstance(position, datetime) else repr(position)
+    return base64.urlsafe_b64encode(f"{value}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, parse: Callable[[str], datetime | float] = datetime.fromisoformat
+) -> tuple[datetime | float, UUID]:
+    """Position of the last row of the previous page, (sort key, id)."""
+    try:
+        position, row_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return parse(position), UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
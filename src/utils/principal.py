@@ -0,0 +1,15 @@
+"""Authenticated user as seen by the authorization layer."""
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from utils.enums import UserRole
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authorization fields of a user, loaded without the rest of the row and safe to share between requests."""
+
+    id: UUID
+    role: UserRole
+    updated_at: datetime
@@ -0,0 +1,70 @@
+"""Token-bucket rate limiter."""
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: int, rate: float, now: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Seconds until the bucket has a whole token."""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """In-process token buckets keyed by an arbitrary string.
+
+    Buckets are kept in LRU order and the least recently used ones are dropped above `max_keys`,
+    a dropped bucket is recreated full.
+    """
+
+    def __init__(self, capacity: int, per_minute: float, max_keys: int = 100_000) -> None:
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def get_bucket(self, key: str, now: float) -> TokenBucket:
+        if (bucket := self.buckets.get(key)) is None:
+            bucket = self.buckets[key] = TokenBucket(self.capacity, self.rate, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        bucket.refill(now)
+        return bucket
+
+
+def acquire(limits: list[tuple[RateLimiter, str]]) -> tuple[float, int | None]:
+    """Take one token from every bucket, or from none of them if any bucket is empty.
+
+    Returns the retry-after delay in seconds and the index of the limit that rejected the request.
+    """
+    now = time.monotonic()
+    buckets = [limiter.get_bucket(key, now) for limiter, key in limits]
+
+    for index, bucket in enumerate(buckets):
+        if wait_time := bucket.wait_time():
+            return wait_time, index
+
+    for bucket in buckets:
+        bucket.tokens -= 1
+    return 0.0, None
+
+
+def release(limits: list[tuple[RateLimiter, str]]) -> None:
+    """Give back the tokens taken by a successful `acquire` of the same limits."""
+    now = time.monotonic()
+    for limiter, key in limits:
+        bucket = limiter.get_bucket(key, now)
+        bucket.tokens = min(bucket.capacity, bucket.tokens + 1)
@@ -0,0 +1,92 @@
+"""Revoked access tokens list."""
+import time
+from datetime import datetime, timedelta
+
+from common.metrics import Counter, Gauge
+from common.settings import settings
+from db.connector import AsyncSession
+from repositories.token import RevokedTokenRepository
+from utils.bloom import BloomFilter
+from utils.tenant import get_tenant_schemas
+
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+filter_hits = Counter("revocation_filter_hits_total", "Access tokens found in the revocation filter")
+filter_false_positives = Counter(
+    "revocation_filter_false_positives_total", "Revocation filter hits not confirmed by the database"
+)
+filter_size = Gauge("revocation_filter_size", "Revoked access tokens in the revocation filter")
+
+
+class RevocationList:
+    """Revoked access token jtis mirrored into an in-memory Bloom filter.
+
+    A jti missing from the filter is not revoked, so only filter hits go to the database.
+    One filter holds the tokens of all tenant schemas, jtis are unique across them.
+    The filter is refreshed incrementally with tokens revoked since the last refresh and rebuilt from
+    the not yet expired ones once per access token lifetime, which bounds its size.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filter = BloomFilter(capacity, error_rate)
+        self.synced_until: dict[str, datetime] = {}
+        self.rebuilt_at = time.monotonic()
+
+    def might_be_revoked(self, jti: str) -> bool:
+        return jti in self.filter
+
+    async def is_revoked(self, jti: str) -> bool:
+        if not self.might_be_revoked(jti):
+            return False
+
+        filter_hits.inc()
+        async with AsyncSession() as session:
+            revoked = await RevokedTokenRepository.is_revoked(session, jti)
+        if not revoked:
+            filter_false_positives.inc()
+        return revoked
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        async with AsyncSession() as session:
+            await RevokedTokenRepository.insert_revoked_token(session, jti, expires_at)
+            await session.commit()
+        self.filter.add(jti)
+        filter_size.set(self.filter.count)
+
+    async def refresh(self) -> None:
+        rebuild = (
+            time.monotonic() - self.rebuilt_at >= settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            or self.filter.count > self.filter.capacity
+        )
+        rows = []
+        for schema in get_tenant_schemas():
+            rows.extend(await self._fetch(schema, rebuild))
+
+        if rebuild:
+            bloom_filter = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            for row in rows:
+                bloom_filter.add(str(row.jti))
+            self.filter, self.rebuilt_at = bloom_filter, time.monotonic()
+        else:
+            for row in rows:
+                self.filter.add(str(row.jti))
+        filter_size.set(self.filter.count)
+
+    async def _fetch(self, schema: str, rebuild: bool) -> list:
+        """Tokens of the schema revoked since its last refresh, or all of its active ones on rebuild."""
+        synced_until = self.synced_until.get(schema)
+        async with AsyncSession(schema) as session:
+            if rebuild:
+                await RevokedTokenRepository.delete_expired(session)
+                await session.commit()
+            created_after = synced_until - REFRESH_OVERLAP if synced_until and not rebuild else None
+            rows = await RevokedTokenRepository.select_active(session, created_after)
+
+        if rows:
+            self.synced_until[schema] = max(synced_until or rows[0].created_at, *(row.created_at for row in rows))
+        return rows
+
+
+revocation_list = RevocationList(settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_ERROR_RATE)
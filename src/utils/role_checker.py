@@ -1,10 +1,12 @@
 """Role checker module"""
+import hmac
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 
-from db.tables import User
-from utils.auth import get_current_user
+from common.settings import settings
+from utils.auth import get_access_token_payload, get_current_user, get_token
 from utils.enums import UserRole
+from utils.principal import Principal
 
 
 class RoleChecker:
@@ -12,7 +14,7 @@ class RoleChecker:
     def __init__(self, allowed_roles: set[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, user: User = Depends(get_current_user)) -> User:
+    def __call__(self, user: Principal = Depends(get_current_user)) -> Principal:
 
         if user.role not in self.allowed_roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access is denied")
@@ -21,3 +23,11 @@ class RoleChecker:
 
 allowed_for_admin = RoleChecker({UserRole.admin})
 allowed_for_all = RoleChecker({role for role in UserRole})
+
+
+async def allowed_for_service_or_admin(request: Request) -> Principal | None:
+    """Let in services sending SERVICE_TOKEN in the X-Service-Token header, and admins."""
+    service_token = request.headers.get("x-service-token", "")
+    if settings.SERVICE_TOKEN and hmac.compare_digest(service_token.encode(), settings.SERVICE_TOKEN.encode()):
+        return None
+    return allowed_for_admin(await get_current_user(await get_access_token_payload(get_token(request))))
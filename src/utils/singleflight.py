@@ -0,0 +1,48 @@
+"""Coalescing of concurrent identical calls."""
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from common.metrics import Counter
+
+coalesced_calls = Counter("singleflight_coalesced_total", "Calls served by an already running identical call")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result with concurrent callers.
+
+    The call runs in its own task, so a cancelled caller does not cancel it for the others.
+    It is cancelled only when every caller waiting for it has gone.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls: dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        if (call := self.calls.get(key)) is None:
+            call = self.calls[key] = _Call(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            coalesced_calls.inc(name=self.name)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self.calls.get(key) is call:
+            del self.calls[key]
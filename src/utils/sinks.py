@@ -0,0 +1,65 @@
+"""Destinations of outbox events."""
+import asyncio
+import hashlib
+import hmac
+import json
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+class SubscriberSink:
+    """In-process subscribers, a batch is delivered once every subscriber has handled it without an error."""
+
+    def __init__(self) -> None:
+        self.subscribers: list[Callable[[list[dict]], Awaitable[None]]] = []
+
+    def subscribe(self, handler: Callable[[list[dict]], Awaitable[None]]) -> None:
+        self.subscribers.append(handler)
+
+    async def deliver(self, events: list[dict]) -> None:
+        for handler in self.subscribers:
+            await handler(events)
+
+    async def close(self) -> None:
+        pass
+
+
+class WebhookSink:
+    """POST event batches as JSON to every webhook, a batch is delivered once all of them answered 2xx.
+
+    A batch retried after a partial failure reaches some webhooks twice, so receivers deduplicate by event id.
+    The body is signed with HMAC-SHA256 of `secret` when it is set.
+    """
+
+    def __init__(
+        self, urls: list[str], secret: str = "", timeout: float = 5, transport: httpx.AsyncBaseTransport | None = None
+    ) -> None:
+        self.urls = urls
+        self.secret = secret.encode()
+        self.timeout = timeout
+        self.transport = transport
+        self.client: httpx.AsyncClient | None = None
+
+    def sign(self, body: bytes) -> str:
+        return "sha256=" + hmac.new(self.secret, body, hashlib.sha256).hexdigest()
+
+    async def deliver(self, events: list[dict]) -> None:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+
+        body = json.dumps({"events": events}, default=str).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            headers[SIGNATURE_HEADER] = self.sign(body)
+
+        responses = await asyncio.gather(*(self.client.post(url, content=body, headers=headers) for url in self.urls))
+        for response in responses:
+            response.raise_for_status()
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
@@ -0,0 +1,69 @@
+"""Tenant of the current request and its database schema."""
+import contextlib
+import functools
+import re
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from contextvars import ContextVar
+
+from common.settings import settings
+
+TENANT_NAME = re.compile(r"[a-z][a-z0-9_]{0,29}")
+
+current_schema: ContextVar[str | None] = ContextVar("current_schema", default=None)
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_tenants(value: str) -> frozenset[str]:
+    tenants = frozenset(filter(None, (tenant.strip() for tenant in value.split(","))))
+    if invalid := sorted(tenant for tenant in tenants if not TENANT_NAME.fullmatch(tenant)):
+        raise ValueError(f"Invalid tenant names: {', '.join(invalid)}")
+    return tenants
+
+
+def get_tenants() -> frozenset[str]:
+    return _parse_tenants(settings.TENANTS)
+
+
+def get_tenant_schema(tenant: str) -> str:
+    return f"{settings.DB_SCHEMA}_{tenant}"
+
+
+def get_tenant_schemas() -> list[str]:
+    """The default schema followed by the schemas of all tenants."""
+    return [settings.DB_SCHEMA, *(get_tenant_schema(tenant) for tenant in sorted(get_tenants()))]
+
+
+def get_schema() -> str:
+    """Schema of the current tenant, the default one outside of a tenant request."""
+    return current_schema.get() or settings.DB_SCHEMA
+
+
+def schema_key(key: Hashable) -> tuple[str, Hashable]:
+    """Key of an in-process cache entry, so that tenants never see each other's entries."""
+    return get_schema(), key
+
+
+@contextlib.contextmanager
+def use_schema(schema: str) -> Iterator[None]:
+    token = current_schema.set(schema)
+    try:
+        yield
+    finally:
+        current_schema.reset(token)
+
+
+def for_each_schema(func: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """Run a background job once per schema, a failure in one schema does not skip the others."""
+
+    async def run() -> None:
+        errors = []
+        for schema in get_tenant_schemas():
+            with use_schema(schema):
+                try:
+                    await func()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise ExceptionGroup(f"Failed in {len(errors)} schemas", errors)
+
+    return run
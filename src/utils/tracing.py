@@ -0,0 +1,177 @@
+"""In-process tracing with W3C trace context propagation and batched OTLP/JSON export."""
+import asyncio
+import contextlib
+import functools
+import json
+import random
+import re
+import secrets
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from common.settings import settings
+from utils.buffer import EventBuffer
+
+TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER = 1, 2
+STATUS_CODE_ERROR = 2
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(
+        self, name: str, trace_id: str, parent_id: str | None, attributes: dict, kind: int = SPAN_KIND_INTERNAL
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+finished_spans = EventBuffer("spans", settings.TRACING_BUFFER_SIZE, settings.TRACING_EXPORT_BATCH_SIZE)
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Trace id, parent span id and the sampled flag of a valid `traceparent` header."""
+    if not value or not (match := TRACEPARENT.fullmatch(value.strip().lower())):
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+@contextlib.contextmanager
+def start_trace(name: str, traceparent: str | None = None, **attributes) -> Iterator[Span | None]:
+    """Server span of a request, continuing the caller's trace when `traceparent` is valid.
+
+    Sampling is decided here once per trace: the caller's sampled flag is kept, a new trace is sampled
+    with TRACING_SAMPLE_RATE. Nothing is recorded for the rest of an unsampled trace.
+    """
+    if parent := parse_traceparent(traceparent):
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id, sampled = None, None, random.random() < settings.TRACING_SAMPLE_RATE
+
+    if not sampled:
+        yield None
+        return
+    with _record(Span(name, trace_id or secrets.token_hex(16), parent_id, attributes, SPAN_KIND_SERVER)) as span:
+        yield span
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Span | None]:
+    """Child of the current span, a no-op outside of a sampled trace."""
+    if (parent := current_span.get()) is None:
+        yield None
+        return
+    with _record(Span(name, parent.trace_id, parent.span_id, attributes)) as child:
+        yield child
+
+
+def traced(name: str) -> Callable:
+    """Record every call of the decorated coroutine function as a span."""
+
+    def decorator(func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return await func(*args, **kwargs)
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def _record(recorded: Span) -> Iterator[Span]:
+    token = current_span.set(recorded)
+    try:
+        yield recorded
+    except BaseException as e:
+        recorded.error = repr(e)
+        raise
+    finally:
+        recorded.end_ns = time.time_ns()
+        current_span.reset(token)
+        finished_spans.put(recorded)
+
+
+def _to_otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    """Spans as an OTLP/JSON ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": finished.trace_id,
+                        "spanId": finished.span_id,
+                        "parentSpanId": finished.parent_id or "",
+                        "name": finished.name,
+                        "kind": finished.kind,
+                        "startTimeUnixNano": str(finished.start_ns),
+                        "endTimeUnixNano": str(finished.end_ns),
+                        "attributes": [
+                            {"key": key, "value": _to_otlp_value(value)} for key, value in finished.attributes.items()
+                        ],
+                        "status": {"code": STATUS_CODE_ERROR, "message": finished.error} if finished.error else {},
+                    }
+                    for finished in spans
+                ],
+            }],
+        }],
+    }
+
+
+def _write_batches(path: str, batches: list[list[Span]]) -> None:
+    with open(path, "a", encoding="utf-8") as file:
+        file.writelines(json.dumps(to_otlp(spans)) + "\n" for spans in batches)
+
+
+async def export_spans() -> None:
+    """Append finished spans to TRACING_EXPORT_FILE, one OTLP/JSON request per line and batch.
+
+    The file can be read by the OpenTelemetry collector `otlpjsonfile` receiver.
+    Serialization and writing run off the event loop.
+    """
+    batches = []
+    while spans := finished_spans.take():
+        batches.append(spans)
+    if not batches:
+        return
+    try:
+        await asyncio.to_thread(_write_batches, settings.TRACING_EXPORT_FILE, batches)
+    except Exception:
+        finished_spans.drop(sum(map(len, batches)))
+        raise
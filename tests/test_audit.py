@@ -0,0 +1,27 @@
+import pytest
+
+from src.services import audit
+from src.services.audit import AuditService, login_events
+
+
+async def test_flush_drops_only_events_of_failed_schema(monkeypatch):
+    written, dropped = [], []
+
+    async def write(events):
+        if events[0]["login_or_email"] == "failing":
+            raise RuntimeError("schema unavailable")
+        written.extend(events)
+
+    monkeypatch.setattr(AuditService, "_write", staticmethod(write))
+    monkeypatch.setattr(login_events, "drop", dropped.append)
+    login_events.take()
+    written_before = audit.written_login_events.get()
+    for schema, login in [("tenant_a", "first"), ("tenant_b", "failing"), ("tenant_c", "last"), ("tenant_a", "first")]:
+        login_events.put({"login_or_email": login, "schema": schema})
+
+    with pytest.raises(ExceptionGroup):
+        await AuditService.flush()
+
+    assert [event["login_or_email"] for event in written] == ["first", "first", "last"]
+    assert dropped == [1]
+    assert audit.written_login_events.get() - written_before == 3
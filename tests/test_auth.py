@@ -0,0 +1,96 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, Request, status
+
+from src.utils import auth, role_checker
+from src.utils.enums import TokenProfile, UserRole
+
+
+@pytest.mark.parametrize(
+    "profile, role, user_agent",
+    [
+        (TokenProfile.full, UserRole.executor, "Mobile Safari 17.2 / iOS 17.2.1 / Apple iPhone"),
+        (TokenProfile.compact, UserRole.executor, "Mobile Safari 17.2 / iOS 17.2.1 / Apple iPhone"),
+        (TokenProfile.compact, UserRole.admin, "Other / Other / Other"),
+    ],
+)
+def test_create_tokens(monkeypatch, profile, role, user_agent):
+    monkeypatch.setattr(auth.settings, "TOKEN_PROFILE", profile)
+    user_id = str(uuid4())
+
+    access_token, refresh_token, refresh_jti = auth.create_tokens(
+        {"sub": user_id, "role": role, "user_agent": user_agent}, 1, 2
+    )
+    access_payload = auth.decode_token(access_token)
+    refresh_payload = auth.decode_token(refresh_token)
+
+    assert access_payload.get("sub") == refresh_payload.get("sub") == user_id
+    assert access_payload.get("role") == refresh_payload.get("role") == role
+    assert refresh_payload.get("jti") == refresh_jti
+    assert access_payload.get("jti") != refresh_jti
+    assert refresh_payload.get("exp") > access_payload.get("exp")
+
+
+def test_compact_tokens_are_smaller(monkeypatch):
+    data = {"sub": str(uuid4()), "role": UserRole.user, "user_agent": "Mobile Safari 17.2 / iOS 17.2.1 / Apple iPhone"}
+    monkeypatch.setattr(auth.settings, "TOKEN_PROFILE", TokenProfile.full)
+    full_tokens = auth.create_tokens(data, 1, 2)
+    monkeypatch.setattr(auth.settings, "TOKEN_PROFILE", TokenProfile.compact)
+    compact_tokens = auth.create_tokens(data, 1, 2)
+
+    assert len(compact_tokens[0]) < len(full_tokens[0])
+    assert len(compact_tokens[1]) < len(full_tokens[1])
+    assert "user_agent" not in auth.decode_token(compact_tokens[0])
+
+
+@pytest.mark.parametrize(
+    "target_ms, min_rounds",
+    [
+        (1, 4),
+        (100, 4),
+    ],
+)
+def test_calibrate_bcrypt_rounds(monkeypatch, target_ms, min_rounds):
+    monkeypatch.setattr(auth.settings, "PWD_BCRYPT_MIN_ROUNDS", min_rounds)
+
+    rounds = auth.calibrate_bcrypt_rounds(target_ms)
+
+    assert min_rounds <= rounds <= auth.MAX_BCRYPT_ROUNDS
+    assert rounds <= auth.calibrate_bcrypt_rounds(target_ms * 8)
+
+
+def test_needs_rehash(monkeypatch):
+    monkeypatch.setattr(auth.settings, "PWD_BCRYPT_ROUNDS", 5)
+    weak_hashed_pwd = auth.pwd_context.handler("bcrypt").using(rounds=4).hash("test_needs_rehash_pwd")
+    config = auth.pwd_context.to_dict()
+
+    auth.configure_pwd_context()
+    try:
+        hashed_pwd = auth.get_hashed_pwd("test_needs_rehash_pwd")
+
+        assert auth.needs_rehash(weak_hashed_pwd) is True
+        assert auth.needs_rehash(hashed_pwd) is False
+        assert auth.verify_pwd("test_needs_rehash_pwd", weak_hashed_pwd)
+    finally:
+        auth.pwd_context.load(config)
+
+
+@pytest.mark.parametrize(
+    "service_token, sent_token, expected_status",
+    [
+        ("test_service_token", "test_service_token", None),
+        ("test_service_token", "wrong_service_token", status.HTTP_401_UNAUTHORIZED),
+        ("", "", status.HTTP_401_UNAUTHORIZED),
+    ],
+)
+async def test_allowed_for_service_or_admin(monkeypatch, service_token, sent_token, expected_status):
+    monkeypatch.setattr(role_checker.settings, "SERVICE_TOKEN", service_token)
+    request = Request({"type": "http", "headers": [(b"x-service-token", sent_token.encode())]})
+
+    if expected_status is None:
+        assert await role_checker.allowed_for_service_or_admin(request) is None
+    else:
+        with pytest.raises(HTTPException) as exc_info:
+            await role_checker.allowed_for_service_or_admin(request)
+        assert exc_info.value.status_code == expected_status
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from src.common import background
+
+
+@pytest.mark.parametrize("timeout, expected_finished", [(1, True), (0, False)])
+async def test_stop_tasks_lets_current_run_finish(monkeypatch, timeout, expected_finished):
+    monkeypatch.setattr(background, "tasks", {})
+    started, finished = asyncio.Event(), []
+
+    async def flush():
+        started.set()
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    task = background.register_task("flush", flush, 60)
+    await background.start_tasks()
+    await started.wait()
+    await background.stop_tasks(timeout)
+
+    assert bool(finished) is expected_finished
+    assert not task.is_alive
@@ -0,0 +1,24 @@
+from uuid import uuid4
+
+import pytest
+
+from src.utils.bloom import BloomFilter
+
+
+@pytest.mark.parametrize(
+    "capacity, error_rate",
+    [
+        (1000, 0.01),
+        (10_000, 0.001),
+    ],
+)
+def test_bloom_filter(capacity, error_rate):
+    bloom_filter = BloomFilter(capacity, error_rate)
+    items = [str(uuid4()) for _ in range(capacity)]
+    for item in items:
+        bloom_filter.add(item)
+
+    false_positives = sum(str(uuid4()) in bloom_filter for _ in range(capacity * 10))
+
+    assert all(item in bloom_filter for item in items)
+    assert false_positives / (capacity * 10) < error_rate * 3
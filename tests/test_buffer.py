@@ -0,0 +1,26 @@
+import pytest
+
+from src.utils.buffer import EventBuffer, dropped_events
+
+
+@pytest.mark.parametrize(
+    "capacity, batch_size, events_count",
+    [
+        (10, 3, 5),
+        (10, 3, 15),
+    ],
+)
+def test_event_buffer(capacity, batch_size, events_count):
+    batches_ready = []
+    event_buffer = EventBuffer(f"test_{capacity}_{events_count}", capacity, batch_size, lambda: batches_ready.append(1))
+
+    accepted = [event_buffer.put(event) for event in range(events_count)]
+    batches = []
+    while batch := event_buffer.take():
+        batches.append(batch)
+
+    assert sum(accepted) == min(capacity, events_count)
+    assert dropped_events.get(buffer=event_buffer.name) == max(0, events_count - capacity)
+    assert [event for batch in batches for event in batch] == list(range(min(capacity, events_count)))
+    assert all(len(batch) <= batch_size for batch in batches)
+    assert len(batches_ready) == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from src.middleware.concurrency import AIMDLimiter
+
+
+async def test_aimd_limiter_sheds_after_queue_timeout():
+    limiter = AIMDLimiter("test_shed", limit=1, max_limit=10, latency_target=0.1, queue_timeout=0.01)
+
+    assert await limiter.acquire() is True
+    assert await limiter.acquire() is False
+    assert limiter.in_flight == 1
+    assert not limiter.waiters
+
+
+async def test_aimd_limiter_hands_slot_to_waiter():
+    limiter = AIMDLimiter("test_handover", limit=1, max_limit=10, latency_target=0.1, queue_timeout=1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(latency=0.5, success=True)
+
+    assert await waiter is True
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.parametrize(
+    "latency, success, expected_limit",
+    [
+        (0.01, True, 5.2),
+        (1, True, 4.5),
+        (0.01, False, 4.5),
+    ],
+)
+async def test_aimd_limiter_adapts_limit(latency, success, expected_limit):
+    limiter = AIMDLimiter("test_adapt", limit=5, max_limit=10, latency_target=0.1, queue_timeout=0.01, backoff=0.9)
+    await limiter.acquire()
+
+    limiter.release(latency=latency, success=success)
+
+    assert limiter.limit == pytest.approx(expected_limit)
+    assert limiter.in_flight == 0
@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.services import health
+from src.services.health import HealthService
+
+
+def test_live(client):
+    response = client.get("/health/live")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+
+
+def test_ready():
+    with TestClient(app) as client:
+        response = client.get("/health/ready")
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["status"] == "ok"
+    assert response_json["database"]["ok"] is True
+    assert response_json["pool"]["peak_in_use"] >= 1
+    assert response_json["tasks"] and all(task["alive"] for task in response_json["tasks"].values())
+
+
+def test_not_ready_before_warm_up(client):
+    response = client.get("/health/ready")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["warmed_up"] is False
+
+
+async def test_db_probe_is_cached(monkeypatch):
+    pings = []
+
+    async def ping(session):
+        pings.append(session)
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(health.HealthRepository, "ping", ping)
+    monkeypatch.setattr(HealthService, "db_status", None)
+
+    results = await asyncio.gather(*(HealthService.check_db() for _ in range(5)))
+    await HealthService.check_db()
+
+    assert len(pings) == 1
+    assert all(result["ok"] for result in results)
@@ -0,0 +1,65 @@
+import time
+from uuid import uuid4
+
+import jwt
+import pytest
+
+from src.utils import auth
+from src.utils.enums import TokenType
+from src.utils.jwt_codec import InvalidTokenTypeError, JWTCodec
+from src.utils.keyring import DEFAULT_KID, Keyring
+
+SECRET_KEY = "test_jwt_codec_secret_key_0123456789"
+
+
+@pytest.fixture
+def keyring(monkeypatch) -> Keyring:
+    monkeypatch.setattr(auth.settings, "ALGORITHM", "HS256")
+    monkeypatch.setattr(auth.settings, "SECRET_KEY", SECRET_KEY)
+    monkeypatch.setattr(auth.settings, "SIGNING_KEYS_FILE", "")
+    keyring = Keyring()
+    keyring.load()
+    return keyring
+
+
+def get_claims(**claims) -> dict:
+    now = int(time.time())
+    return {"sub": str(uuid4()), "iat": now, "nbf": now, "exp": now + 60, "jti": str(uuid4())} | claims
+
+
+def test_codec_is_compatible_with_pyjwt(keyring):
+    codec = JWTCodec()
+    claims = get_claims()
+
+    token = codec.encode(claims, TokenType.access, keyring.get_signing_key())
+    pyjwt_token = jwt.encode(claims, SECRET_KEY, algorithm="HS256", headers={"typ": TokenType.access})
+
+    assert jwt.decode(token, SECRET_KEY, algorithms=["HS256"]) == claims
+    assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": TokenType.access, "kid": DEFAULT_KID}
+    assert codec.decode(pyjwt_token, keyring.get_verifying_key, TokenType.access)[1] == claims
+    assert codec.decode(token, keyring.get_verifying_key, TokenType.access)[1] == claims
+
+
+@pytest.mark.parametrize(
+    "claims, token_type, algorithm, tamper, expected_error",
+    [
+        (get_claims(), TokenType.refresh, "HS256", False, InvalidTokenTypeError),
+        (get_claims(), TokenType.access, "HS256", True, jwt.InvalidSignatureError),
+        (get_claims(exp=int(time.time()) - 1), TokenType.access, "HS256", False, jwt.ExpiredSignatureError),
+        (get_claims(nbf=int(time.time()) + 60), TokenType.access, "HS256", False, jwt.ImmatureSignatureError),
+        (get_claims(), TokenType.access, "HS512", False, jwt.InvalidAlgorithmError),
+    ],
+)
+def test_codec_rejects_invalid_tokens(keyring, claims, token_type, algorithm, tamper, expected_error):
+    token = jwt.encode(claims, SECRET_KEY, algorithm=algorithm, headers={"typ": TokenType.access})
+    if tamper:
+        token = token[:-2] + ("AA" if token[-2:] != "AA" else "AB")
+
+    with pytest.raises(expected_error):
+        JWTCodec().decode(token, keyring.get_verifying_key, token_type)
+
+
+@pytest.mark.parametrize("token", ["", "abc", "a.b", "a.b.c", "eyJhbGciOiJIUzI1NiJ9.e30.!!!"])
+def test_codec_rejects_malformed_tokens(keyring, token):
+    with pytest.raises(jwt.PyJWTError):
+        JWTCodec().decode(token, keyring.get_verifying_key)
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import jwt
+import pytest
+
+from src.utils import auth
+from src.utils.enums import UserRole
+from src.utils.keyring import DEFAULT_KID, Keyring
+
+
+@pytest.fixture
+def keys_file(tmp_path, monkeypatch):
+    now = datetime.now(timezone.utc)
+    day = timedelta(days=1)
+    keys = [
+        {"kid": "old", "algorithm": "HS256", "key": "old_secret_key", "active_from": (now - 30 * day).isoformat()},
+        {"kid": "current", "algorithm": "HS256", "key": "current_secret_key", "active_from": (now - day).isoformat()},
+        {"kid": "next", "algorithm": "HS512", "key": "next_secret_key", "active_from": (now + day).isoformat()},
+        {"kid": "retired", "algorithm": "HS256", "key": "retired_secret_key", "expires_at": (now - day).isoformat()},
+    ]
+    path = tmp_path / "signing_keys.json"
+    path.write_text(json.dumps(keys))
+    monkeypatch.setattr(auth.settings, "SIGNING_KEYS_FILE", str(path))
+    return path
+
+
+def test_keyring_selects_signing_key(keys_file):
+    keyring = Keyring()
+    keyring.load()
+
+    assert keyring.get_signing_key().kid == "current"
+    assert set(keyring.keys) == {DEFAULT_KID, "old", "current", "next", "retired"}
+    with pytest.raises(jwt.InvalidKeyError):
+        keyring.get_verifying_key("retired")
+    with pytest.raises(jwt.InvalidKeyError):
+        keyring.get_verifying_key("unknown")
+
+
+def test_tokens_signed_by_rotated_key_stay_valid(keys_file, monkeypatch):
+    keyring = Keyring()
+    keyring.load()
+    monkeypatch.setattr(auth, "keyring", keyring)
+    data = {"sub": str(uuid4()), "role": UserRole.user, "user_agent": "Other / Other / Other"}
+
+    access_token, _, _ = auth.create_tokens(data, 1, 2)
+    keyring.keys["next"].config.active_from = datetime.now(timezone.utc) - timedelta(seconds=1)
+    rotated_access_token, _, _ = auth.create_tokens(data, 1, 2)
+
+    assert jwt.get_unverified_header(access_token).get("kid") == "current"
+    assert jwt.get_unverified_header(rotated_access_token).get("kid") == "next"
+    assert auth.decode_token(access_token).get("sub") == data["sub"]
+    assert auth.decode_token(rotated_access_token).get("sub") == data["sub"]
+
+
+async def test_keyring_retries_invalid_keys_file(keys_file):
+    keyring = Keyring()
+    keyring.load()
+    keys = keyring.keys
+    content = keys_file.read_text()
+
+    keys_file.write_text(content[: len(content) // 2])
+    for _ in range(2):
+        with pytest.raises(json.JSONDecodeError):
+            await keyring.reload()
+    assert keyring.keys is keys
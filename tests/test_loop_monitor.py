@@ -0,0 +1,41 @@
+import asyncio
+import logging
+import time
+
+from src.common.loop_monitor import LoopMonitor, loop_lag, loop_stalls
+
+
+def block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_loop_monitor_reports_blocking_call(caplog):
+    monitor = LoopMonitor(interval=0.02, threshold=0.05)
+    stalls = loop_stalls.get()
+    monitor.start()
+    try:
+        with caplog.at_level(logging.WARNING):
+            await asyncio.sleep(0.05)
+            block_loop(0.3)
+            await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    assert loop_stalls.get() == stalls + 1
+    assert loop_lag.get() >= 0
+    reports = [record.getMessage() for record in caplog.records if "Event loop blocked" in record.getMessage()]
+    assert len(reports) == 1
+    assert "block_loop" in reports[0]
+
+
+async def test_loop_monitor_is_quiet_without_stalls(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.2)
+    stalls = loop_stalls.get()
+    monitor.start()
+    with caplog.at_level(logging.WARNING):
+        await asyncio.sleep(0.1)
+    monitor.stop()
+
+    assert loop_stalls.get() == stalls
+    assert not [record for record in caplog.records if "Event loop blocked" in record.getMessage()]
+    assert monitor.handle is None and monitor.watchdog is None
@@ -0,0 +1,25 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at, row_id = datetime(2025, 3, 3, 10, 17, 45, 208316), uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "MjAyNS0wMy0wMw"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor)
+
+
+def test_rank_cursor_round_trip():
+    rank, row_id = 1.3333333730697632, uuid4()
+
+    assert decode_cursor(encode_cursor(rank, row_id), float) == (rank, row_id)
@@ -0,0 +1,36 @@
+import dataclasses
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.enums import UserRole
+from src.utils.principal import Principal
+from src.utils.role_checker import allowed_for_admin, allowed_for_all
+
+
+@pytest.mark.parametrize(
+    "role, is_admin",
+    [
+        (UserRole.admin, True),
+        (UserRole.executor, False),
+    ],
+)
+def test_role_checker_accepts_principal(role, is_admin):
+    principal = Principal(uuid4(), role, datetime.now())
+
+    assert allowed_for_all(principal) is principal
+    if is_admin:
+        assert allowed_for_admin(principal) is principal
+    else:
+        with pytest.raises(HTTPException):
+            allowed_for_admin(principal)
+
+
+def test_principal_is_immutable():
+    principal = Principal(uuid4(), UserRole.user, datetime.now())
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        principal.role = UserRole.admin
+    assert not hasattr(principal, "__dict__")
@@ -0,0 +1,92 @@
+import pytest
+from fastapi import Request, status
+
+from src.common.settings import settings
+from src.utils import client_ip
+from src.utils.client_ip import get_client_ip
+from src.utils.rate_limiter import RateLimiter, acquire, release
+
+
+@pytest.mark.parametrize(
+    "capacity, per_minute, attempts, expected_rejected",
+    [
+        (3, 60, 5, 2),
+        (1, 1, 3, 2),
+    ],
+)
+def test_rate_limiter(capacity, per_minute, attempts, expected_rejected):
+    limiter = RateLimiter(capacity, per_minute)
+
+    results = [acquire([(limiter, "key")]) for _ in range(attempts)]
+
+    assert [index for _, index in results].count(0) == expected_rejected
+    assert all(retry_after > 0 for retry_after, index in results if index is not None)
+
+
+def test_rate_limiter_takes_all_or_nothing():
+    ip_limiter, login_limiter = RateLimiter(5, 1), RateLimiter(1, 1)
+
+    acquire([(ip_limiter, "ip"), (login_limiter, "login")])
+    retry_after, index = acquire([(ip_limiter, "ip"), (login_limiter, "login")])
+
+    assert index == 1
+    assert retry_after > 0
+    assert ip_limiter.buckets["ip"].tokens == pytest.approx(4, abs=0.01)
+
+
+def test_rate_limiter_release():
+    ip_limiter, global_limiter = RateLimiter(2, 1), RateLimiter(2, 1)
+    limits = [(ip_limiter, "ip"), (global_limiter, "")]
+
+    acquire(limits)
+    release(limits)
+    release(limits)
+
+    assert ip_limiter.buckets["ip"].tokens == pytest.approx(2, abs=0.01)
+    assert global_limiter.buckets[""].tokens == pytest.approx(2, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "peer, forwarded_for, expected_ip",
+    [
+        ("10.0.0.5", None, "10.0.0.5"),
+        ("203.0.113.7", "198.51.100.1", "203.0.113.7"),
+        ("10.0.0.5", "198.51.100.1", "198.51.100.1"),
+        ("10.0.0.5", "1.2.3.4, 198.51.100.1, 10.0.0.9", "198.51.100.1"),
+        ("10.0.0.5", "10.0.0.8", "10.0.0.8"),
+    ],
+)
+def test_get_client_ip(monkeypatch, peer, forwarded_for, expected_ip):
+    monkeypatch.setattr(client_ip.settings, "CLIENT_IP_HEADER", "X-Forwarded-For")
+    monkeypatch.setattr(client_ip.settings, "TRUSTED_PROXIES", "10.0.0.0/8")
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    request = Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+    assert get_client_ip(request) == expected_ip
+
+
+def test_rate_limiter_evicts_least_recently_used():
+    limiter = RateLimiter(1, 1, max_keys=2)
+
+    for key in ("first", "second", "third"):
+        acquire([(limiter, key)])
+
+    assert list(limiter.buckets) == ["second", "third"]
+
+
+@pytest.mark.parametrize(
+    "login, user_agent",
+    [
+        ("test_login_rate_limit_login_1", "test_login_rate_limit_user_agent_1"),
+    ],
+)
+async def test_login_rate_limit(client, login, user_agent):
+    json = {"login_or_email": login, "pwd": "wrong_pwd", "user_agent": user_agent}
+
+    responses = [
+        client.post("/api/v1/users/login", json=json) for _ in range(settings.LOGIN_RATE_LIMIT_LOGIN_BURST + 1)
+    ]
+
+    assert {response.status_code for response in responses[:-1]} == {status.HTTP_401_UNAUTHORIZED}
+    assert responses[-1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(responses[-1].headers.get("Retry-After")) > 0
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.utils.singleflight import SingleFlight, coalesced_calls
+
+
+async def test_singleflight_coalesces_concurrent_calls():
+    singleflight = SingleFlight("test_coalesce")
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(singleflight.do("key", lookup) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert coalesced_calls.get(name="test_coalesce") == 4
+    assert not singleflight.calls
+
+
+async def test_singleflight_shares_exception():
+    singleflight = SingleFlight("test_exception")
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise ValueError("lookup failed")
+
+    results = await asyncio.gather(*(singleflight.do("key", lookup) for _ in range(2)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_singleflight_survives_leader_cancellation():
+    singleflight = SingleFlight("test_cancel")
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    leader = asyncio.create_task(singleflight.do("key", lookup))
+    follower = asyncio.create_task(singleflight.do("key", lookup))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_singleflight_cancels_call_without_waiters():
+    singleflight = SingleFlight("test_abandon")
+    started = asyncio.Event()
+
+    async def lookup():
+        started.set()
+        await asyncio.sleep(1)
+
+    caller = asyncio.create_task(singleflight.do("key", lookup))
+    await started.wait()
+    call = singleflight.calls["key"]
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    with pytest.raises(asyncio.CancelledError):
+        await call.task
+
+    assert call.task.cancelled()
+    assert not singleflight.calls
@@ -0,0 +1,60 @@
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest
+
+from src.utils.sinks import SIGNATURE_HEADER, SubscriberSink, WebhookSink
+
+EVENTS = [{"id": 1, "type": "user.created", "user_id": "1"}, {"id": 2, "type": "user.deleted", "user_id": "1"}]
+
+
+async def test_webhook_sink_delivers_signed_batch():
+    received = []
+
+    def receiver(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(204)
+
+    sink = WebhookSink(
+        ["http://a.test/events", "http://b.test/events"], "secret", transport=httpx.MockTransport(receiver)
+    )
+    await sink.deliver(EVENTS)
+    await sink.close()
+
+    assert sorted(str(request.url) for request in received) == ["http://a.test/events", "http://b.test/events"]
+    for request in received:
+        assert json.loads(request.content) == {"events": EVENTS}
+        expected = "sha256=" + hmac.new(b"secret", request.content, hashlib.sha256).hexdigest()
+        assert request.headers[SIGNATURE_HEADER] == expected
+
+
+async def test_webhook_sink_fails_if_any_webhook_fails():
+    def receiver(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503 if request.url.host == "b.test" else 200)
+
+    sink = WebhookSink(["http://a.test/", "http://b.test/"], transport=httpx.MockTransport(receiver))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await sink.deliver(EVENTS)
+    await sink.close()
+
+
+async def test_subscriber_sink_fails_if_any_subscriber_fails():
+    received = []
+
+    async def handler(events):
+        received.append(events)
+
+    async def failing_handler(events):
+        raise RuntimeError("subscriber failed")
+
+    sink = SubscriberSink()
+    sink.subscribe(handler)
+    await sink.deliver(EVENTS)
+    sink.subscribe(failing_handler)
+
+    with pytest.raises(RuntimeError):
+        await sink.deliver(EVENTS)
+    assert received == [EVENTS, EVENTS]
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from src.db import connector
+from src.db.connector import DatabaseConnector
+from src.middleware import tenant as tenant_middleware
+from src.middleware.tenant import TenantMiddleware
+from src.utils import tenant
+from src.utils.tenant import for_each_schema, get_schema, get_tenant_schemas
+
+settings = tenant.settings
+
+
+async def schema_app(scope, receive, send):
+    await PlainTextResponse(connector.get_schema())(scope, receive, send)
+
+
+@pytest.mark.parametrize(
+    "headers, expected_status, expected_schema",
+    [
+        ({}, status.HTTP_200_OK, ""),
+        ({"X-Tenant": "acme"}, status.HTTP_200_OK, "_acme"),
+        ({"X-Tenant": "ACME", "Host": "globex.auth.test"}, status.HTTP_200_OK, "_acme"),
+        ({"Host": "globex.auth.test:8001"}, status.HTTP_200_OK, "_globex"),
+        ({"Host": "auth.test"}, status.HTTP_200_OK, ""),
+        ({"X-Tenant": "initech"}, status.HTTP_404_NOT_FOUND, None),
+    ],
+)
+def test_tenant_middleware(headers, expected_status, expected_schema):
+    app = TenantMiddleware(
+        schema_app, tenants=frozenset({"acme", "globex"}), header="X-Tenant", host_suffix=".auth.test"
+    )
+
+    response = TestClient(app).get("/", headers=headers)
+
+    assert response.status_code == expected_status
+    if expected_schema is not None:
+        assert response.text == connector.settings.DB_SCHEMA + expected_schema
+
+
+def test_tenant_schemas(monkeypatch):
+    monkeypatch.setattr(settings, "TENANTS", "globex, acme")
+
+    assert get_tenant_schemas() == [settings.DB_SCHEMA, f"{settings.DB_SCHEMA}_acme", f"{settings.DB_SCHEMA}_globex"]
+
+    monkeypatch.setattr(settings, "TENANTS", "acme,Not-A-Tenant")
+    with pytest.raises(ValueError):
+        get_tenant_schemas()
+
+
+async def test_for_each_schema(monkeypatch):
+    monkeypatch.setattr(settings, "TENANTS", "acme,globex")
+    schemas = []
+
+    async def job():
+        schemas.append(get_schema())
+        if get_schema().endswith("_acme"):
+            raise RuntimeError("acme failed")
+
+    with pytest.raises(ExceptionGroup):
+        await for_each_schema(job)()
+
+    assert schemas == get_tenant_schemas()
+
+
+def test_schema_engines_share_pool():
+    default_schema = connector.settings.DB_SCHEMA
+    with tenant_middleware.use_schema(f"{default_schema}_acme"):
+        acme_engine = DatabaseConnector.get_async_engine()
+    globex_engine = DatabaseConnector.get_async_engine(f"{default_schema}_globex")
+
+    assert acme_engine.pool is globex_engine.pool
+    assert acme_engine.get_execution_options()["schema_translate_map"][default_schema] == f"{default_schema}_acme"
+    assert globex_engine.get_execution_options()["schema_translate_map"][None] == f"{default_schema}_globex"
+    assert (
+        DatabaseConnector.get_async_sessionmaker(f"{default_schema}_acme")
+        is DatabaseConnector.get_async_sessionmaker(f"{default_schema}_acme")
+    )
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from src.middleware.tracing import TracingMiddleware
+from src.utils import tracing
+from src.utils.tracing import export_spans, finished_spans, parse_traceparent, span, start_trace, traced
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+async def ok_app(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (f"00-{TRACE_ID}-{PARENT_ID}-01", (TRACE_ID, PARENT_ID, True)),
+        (f"00-{TRACE_ID.upper()}-{PARENT_ID}-00", (TRACE_ID, PARENT_ID, False)),
+        (f"00-{'0' * 32}-{PARENT_ID}-01", None),
+        (f"01-{TRACE_ID}-{PARENT_ID}-01", None),
+        ("not a traceparent", None),
+        (None, None),
+    ],
+)
+def test_parse_traceparent(value, expected):
+    assert parse_traceparent(value) == expected
+
+
+async def test_spans_nest_under_sampled_trace():
+    finished_spans.take()
+
+    @traced("db.lookup")
+    async def lookup():
+        with span("inner") as inner:
+            inner.set_attribute("rows", 1)
+
+    with start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+        await lookup()
+        with pytest.raises(ValueError), span("failing"):
+            raise ValueError("boom")
+    inner, lookup_span, failing, server = finished_spans.take()
+
+    assert {recorded.trace_id for recorded in (inner, lookup_span, failing, server)} == {TRACE_ID}
+    assert server is root and server.parent_id == PARENT_ID
+    assert lookup_span.parent_id == server.span_id and inner.parent_id == lookup_span.span_id
+    assert inner.attributes == {"rows": 1}
+    assert failing.error == "ValueError('boom')"
+
+
+async def test_unsampled_trace_records_nothing(monkeypatch):
+    monkeypatch.setattr(tracing.settings, "TRACING_SAMPLE_RATE", 0)
+    finished_spans.take()
+
+    with start_trace("GET /") as root, span("inner") as inner:
+        pass
+    with start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-00"):
+        pass
+
+    assert root is None and inner is None
+    assert not finished_spans.take()
+
+
+async def test_export_spans_writes_otlp_json(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing.settings, "TRACING_EXPORT_FILE", str(path))
+    finished_spans.take()
+
+    with start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-01", **{"http.status_code": 200}), span("child"):
+        pass
+    await export_spans()
+
+    request = json.loads(path.read_text())
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [exported["name"] for exported in spans] == ["child", "GET /"]
+    assert spans[1]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert not finished_spans.take()
+
+
+@pytest.mark.parametrize("flags, traced_response", [("01", True), ("00", False)])
+def test_tracing_middleware_continues_caller_trace(flags, traced_response):
+    client = TestClient(TracingMiddleware(ok_app))
+
+    response = client.get("/", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-{flags}"})
+
+    assert response.text == "ok"
+    if traced_response:
+        assert parse_traceparent(response.headers["traceresponse"])[0] == TRACE_ID
+    else:
+        assert "traceresponse" not in response.headers
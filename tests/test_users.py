@@ -1,13 +1,23 @@
+import csv
+import io
+import json
 from uuid import uuid4
 
 import pytest
 from fastapi import status
-from sqlalchemy import insert, select
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from src.db.connector import AsyncSession
-from src.db.tables import Token, User
+from src.db.tables import LoginEvent, OutboxEvent, RevokedToken, Token, User
+from src.main import app
+from src.services import outbox
+from src.services.outbox import OutboxService
+from src.services.user import UserService
 from src.utils.auth import get_hashed_pwd
 from src.utils.enums import UserRole
+from src.utils.sinks import SubscriberSink
 from tests.utils.tokens import create_refresh_token
 
 
@@ -72,6 +82,46 @@ async def test_register(
     assert token_result.user_agent == expected_user_agent
 
 
+@pytest.mark.parametrize(
+    "login, email, expected_context",
+    [
+        ("test_register_taken_login_1", "test_register_free_email_1@mail.net", "login"),
+        ("test_register_free_login_2", "test_register_taken_email_1@mail.net", "email"),
+        ("test_register_taken_login_1", "test_register_taken_email_1@mail.net", "login, email"),
+    ],
+)
+async def test_register_conflict(client, login, email, expected_context):
+    taken_user = {
+        "id": str(uuid4()),
+        "name": "test_register_taken_name",
+        "surname": "test_register_taken_surname",
+        "login": "test_register_taken_login_1",
+        "email": "test_register_taken_email_1@mail.net",
+        "role": UserRole.user,
+        "hashed_pwd": "-",
+    }
+    async with AsyncSession() as session:
+        await session.execute(pg_insert(User).values(**taken_user).on_conflict_do_nothing())
+        await session.commit()
+    json = {
+        "name": "test_register_conflict_name",
+        "surname": "test_register_conflict_surname",
+        "login": login,
+        "email": email,
+        "pwd": "test_register_conflict_pwd",
+        "user_agent": "test_register_conflict_user_agent",
+    }
+
+    response = client.post("/api/v1/users/registration", json=json)
+    async with AsyncSession() as session:
+        user_result = await session.execute(select(User).where(User.login == login, User.email == email))
+        user_result = user_result.scalar()
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json().get("context") == f"A user with such {expected_context} already exists"
+    assert user_result is None
+
+
 @pytest.mark.parametrize(
     "name, surname, login, email, role, pwd, user_agent, expected_status, by_login",
     [
@@ -294,6 +344,31 @@ async def test_get_user_data(client, user_data, name, surname, login, email, rol
     assert response_json.get("role") == role
 
 
+async def test_get_user_data_of_deleted_user(client, user_data):
+    user_values = {
+        "id": user_data.get("id"),
+        "name": "test_get_deleted_name_1",
+        "surname": "test_get_deleted_surname_1",
+        "login": "test_get_deleted_login_1",
+        "email": "test_get_deleted_email_1@mail.net",
+        "role": UserRole.user,
+        "hashed_pwd": get_hashed_pwd("test_get_deleted_pwd_1"),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.commit()
+    cookies = {"access_token": user_data.get("access_token")}
+
+    response_before = client.get("/api/v1/users/me", cookies=cookies)
+    async with AsyncSession() as session:
+        await session.execute(update(User).where(User.id == user_data.get("id")).values(deleted_at=func.now()))
+        await session.commit()
+    response_after = client.get("/api/v1/users/me", cookies=cookies)
+
+    assert response_before.status_code == status.HTTP_200_OK
+    assert response_after.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 @pytest.mark.parametrize(
     "count, name, surname, login, email, role, pwd, expected_status, admin_prefix",
     [
@@ -471,3 +546,739 @@ async def test_delete(client, admin_data, name, surname, login, email, role, pwd
 
     assert response.status_code == expected_status
     assert result is None
+
+
+@pytest.mark.parametrize(
+    "file_format, content, expected_status, expected_imported, expected_error_rows, expected_logins, rejected_logins, "
+    "admin_prefix",
+    [
+        (
+                "csv",
+                "name,surname,login,email,role,pwd\n"
+                "test_import_name_1,test_import_surname_1,test_import_login_1,test_import_email_1@mail.net,user,pwd_1\n"
+                "test_import_name_2,test_import_surname_2,test_import_login_2,test_import_email_2@mail.net,executor,pwd_2\n"
+                "test_import_name_3,test_import_surname_3,test_import_login_3,not_an_email,user,pwd_3\n"
+                "test_import_name_4,test_import_surname_4,test_import_login_1,test_import_email_4@mail.net,user,pwd_4\n",
+                status.HTTP_200_OK,
+                2,
+                [3, 4],
+                ["test_import_login_1", "test_import_login_2"],
+                ["test_import_login_3"],
+                "KdfsRtqaZx",
+        ),
+        (
+                "ndjson",
+                '{"name": "test_import_name_5", "surname": "test_import_surname_5", "login": "test_import_login_5", '
+                '"email": "test_import_email_5@mail.net", "pwd": "pwd_5"}\n'
+                "not a json\n"
+                '{"name": "test_import_name_6", "surname": "test_import_surname_6", "login": "test_import_login_6", '
+                '"email": "test_import_email_5@mail.net", "pwd": "pwd_6"}\n',
+                status.HTTP_200_OK,
+                1,
+                [2, 3],
+                ["test_import_login_5"],
+                ["test_import_login_6"],
+                "PwqYtvbNm",
+        ),
+    ],
+)
+async def test_import_users(
+        client,
+        admin_data,
+        file_format,
+        content,
+        expected_status,
+        expected_imported,
+        expected_error_rows,
+        expected_logins,
+        rejected_logins,
+        admin_prefix,
+):
+    values = {
+        "id": admin_data.get("id"),
+        "name": f"{admin_prefix}_name",
+        "surname": f"{admin_prefix}_surname",
+        "login": f"{admin_prefix}_login",
+        "email": f"{admin_prefix}_email@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": get_hashed_pwd("admin_pwd"),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**values))
+        await session.commit()
+
+    response = client.post(
+        "/api/v1/users/import",
+        params={"file_format": file_format},
+        content=content,
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+    response_json = response.json()
+    async with AsyncSession() as session:
+        result = await session.execute(select(User.login).where(User.login.in_(expected_logins + rejected_logins)))
+        imported_logins = result.scalars().all()
+
+    assert response.status_code == expected_status
+    assert response_json.get("imported") == expected_imported
+    assert [error.get("row") for error in response_json.get("errors")] == expected_error_rows
+    assert response_json.get("last_row") == len(content.strip().splitlines()) - (file_format == "csv")
+    assert sorted(imported_logins) == expected_logins
+
+
+async def test_import_users_invalid_encoding(client, admin_data):
+    values = {
+        "id": admin_data.get("id"),
+        "name": "LmzQwerTy_name",
+        "surname": "LmzQwerTy_surname",
+        "login": "LmzQwerTy_login",
+        "email": "LmzQwerTy_email@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": get_hashed_pwd("admin_pwd"),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**values))
+        await session.commit()
+
+    response = client.post(
+        "/api/v1/users/import",
+        content=b"name,surname,login,email,role,pwd\n\xff\xfe,test_import_surname_7,test_import_login_7\n",
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+    async with AsyncSession() as session:
+        result = await session.execute(select(User).where(User.login == "test_import_login_7"))
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert result.scalar_one_or_none() is None
+
+
+@pytest.mark.parametrize(
+    "count, name, login, email, role, file_format, compress, expected_status, admin_prefix",
+    [
+        (
+                3,
+                "test_export_name_1",
+                "test_export_login_1",
+                "test_export_email_1@mail.net",
+                UserRole.executor,
+                "ndjson",
+                False,
+                status.HTTP_200_OK,
+                "QwmZxcVbn",
+        ),
+        (
+                2,
+                "test_export_name_2",
+                "test_export_login_2",
+                "test_export_email_2@mail.net",
+                UserRole.executor,
+                "csv",
+                True,
+                status.HTTP_200_OK,
+                "LkjHgfDsa",
+        ),
+    ],
+)
+async def test_export_users(
+        client, admin_data, count, name, login, email, role, file_format, compress, expected_status, admin_prefix
+):
+    hashed_pwd = get_hashed_pwd("test_export_pwd")
+    values = [
+        {
+            "id": str(uuid4()),
+            "name": name,
+            "surname": f"{name}_sn",
+            "login": f"{login}_{i}",
+            "email": f"{i}_{email}",
+            "role": role,
+            "hashed_pwd": hashed_pwd,
+        }
+        for i in range(count)
+    ]
+    values.append({
+        "id": admin_data.get("id"),
+        "name": f"{admin_prefix}_name",
+        "surname": f"{admin_prefix}_surname",
+        "login": f"{admin_prefix}_login",
+        "email": f"{admin_prefix}_email@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": hashed_pwd,
+    })
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(values))
+        await session.commit()
+
+    response = client.get(
+        "/api/v1/users/export",
+        params={"file_format": file_format, "role": role, "compress": compress},
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+    if file_format == "csv":
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    else:
+        rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == expected_status
+    assert {row.get("login") for row in rows} >= {item.get("login") for item in values[:count]}
+    assert {row.get("role") for row in rows} == {role}
+    assert all("hashed_pwd" not in row for row in rows)
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, expected_status",
+    [
+        (
+                "test_introspect_name_1",
+                "test_introspect_surname_1",
+                "test_introspect_login_1",
+                "test_introspect_email_1@mail.net",
+                UserRole.user,
+                "test_introspect_pwd_1",
+                status.HTTP_200_OK,
+        ),
+    ],
+)
+async def test_introspect_tokens(
+        client, user_data, executor_data, admin_data, name, surname, login, email, role, pwd, expected_status
+):
+    user_values = {
+        "id": user_data.get("id"),
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    admin_values = {
+        "id": admin_data.get("id"),
+        "name": "test_introspect_admin_name",
+        "surname": "test_introspect_admin_surname",
+        "login": "test_introspect_admin_login",
+        "email": "test_introspect_admin_email@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values([user_values, admin_values]))
+        await session.commit()
+    tokens = [user_data.get("access_token"), executor_data.get("access_token"), "not_a_token"]
+
+    anonymous_response = client.post("/api/v1/users/introspect", json={"tokens": tokens})
+    user_response = client.post(
+        "/api/v1/users/introspect", json={"tokens": tokens}, cookies={"access_token": user_data.get("access_token")}
+    )
+    response = client.post(
+        "/api/v1/users/introspect", json={"tokens": tokens}, cookies={"access_token": admin_data.get("access_token")}
+    )
+    response_json = response.json()
+
+    assert anonymous_response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert user_response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.status_code == expected_status
+    assert len(response_json) == len(tokens)
+    assert response_json[0].get("active") is True
+    assert response_json[0].get("sub") == user_data.get("id")
+    assert response_json[0].get("role") == role
+    assert response_json[0].get("exp")
+    assert response_json[1] == {"active": False}
+    assert response_json[2] == {"active": False}
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, user_agent, expected_status",
+    [
+        (
+                "test_revoke_name_1",
+                "test_revoke_surname_1",
+                "test_revoke_login_1",
+                "test_revoke_email_1@mail.net",
+                UserRole.user,
+                "test_revoke_pwd_1",
+                "Other / Other / Other",
+                status.HTTP_401_UNAUTHORIZED,
+        ),
+    ],
+)
+async def test_access_token_revoked_on_logout(
+        client, user_data, name, surname, login, email, role, pwd, user_agent, expected_status
+):
+    user_values = {
+        "id": user_data.get("id"),
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.commit()
+    cookies = {"access_token": user_data.get("access_token")}
+
+    response_before = client.get("/api/v1/users/me", cookies=cookies)
+    client.post("/api/v1/users/logout", data={"user_agent": user_agent}, cookies=cookies)
+    response_after = client.get("/api/v1/users/me", cookies=cookies)
+    async with AsyncSession() as session:
+        revoked = await session.execute(select(RevokedToken))
+        revoked = revoked.scalars().all()
+
+    assert response_before.status_code == status.HTTP_200_OK
+    assert response_after.status_code == expected_status
+    assert revoked
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, expected_status",
+    [
+        (
+                "test_conditional_get_name_1",
+                "test_conditional_get_surname_1",
+                "test_conditional_get_login_1",
+                "test_conditional_get_email_1@mail.net",
+                UserRole.user,
+                "test_conditional_get_pwd_1",
+                status.HTTP_304_NOT_MODIFIED,
+        ),
+    ],
+)
+async def test_conditional_get(client, user_data, name, surname, login, email, role, pwd, expected_status):
+    user_id = user_data.get("id")
+    user_values = {
+        "id": user_id,
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.commit()
+    cookies = {"access_token": user_data.get("access_token")}
+
+    me = client.get("/api/v1/users/me", cookies=cookies)
+    me_cached = client.get("/api/v1/users/me", cookies=cookies, headers={"If-None-Match": me.headers["ETag"]})
+    user_email = client.get(f"/api/v1/users/{user_id}/email")
+    email_cached = client.get(
+        f"/api/v1/users/{user_id}/email", headers={"If-None-Match": f"W/{user_email.headers['ETag']}"}
+    )
+
+    assert me.status_code == status.HTTP_200_OK
+    assert me_cached.status_code == expected_status
+    assert user_email.json() == email
+    assert email_cached.status_code == expected_status
+    assert email_cached.headers["ETag"] == user_email.headers["ETag"]
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, sessions_count, limit",
+    [
+        (
+                "test_sessions_name_1",
+                "test_sessions_surname_1",
+                "test_sessions_login_1",
+                "test_sessions_email_1@mail.net",
+                UserRole.user,
+                "test_sessions_pwd_1",
+                5,
+                2,
+        ),
+    ],
+)
+async def test_sessions(client, user_data, name, surname, login, email, role, pwd, sessions_count, limit):
+    user_id = user_data.get("id")
+    user_values = {
+        "id": user_id,
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    sessions = [{"jti": uuid4(), "subject": user_id, "user_agent": f"Device {i}"} for i in range(sessions_count)]
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.execute(insert(Token).values(sessions))
+        await session.commit()
+    cookies = {"access_token": user_data.get("access_token")}
+
+    listed, cursor = [], None
+    while True:
+        params = {"limit": limit} | ({"cursor": cursor} if cursor else {})
+        page = client.get("/api/v1/users/me/sessions", params=params, cookies=cookies).json()
+        listed.extend(page["items"])
+        if not (cursor := page["next_cursor"]):
+            break
+    revoke_one = client.delete(f"/api/v1/users/me/sessions/{listed[0]['jti']}", cookies=cookies)
+    revoke_missing = client.delete(f"/api/v1/users/me/sessions/{listed[0]['jti']}", cookies=cookies)
+    after_revoke_one = client.get("/api/v1/users/me/sessions", cookies=cookies).json()
+    revoke_all = client.delete("/api/v1/users/me/sessions", cookies=cookies)
+    after_revoke_all = client.get("/api/v1/users/me/sessions", cookies=cookies).json()
+
+    assert sorted(item["jti"] for item in listed) == sorted(str(item["jti"]) for item in sessions)
+    assert [item["created_at"] for item in listed] == sorted((item["created_at"] for item in listed), reverse=True)
+    assert revoke_one.status_code == status.HTTP_204_NO_CONTENT
+    assert revoke_missing.status_code == status.HTTP_404_NOT_FOUND
+    assert len(after_revoke_one["items"]) == sessions_count - 1
+    assert revoke_all.status_code == status.HTTP_204_NO_CONTENT
+    assert after_revoke_all == {"items": [], "next_cursor": None}
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, user_agent, other_user_agent",
+    [
+        (
+                "test_refresh_retry_name_1",
+                "test_refresh_retry_surname_1",
+                "test_refresh_retry_login_1",
+                "test_refresh_retry_email_1@mail.net",
+                UserRole.user,
+                "test_refresh_retry_pwd_1",
+                "Other / Other / Other",
+                "Mobile Safari 17.0 / iOS 17.0 / iPhone",
+        ),
+    ],
+)
+async def test_refresh_retry_within_grace_period(
+        client, name, surname, login, email, role, pwd, user_agent, other_user_agent
+):
+    user_id = str(uuid4())
+    user_values = {
+        "id": user_id,
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    refresh_token_data = create_refresh_token(user_id, role)
+    token_values = {"jti": refresh_token_data.get("jti"), "subject": user_id, "user_agent": user_agent}
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.execute(insert(Token).values(**token_values))
+        await session.commit()
+    body = {"refresh_token": refresh_token_data.get("refresh_token"), "user_agent": user_agent}
+
+    response = client.post("/api/v1/users/refresh", json=body)
+    retry_response = client.post("/api/v1/users/refresh", json=body)
+    # The test module instance of the service has its own in-process cache, like another replica.
+    other_replica_tokens = await UserService.refresh(body["refresh_token"], user_agent)
+    reuse_response = client.post("/api/v1/users/refresh", json=body | {"user_agent": other_user_agent})
+    async with AsyncSession() as session:
+        result = await session.execute(select(Token).where(Token.subject == user_id))
+        result = result.scalars().all()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert retry_response.status_code == status.HTTP_200_OK
+    assert retry_response.json() == response.json()
+    assert other_replica_tokens == response.json()
+    assert reuse_response.status_code == status.HTTP_409_CONFLICT
+    assert result == []
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, pwd, user_agent",
+    [
+        (
+                "test_login_audit_name_1",
+                "test_login_audit_surname_1",
+                "test_login_audit_login_1",
+                "test_login_audit_email_1@mail.net",
+                UserRole.user,
+                "test_login_audit_pwd_1",
+                "Other / Other / Other",
+        ),
+    ],
+)
+async def test_login_audit(name, surname, login, email, role, pwd, user_agent):
+    user_id = str(uuid4())
+    user_values = {
+        "id": user_id,
+        "name": name,
+        "surname": surname,
+        "login": login,
+        "email": email,
+        "role": role,
+        "hashed_pwd": get_hashed_pwd(pwd),
+    }
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**user_values))
+        await session.commit()
+        updated_at = await session.execute(select(User.updated_at).where(User.id == user_id))
+        updated_at = updated_at.scalar()
+
+    # Buffered events are flushed by the background task or, at the latest, on shutdown.
+    with TestClient(app) as lifespan_client:
+        failed = lifespan_client.post(
+            "/api/v1/users/login", json={"login_or_email": login, "pwd": f"{pwd}_wrong", "user_agent": user_agent}
+        )
+        succeeded = lifespan_client.post(
+            "/api/v1/users/login", json={"login_or_email": login, "pwd": pwd, "user_agent": user_agent}
+        )
+    async with AsyncSession() as session:
+        events = await session.execute(
+            select(LoginEvent).where(LoginEvent.user_id == user_id).order_by(LoginEvent.created_at)
+        )
+        events = events.scalars().all()
+        user = await session.execute(select(User).where(User.id == user_id))
+        user = user.scalar()
+
+    assert failed.status_code == status.HTTP_401_UNAUTHORIZED
+    assert succeeded.status_code == status.HTTP_200_OK
+    assert [event.success for event in events] == [False, True]
+    assert user.last_login_at == events[-1].created_at
+    assert user.updated_at == updated_at
+
+
+@pytest.mark.parametrize(
+    "users, text_query, role, limit, expected_logins",
+    [
+        (
+                [
+                    ("Searchable", "Johnson", "test_search_login_1", "test_search_email_1@mail.net", UserRole.user),
+                    ("Jonathan", "Searchable", "test_search_login_2", "test_search_email_2@mail.net", UserRole.user),
+                    ("Marta", "Novak", "test_search_searchable_3", "test_search_email_3@mail.net", UserRole.admin),
+                    ("Marta", "Novak", "test_search_login_4", "test_search_email_4@mail.net", UserRole.user),
+                ],
+                "searchab",
+                None,
+                2,
+                {"test_search_login_1", "test_search_login_2", "test_search_searchable_3"},
+        ),
+        (
+                [
+                    ("Filtered", "Byrole", "test_search_login_5", "test_search_email_5@mail.net", UserRole.executor),
+                    ("Filtered", "Byrole", "test_search_login_6", "test_search_email_6@mail.net", UserRole.user),
+                ],
+                "byrol",
+                UserRole.executor,
+                20,
+                {"test_search_login_5"},
+        ),
+    ],
+)
+async def test_search_users(client, admin_data, users, text_query, role, limit, expected_logins):
+    user_values = [
+        {
+            "id": str(uuid4()),
+            "name": name,
+            "surname": surname,
+            "login": login,
+            "email": email,
+            "role": user_role,
+            "hashed_pwd": "-",
+        }
+        for name, surname, login, email, user_role in [
+            *users, ("Admin", "Admin", f"test_admin_{len(users)}", f"test_admin_{len(users)}@mail.net", UserRole.admin)
+        ]
+    ]
+    user_values[-1]["id"] = admin_data.get("id")
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(user_values))
+        await session.commit()
+    cookies = {"access_token": admin_data.get("access_token")}
+
+    found, cursor = [], None
+    while True:
+        params = {"q": text_query, "limit": limit, "role": role, "cursor": cursor}
+        params = {key: value for key, value in params.items() if value is not None}
+        page = client.get("/api/v1/users/search", params=params, cookies=cookies).json()
+        found.extend(page["items"])
+        if not (cursor := page["next_cursor"]):
+            break
+    too_short = client.get("/api/v1/users/search", params={"q": "ab"}, cookies=cookies)
+
+    assert {user["login"] for user in found} == expected_logins
+    assert len(found) == len(expected_logins)
+    assert too_short.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    "roles, deleted_role",
+    [
+        ([UserRole.user, UserRole.user, UserRole.executor], UserRole.user),
+    ],
+)
+async def test_user_stats(client, admin_data, roles, deleted_role):
+    admin_values = {
+        "id": admin_data.get("id"),
+        "name": "test_stats_admin_name",
+        "surname": "test_stats_admin_surname",
+        "login": "test_stats_admin_login",
+        "email": "test_stats_admin_email@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": "-",
+    }
+    user_values = [
+        {
+            "id": str(uuid4()),
+            "name": f"test_stats_name_{i}",
+            "surname": f"test_stats_surname_{i}",
+            "login": f"test_stats_login_{i}",
+            "email": f"test_stats_email_{i}@mail.net",
+            "role": role,
+            "hashed_pwd": "-",
+        }
+        for i, role in enumerate(roles)
+    ]
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(**admin_values))
+        await session.commit()
+    cookies = {"access_token": admin_data.get("access_token")}
+
+    before = client.get("/api/v1/users/stats", params={"days": 1}, cookies=cookies).json()
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(user_values))
+        await session.commit()
+    deleted_id = next(user["id"] for user in user_values if user["role"] == deleted_role)
+    client.delete(f"/api/v1/users/{deleted_id}", cookies=cookies)
+    after = client.get("/api/v1/users/stats", params={"days": 1}, cookies=cookies).json()
+
+    expected_roles = {role: before["roles"][role] + roles.count(role) for role in before["roles"]}
+    expected_roles[deleted_role] -= 1
+    assert after["roles"] == expected_roles
+    assert after["total"] == before["total"] + len(roles) - 1
+    assert after["registrations"][-1]["count"] == before["registrations"][-1]["count"] + len(roles)
+
+
+@pytest.mark.parametrize(
+    "users_count, soft",
+    [
+        (3, False),
+        (3, True),
+    ],
+)
+async def test_bulk_delete(client, admin_data, users_count, soft):
+    admin_values = {
+        "id": admin_data.get("id"),
+        "name": "test_bulk_delete_admin_name",
+        "surname": "test_bulk_delete_admin_surname",
+        "login": f"test_bulk_delete_admin_login_{soft}",
+        "email": f"test_bulk_delete_admin_email_{soft}@mail.net",
+        "role": UserRole.admin,
+        "hashed_pwd": "-",
+    }
+    user_values = [
+        {
+            "id": str(uuid4()),
+            "name": f"test_bulk_delete_name_{i}",
+            "surname": f"test_bulk_delete_surname_{i}",
+            "login": f"test_bulk_delete_login_{soft}_{i}",
+            "email": f"test_bulk_delete_email_{soft}_{i}@mail.net",
+            "role": UserRole.user,
+            "hashed_pwd": "-",
+        }
+        for i in range(users_count)
+    ]
+    user_ids = [user["id"] for user in user_values]
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values([admin_values, *user_values]))
+        await session.commit()
+    cookies = {"access_token": admin_data.get("access_token")}
+
+    empty_response = client.post("/api/v1/users/delete", json={"soft": soft}, cookies=cookies)
+    response = client.post(
+        "/api/v1/users/delete", json={"user_ids": [*user_ids, admin_data.get("id")], "soft": soft}, cookies=cookies
+    )
+    repeated_response = client.post("/api/v1/users/delete", json={"user_ids": user_ids, "soft": soft}, cookies=cookies)
+    user_response = client.get(f"/api/v1/users/{user_ids[0]}/email", cookies=cookies)
+    async with AsyncSession() as session:
+        result = await session.execute(select(User.deleted_at).where(User.id.in_(user_ids)))
+        rows = result.scalars().all()
+        admin = await session.execute(select(User.deleted_at).where(User.id == admin_data.get("id")))
+        admin_rows = admin.all()
+
+    assert empty_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"deleted": users_count}
+    assert repeated_response.json() == {"deleted": 0}
+    assert user_response.json() is None
+    assert admin_rows == [(None,)]
+    if soft:
+        assert len(rows) == users_count and all(rows)
+    else:
+        assert not rows
+
+
+@pytest.mark.parametrize(
+    "name, surname, login, email, role, new_role",
+    [
+        (
+                "test_outbox_name_1",
+                "test_outbox_surname_1",
+                "test_outbox_login_1",
+                "test_outbox_email_1@mail.net",
+                UserRole.user,
+                UserRole.executor,
+        ),
+    ],
+)
+async def test_outbox_events(client, admin_data, name, surname, login, email, role, new_role):
+    user_id = str(uuid4())
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(
+            id=user_id, name=name, surname=surname, login=login, email=email, role=role, hashed_pwd="-"
+        ))
+        await session.commit()
+        await session.execute(update(User).where(User.id == user_id).values(role=new_role))
+        await session.execute(update(User).where(User.id == user_id).values(name=f"{name}_renamed"))
+        await session.commit()
+    client.post(
+        "/api/v1/users/delete",
+        json={"user_ids": [user_id], "soft": True},
+        cookies={"access_token": admin_data.get("access_token")},
+    )
+
+    async def failing_handler(batch):
+        raise RuntimeError("subscriber failed")
+
+    failing_sink = SubscriberSink()
+    failing_sink.subscribe(failing_handler)
+    await OutboxService.dispatch(failing_sink)
+    async with AsyncSession() as session:
+        result = await session.execute(select(OutboxEvent.attempts).where(OutboxEvent.user_id == user_id))
+        attempts = result.scalars().all()
+
+    events = []
+
+    async def handler(batch):
+        events.extend(batch)
+
+    sink = SubscriberSink()
+    sink.subscribe(handler)
+    async with AsyncSession() as session:
+        await session.execute(update(OutboxEvent).values(next_attempt_at=None))
+        await session.commit()
+    await OutboxService.dispatch(sink)
+    user_events = [(event["type"], event["data"].get("role")) for event in events if event["user_id"] == user_id]
+
+    assert attempts and set(attempts) == {1}
+    assert user_events == [("user.created", role), ("user.updated", new_role), ("user.deleted", None)]
+    assert [event["id"] for event in events] == sorted(event["id"] for event in events)
+
+
+async def test_outbox_events_dropped_without_consumer(monkeypatch):
+    monkeypatch.setattr(outbox.settings, "OUTBOX_WEBHOOK_URLS", "")
+    user_id = str(uuid4())
+    async with AsyncSession() as session:
+        await session.execute(insert(User).values(
+            id=user_id,
+            name="test_outbox_drop_name_1",
+            surname="test_outbox_drop_surname_1",
+            login="test_outbox_drop_login_1",
+            email="test_outbox_drop_email_1@mail.net",
+            role=UserRole.user,
+            hashed_pwd="-",
+        ))
+        await session.commit()
+
+    await OutboxService.dispatch()
+    async with AsyncSession() as session:
+        result = await session.execute(select(OutboxEvent.id).where(OutboxEvent.user_id == user_id))
+        left = result.scalars().all()
+
+    assert left == []